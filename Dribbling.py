@@ -1,204 +1,152 @@
-import pygame
 import math
 import random
-import time
-
-# Field dimensions
-f_length = 900
-f_width = 600
-GAME_DURATION = 120  # Not strictly enforced, just for reference
-
-class Ball:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = 5
-        self.velocity_x = 0
-        self.velocity_y = 0
-        self.last_movement_time = time.time()
-
-    def move(self):
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.velocity_x *= 0.99  # Friction
-        self.velocity_y *= 0.99
-
-        # Boundary checks
-        if self.x - self.radius < 0:
-            self.x = self.radius
-            self.velocity_x = 0
-        elif self.x + self.radius > f_length:
-            self.x = f_length - self.radius
-            self.velocity_x = 0
-        if self.y - self.radius < 0:
-            self.y = self.radius
-            self.velocity_y = 0
-        elif self.y + self.radius > f_width:
-            self.y = f_width - self.radius
-            self.velocity_y = 0
-
-        self.last_movement_time = time.time()
-
-class Player:
-    def __init__(self, x, y, team, color, player_type):
-        self.x = x
-        self.y = y
-        self.original_x = x
-        self.original_y = y
-        self.team = team
-        self.color = color
-        self.player_type = player_type
-        self.speed = 2 if player_type == 'attacker' else 2
-        self.radius = 12
-        self.facing_angle = 0
-        self.movement_state = "idle"
-        self.target_x = x
-        self.target_y = y
-        self.players = []
-        self.position_history = [] if player_type == 'attacker' else None  # Track attacker movement
-
-    def set_all_players(self, players):
-        self.players = players
-
-    def get_zone_limits(self):
-        if self.team == 'red' and self.player_type == 'attacker':
-            return (f_length // 2, f_length, 0, f_width)
-        return (0, f_length, 0, f_width)  # Defender can be anywhere for simplicity
-
-    def avoid_opponent_while_dribbling(self, ball, goal_x, goal_y):
-        THREAT_RADIUS = 50
-        AVOIDANCE_WEIGHT = 0.7
-
-        closest_opponent = None
-        min_distance = float('inf')
-
-        for opponent in self.players:
-            if opponent.team != self.team:
-                distance = math.hypot(self.x - opponent.x, self.y - opponent.y)
-                if distance < min_distance and distance < THREAT_RADIUS:
-                    min_distance = distance
-                    closest_opponent = opponent
-
-        if closest_opponent is None:
-            return None
-
-        dx = closest_opponent.x - self.x
-        dy = closest_opponent.y - self.y
-        angle_to_opponent = math.atan2(dy, dx)
-
-        avoid_angle_left = angle_to_opponent + math.pi / 2
-        avoid_angle_right = angle_to_opponent - math.pi / 2
-
-        goal_angle = math.atan2(goal_y - self.y, goal_x - self.x)
-
-        def normalize_angle(angle):
-            return ((angle + math.pi) % (2 * math.pi)) - math.pi
-
-        diff_left = abs(normalize_angle(avoid_angle_left - goal_angle))
-        diff_right = abs(normalize_angle(avoid_angle_right - goal_angle))
-        avoid_angle = avoid_angle_left if diff_left < diff_right else avoid_angle_right
-
-        new_angle = AVOIDANCE_WEIGHT * avoid_angle + (1 - AVOIDANCE_WEIGHT) * goal_angle
-        return normalize_angle(new_angle)
-
-    def move(self, ball):
-        if self.player_type == 'defender':
-            return  # Keep defender static
-
-        x_min, x_max, y_min, y_max = self.get_zone_limits()
-        BOUNDARY_BUFFER = 20
-        DECELERATION_DISTANCE = 50
-
-        if self.player_type == 'attacker':
-            if self.x > f_length / 2:  # Opponent's half
-                self.target_x = ball.x
-                self.target_y = ball.y
-            else:
-                self.target_x = self.original_x
-                self.target_y = self.original_y
-
-        self.target_x = max(x_min + BOUNDARY_BUFFER, min(x_max - BOUNDARY_BUFFER, self.target_x))
-        self.target_y = max(y_min + BOUNDARY_BUFFER, min(y_max - BOUNDARY_BUFFER, self.target_y))
-
-        target_angle = math.atan2(self.target_y - self.y, self.target_x - self.x)
-        angle_diff = ((target_angle - self.facing_angle + math.pi) % (2 * math.pi)) - math.pi
-
-        if abs(angle_diff) > math.radians(15) and self.movement_state != "turning":
-            self.movement_state = "turning"
-            return
-
-        if self.movement_state == "turning":
-            self.facing_angle += math.copysign(math.radians(90) * 0.016, angle_diff)
-            if abs(((target_angle - self.facing_angle + math.pi) % (2 * math.pi)) - math.pi) < math.radians(15):
-                self.movement_state = "walking"
-            return
-
-        distance = math.hypot(self.target_x - self.x, self.target_y - self.y)
-        speed = self.speed * (distance / DECELERATION_DISTANCE) if distance < DECELERATION_DISTANCE else self.speed
-
-        new_x = self.x + math.cos(self.facing_angle) * speed
-        new_y = self.y + math.sin(self.facing_angle) * speed
-
-        self.x = self.x + 0.3 * (new_x - self.x)
-        self.y = self.y + 0.3 * (new_y - self.y)
-
-        self.x = max(x_min + BOUNDARY_BUFFER, min(x_max - BOUNDARY_BUFFER, self.x))
-        self.y = max(y_min + BOUNDARY_BUFFER, min(y_max - BOUNDARY_BUFFER, self.y))
-
-        # Store position for attacker
-        if self.player_type == 'attacker':
-            self.position_history.append((int(self.x), int(self.y)))
-
-        if self.player_type == 'attacker' and math.hypot(self.x - ball.x, self.y - ball.y) <= self.radius + ball.radius:
-            target_x = f_length  # Blue goal
-            target_y = f_width / 2
-            distance_to_goal = math.hypot(self.x - target_x, self.y - target_y)
-            in_opponent_half = self.x > f_length / 2
-
-            if in_opponent_half and distance_to_goal > 200:
-                dribble_power = 0.5
-                avoid_angle = self.avoid_opponent_while_dribbling(ball, target_x, target_y)
-                angle = avoid_angle if avoid_angle is not None else math.atan2(target_y - ball.y, target_x - ball.x)
-                angle += math.radians(random.uniform(-10, 10))
-                ball.velocity_x = math.cos(angle) * dribble_power
-                ball.velocity_y = math.sin(angle) * dribble_power
-                ball.last_movement_time = time.time()
-            else:
-                kick_power = 3 if distance_to_goal <= 200 else 2
-                angle = math.atan2(target_y - ball.y, target_x - ball.x)
-                angle += math.radians(random.uniform(-5, 5))
-                ball.velocity_x = math.cos(angle) * kick_power
-                ball.velocity_y = math.sin(angle) * kick_power
-                ball.last_movement_time = time.time()
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-        direction_x = self.x + math.cos(self.facing_angle) * self.radius
-        direction_y = self.y + math.sin(self.facing_angle) * self.radius
-        pygame.draw.line(screen, (255, 255, 255), (self.x, self.y), (direction_x, direction_y), 2)
-
-        if self.player_type == 'attacker' and self.x > f_length / 2 and \
-           math.hypot(self.x - f_length, self.y - f_width / 2) > 200:
-            for p in self.players:
-                if p.team != self.team and math.hypot(self.x - p.x, self.y - p.y) < 50:
-                    pygame.draw.circle(screen, (255, 0, 0), (int(self.x), int(self.y)), self.radius + 4, 2)
-                    break
+import multiprocessing as mp
+from twoD import Player, Ball
+from policy import Observation, ScriptedPolicy
+from threat_field import ThreatField
+from ring_buffer import RingBuffer
+from sim_clock import SimClock
+from random_streams import RandomStreams, GLOBAL_STREAMS
+from field import f_length, f_width
+from events import GOAL
+
+TRAIL_LENGTH = 2000  # Attacker path points kept for drawing
+MAX_TICKS = 60 * 30  # Give up on a scenario after 30 simulated seconds
+
+
+class DribbleScenario:
+    """
+    One attacker dribbling at the blue goal past static defenders.
+
+    Built from the main engine's Player and Ball, driven by the scripted
+    policy, and stepped on a SimClock so it runs headless at full speed. The
+    outcome is 'goal' when the ball enters the goal mouth, 'tackled' when it
+    touches a defender, 'out' when it leaves the field and 'timeout' after
+    `max_ticks`. Kick noise is drawn from streams of `seed` as in
+    FootballSimulation(seed=...), or from the global `random` without one.
+    """
+    def __init__(self, attacker_pos, defender_positions, ball_pos=None, threat_radius=50, max_ticks=MAX_TICKS,
+                 seed=None):
+        self.clock = SimClock()
+        self.max_ticks = max_ticks
+        self.streams = GLOBAL_STREAMS if seed is None else RandomStreams(seed)
+        self.attacker = Player(*attacker_pos, 'red', (255, 0, 0), 'attacker', time_fn=self.clock, verbose=False,
+                               streams=self.streams)
+        self.attacker.is_active_pursuer = True
+        self.defenders = [Player(x, y, 'blue', (0, 0, 255), 'defender', time_fn=self.clock, verbose=False,
+                                 streams=self.streams)
+                          for x, y in defender_positions]
+        self.players = [self.attacker] + self.defenders
+        for player in self.players:
+            player.set_all_players_accessor(lambda: self.players)
+        ball_pos = ball_pos or (attacker_pos[0] + 10, attacker_pos[1] + 5)
+        self.ball = Ball(*ball_pos, time_fn=self.clock)
+        self.policy = ScriptedPolicy(self.streams.kicks, threat_field=ThreatField(threat_radius=threat_radius))
+
+        self.ticks = 0
+        self.path_length = 0.0
+        self.outcome = None
+        self.position_history = RingBuffer(TRAIL_LENGTH)
+
+    def step(self):
+        attacker = self.attacker
+        previous_x, previous_y = attacker.x, attacker.y
+
+        commands = self.policy.act(Observation.from_players(self.players, self.ball))
+        # Defenders stay where they were placed
+        if attacker.follow_commands(commands, 0, self.ball):
+            touching = [True] + [False] * len(self.defenders)
+            self.policy.kick(Observation.from_players(self.players, self.ball, touching=touching), commands)
+            attacker.take_kick(commands, 0, self.ball)
+        self.ball.move()
+        self.clock.tick()
+        self.ticks += 1
+
+        self.path_length += math.hypot(attacker.x - previous_x, attacker.y - previous_y)
+        self.position_history.append((attacker.x, attacker.y))
+
+        event = self.ball.event
+        if event is not None and event.kind == GOAL and event.team == 'red':
+            self.outcome = 'goal'
+        elif self.ball.out_of_bounds:
+            self.outcome = 'out'
+        elif any(math.hypot(d.x - self.ball.x, d.y - self.ball.y) <= d.radius + self.ball.radius
+                 for d in self.defenders):
+            self.outcome = 'tackled'
+        elif self.ticks >= self.max_ticks:
+            self.outcome = 'timeout'
+        return self.outcome
+
+    def run(self):
+        while self.outcome is None:
+            self.step()
+        return {
+            'outcome': self.outcome,
+            'success': self.outcome == 'goal',
+            'time_to_goal': self.ticks * self.clock.dt if self.outcome == 'goal' else None,
+            'path_length': self.path_length,
+            'ticks': self.ticks,
+        }
+
+
+def random_layout(rng, num_defenders=2):
+    """Attacker in the opponent half with defenders scattered between it and the goal"""
+    attacker = (rng.uniform(f_length / 2 + 20, 600), rng.uniform(150, f_width - 150))
+    defenders = []
+    for _ in range(num_defenders):
+        x = rng.uniform(attacker[0] + 30, f_length - 120)
+        t = (x - attacker[0]) / (f_length - attacker[0])
+        line_y = attacker[1] + t * (f_width / 2 - attacker[1])
+        defenders.append((x, min(max(line_y + rng.uniform(-60, 60), 30), f_width - 30)))
+    return attacker, defenders
+
+
+def run_scenario(seed, num_defenders=2, threat_radius=50, max_ticks=MAX_TICKS):
+    rng = random.Random(seed)
+    attacker, defenders = random_layout(rng, num_defenders)
+    result = DribbleScenario(attacker, defenders, threat_radius=threat_radius, max_ticks=max_ticks, seed=seed).run()
+    result['seed'] = seed
+    return result
+
+
+def _run_scenario_args(args):
+    return run_scenario(*args)
+
+
+def run_scenarios(count, num_defenders=2, threat_radius=50, seed=0, processes=None, max_ticks=MAX_TICKS):
+    """
+    Run `count` randomized scenarios in a process pool.
+
+    Returns (results, summary) where summary holds the success rate and the
+    mean time-to-goal and path length over successful runs.
+    """
+    jobs = [(seed + i, num_defenders, threat_radius, max_ticks) for i in range(count)]
+    if processes == 1:
+        results = [_run_scenario_args(job) for job in jobs]
+    else:
+        with mp.Pool(processes) as pool:
+            results = pool.map(_run_scenario_args, jobs, chunksize=max(1, count // (4 * (processes or mp.cpu_count()))))
+
+    successes = [r for r in results if r['success']]
+    summary = {
+        'scenarios': count,
+        'success_rate': len(successes) / count if count else 0.0,
+        'mean_time_to_goal': sum(r['time_to_goal'] for r in successes) / len(successes) if successes else None,
+        'mean_path_length': sum(r['path_length'] for r in successes) / len(successes) if successes else None,
+        'outcomes': {o: sum(1 for r in results if r['outcome'] == o) for o in ('goal', 'tackled', 'out', 'timeout')},
+    }
+    return results, summary
+
 
 def main():
+    import pygame
     pygame.init()
     screen = pygame.display.set_mode((f_length, f_width))
     pygame.display.set_caption("Two Static Defenders Dribbling Avoidance Test with Path")
     clock = pygame.time.Clock()
 
-    # Initialize players and ball
-    attacker = Player(500, 300, 'red', (255, 0, 0), 'attacker')
-    defender1 = Player(540, 310, 'blue', (0, 0, 255), 'defender')
-    defender2 = Player(580, 290, 'blue', (0, 0, 255), 'defender')  # Second defender
-    ball = Ball(510, 305)
-    players = [attacker, defender1, defender2]
-    attacker.set_all_players(players)
-    defender1.set_all_players(players)
-    defender2.set_all_players(players)
+    scenario = DribbleScenario((500, 300), [(540, 310), (580, 290)], ball_pos=(510, 305), max_ticks=float('inf'))
+    attacker = scenario.attacker
 
     running = True
     while running:
@@ -206,9 +154,8 @@ def main():
             if event.type == pygame.QUIT:
                 running = False
 
-        attacker.move(ball)
-        # Defenders remain static
-        ball.move()
+        if scenario.outcome is None:
+            scenario.step()
 
         # Draw
         screen.fill((0, 200, 0))  # Green field
@@ -218,12 +165,12 @@ def main():
         pygame.draw.rect(screen, (255, 255, 255), (f_length - 60, goal_y - 130, 60, 260), 2)
 
         # Draw attacker's movement path
-        if len(attacker.position_history) > 1:
-            pygame.draw.lines(screen, (255, 0, 0), False, attacker.position_history, 2)
+        if len(scenario.position_history) > 1:
+            pygame.draw.lines(screen, (255, 0, 0), False, scenario.position_history.array(), 2)
 
-        for player in players:
+        for player in scenario.players:
             player.draw(screen)
-        pygame.draw.circle(screen, (255, 255, 255), (int(ball.x), int(ball.y)), ball.radius)
+        pygame.draw.circle(screen, (255, 255, 255), (int(scenario.ball.x), int(scenario.ball.y)), scenario.ball.radius)
 
         pygame.display.flip()
         clock.tick(60)
@@ -231,4 +178,4 @@ def main():
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,39 @@
+from collections import namedtuple
+
+TEAMS = ('red', 'blue')
+
+
+class BehaviorParams(namedtuple('BehaviorParams', [
+        'threat_radius', 'avoidance_weight', 'boundary_buffer',
+        'dribble_power', 'pass_power', 'shot_power', 'shooting_distance', 'dribble_spread', 'kick_spread',
+        'pass_lateral_min', 'pass_margin', 'recovery_duration'],
+        defaults=(100, 0.7, 20, 0.5, 2, 3, 200, 10, 5, 50, 0.0, 2.0))):
+    """
+    Tunable behaviour constants for one team.
+
+    threat_radius, avoidance_weight: how far dribblers look for opponents
+        and how hard they steer around them
+    boundary_buffer: px robots keep inside their zone limits
+    dribble_power, pass_power, shot_power: kick speeds; attackers within
+        shooting_distance px of goal shoot
+    dribble_spread, kick_spread: +- degrees of random error on dribbles and kicks
+    pass_lateral_min: passes to receivers less than this many px across are skipped
+    pass_margin: ticks a pass must lead every opponent to the ball's path
+    recovery_duration: seconds a fallen robot takes to get up
+    """
+    __slots__ = ()
+
+
+DEFAULT_PARAMS = BehaviorParams()
+
+
+def team_params(params=None):
+    """
+    {team: BehaviorParams} from None, one BehaviorParams for both teams, or a
+    dict naming some teams; missing teams get DEFAULT_PARAMS.
+    """
+    if params is None:
+        params = {}
+    elif isinstance(params, BehaviorParams):
+        params = {team: params for team in TEAMS}
+    return {team: params.get(team, DEFAULT_PARAMS) for team in TEAMS}
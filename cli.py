@@ -0,0 +1,419 @@
+"""
+Command-line entry point for the simulator.
+
+    python cli.py run [--formation 2 1 2 1] [--scenario crowded_box] [--headless]
+    python cli.py batch --games 50 [--excel results.xlsx] [--store results.sqlite]
+    python cli.py results results.sqlite [--formation 2 1 2 1]
+    python cli.py sweep --games 20 [--workers 4] [--output results.npy] [--report] [--watch]
+    python cli.py sweep --games 200 --telemetry 8765   (then GET localhost:8765/stats or ws://localhost:8765/ws)
+    python cli.py bench [--games 3] [--backend python numba] [--coarse-ticks 1 4]
+    python cli.py replay --seed 7 [--formation 2 1 2 1]
+    python cli.py export trajectories/ --games 10 [--no-compress]
+    python cli.py coordinator --games 20 [--host 0.0.0.0] [--port 8766] [--local-workers 4] [--store results.sqlite]
+    python cli.py worker HOST:PORT
+    python cli.py compare --formation 2 1 2 1 --set avoidance_weight=0.9 --set threat_radius=140,pass_power=2.5
+    python cli.py compare --formation 2 1 2 1 --against 1 2 2 1 --games 40   (independent games)
+    python cli.py search --strategy halving --candidates 27 --games 4 [--eta 3] [--workers 4]
+    python cli.py golden record golden/ [--seeds 4] [--max-ticks 3000]
+    python cli.py golden check golden/ [--backend numba] [--coarse-ticks 4] [--atol 1e-6] [--field-atol ball=0.01]
+
+Each subcommand imports only what it uses: pygame is loaded only when a
+window is opened and pandas only for Excel output or sweep reports, so
+short-lived worker processes start quickly.
+"""
+import argparse
+import sys
+import time
+
+OUTFIELD_PLAYERS = 3
+BACKENDS = ('python', 'numba', 'auto')  # kernels.BACKENDS, repeated so --help needs no numpy
+
+
+def _formation(values):
+    red_def, red_att, blue_def, blue_att = values
+    if red_def + red_att != OUTFIELD_PLAYERS or blue_def + blue_att != OUTFIELD_PLAYERS:
+        raise argparse.ArgumentTypeError("each team needs 3 outfield players (defenders + attackers)")
+    return tuple(values)
+
+
+def all_formations():
+    """Every red formation against every blue formation"""
+    teams = [(d, OUTFIELD_PLAYERS - d) for d in range(OUTFIELD_PLAYERS + 1)]
+    return [red + blue for red in teams for blue in teams]
+
+
+def play_headless(simulation):
+    while not simulation.game_over:
+        simulation.step()
+    return simulation
+
+
+def serve_telemetry(port):
+    """(SweepTelemetry, running TelemetryServer) on localhost:`port`, or (None, None) without a port"""
+    if port is None:
+        return None, None
+    from telemetry import SweepTelemetry, TelemetryServer
+
+    telemetry = SweepTelemetry()
+    return telemetry, TelemetryServer(telemetry, port=port).start()
+
+
+def cmd_run(args):
+    from twoD import FootballSimulation
+
+    simulation = FootballSimulation(*args.formation, headless=args.headless, scenario=args.scenario,
+                                    backend=args.backend, seed=args.seed)
+    if not args.headless:
+        simulation.run()
+        return
+    play_headless(simulation)
+    print(f"Final Score: Red {simulation.red_score} - {simulation.blue_score} Blue "
+          f"({simulation.ticks} ticks, {simulation.collision_handler.get_collision_count()} collisions)")
+
+
+def cmd_batch(args):
+    from simulation_analysis import play_games, summarize, print_summary, save_results
+
+    telemetry, server = serve_telemetry(args.telemetry)
+    try:
+        store = None
+        if args.store:
+            from result_store import ResultStore
+            store = ResultStore(args.store)
+        results = play_games(*args.formation, num_games=args.games, seed=args.seed, backend=args.backend,
+                             telemetry=telemetry, store=store)
+    finally:
+        if server is not None:
+            server.stop()
+    if args.excel:
+        save_results(results, args.excel)
+    print_summary(summarize(results))
+
+
+def cmd_sweep(args):
+    import numpy as np
+    from shared_state import SweepFailed, run_shared_sweep, format_board
+
+    monitor = None
+    monitor_interval = 1.0
+    if args.watch:
+        from match_viewer import MatchViewer
+        monitor = MatchViewer(args.tile_width, fps=args.fps)
+        monitor_interval = monitor.frame_interval
+    elif args.monitor:
+        monitor = lambda board: print(format_board(board), end='\n\n')
+    formations = [args.formation] if args.only else all_formations()
+    telemetry, server = serve_telemetry(args.telemetry)
+    failure = None
+    try:
+        results = run_shared_sweep(formations, args.games, num_workers=args.workers, seed=args.seed,
+                                   monitor=monitor, monitor_interval=monitor_interval, telemetry=telemetry)
+    except SweepFailed as error:
+        failure, results = error, error.results
+    finally:
+        if server is not None:
+            server.stop()
+    if args.watch and not monitor.closed:
+        monitor.close()
+    if args.output:
+        np.save(args.output, results)
+        print(f"{'Finished results' if failure else 'Results'} saved to {args.output}")
+    if failure is not None:
+        sys.exit(f"Sweep failed: {failure}")
+    if args.report:
+        from sweep_analysis import analyse
+        print(analyse(results).render_report())
+    else:
+        wins = int((results['red_score'] > results['blue_score']).sum())
+        print(f"{len(results)} games, red won {wins}")
+
+
+def cmd_bench(args):
+    from twoD import FootballSimulation
+
+    print(f"{'backend':<8}{'coarse':>7}{'s/match':>10}{'ticks/s':>10}")
+    for backend in args.backend:
+        for coarse_ticks in args.coarse_ticks:
+            elapsed = 0.0
+            ticks = 0
+            for game in range(args.games):
+                simulation = FootballSimulation(*args.formation, headless=True, backend=backend,
+                                                coarse_ticks=coarse_ticks, seed=args.seed + game)
+                start = time.perf_counter()
+                play_headless(simulation)
+                elapsed += time.perf_counter() - start
+                ticks += simulation.ticks
+            print(f"{backend:<8}{coarse_ticks:>7}{elapsed / args.games:>10.3f}{ticks / elapsed:>10.0f}")
+
+
+def cmd_replay(args):
+    """Re-run a seeded batch game on the same headless engine and watch it"""
+    from twoD import FootballSimulation
+
+    simulation = FootballSimulation(*args.formation, headless=True, scenario=args.scenario, backend=args.backend,
+                                    seed=args.seed)
+    simulation.open_display()
+    import pygame
+
+    frames_per_second = 60 / simulation.coarse_ticks * args.speed
+    while simulation.running and not simulation.game_over:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                simulation.running = False
+        simulation.step()
+        simulation.draw()
+        simulation.clock.tick(frames_per_second)
+    print(f"Final Score: Red {simulation.red_score} - {simulation.blue_score} Blue")
+    pygame.quit()
+
+
+def cmd_export(args):
+    from trajectory_export import export_matches, TrajectoryDataset
+
+    start = time.perf_counter()
+    export_matches(args.directory, args.formation, args.games, args.seed, args.chunk_rows,
+                   not args.no_compress, args.threads, args.backend)
+    print(f"Exported {len(TrajectoryDataset(args.directory))} steps to {args.directory} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+def cmd_results(args):
+    from result_store import ResultStore
+    from simulation_analysis import summarize, print_summary
+
+    rows = ResultStore(args.store).query(args.formation, any_engine=args.any_engine)
+    print(f"{len(rows)} stored games")
+    for formation in sorted({row['formation'] for row in rows}):
+        games = [row for row in rows if row['formation'] == formation]
+        for row in games:
+            row['winner'] = ('Red' if row['red_score'] > row['blue_score'] else
+                             'Blue' if row['blue_score'] > row['red_score'] else 'Draw')
+        print(f"\n{formation} ({len({row['param_hash'] for row in games})} parameter sets)", end='')
+        print_summary(summarize(games))
+
+
+def cmd_coordinator(args):
+    from work_queue import Coordinator, make_units, run_local
+
+    formations = [args.formation] if args.only else all_formations()
+    units = make_units(formations, range(args.seed, args.seed + args.games))
+    store = None
+    if args.store:
+        from result_store import ResultStore
+        store = ResultStore(args.store)
+    if args.local_workers:
+        coordinator, results = run_local(units, args.local_workers, args.lease_timeout, store, args.token,
+                                         args.host, args.port)
+    else:
+        coordinator = Coordinator(units, args.host, args.port, args.lease_timeout, store=store, token=args.token)
+        results = coordinator.run()
+    wins = sum(r['red_score'] > r['blue_score'] for r in results.values())
+    print(f"{len(results)} games, red won {wins}; {len(coordinator.failed)} failed, "
+          f"{coordinator.duplicates} duplicate results dropped")
+
+
+def cmd_worker(args):
+    from work_queue import run_worker
+
+    host, port = args.address.rsplit(':', 1)
+    print(f"Played {run_worker(host, int(port), args.token)} units")
+
+
+def _param_changes(text):
+    """'name=value,name=value' as BehaviorParams; whole numbers stay ints where the default is one"""
+    from behavior_params import DEFAULT_PARAMS
+
+    changes = {}
+    for item in text.split(','):
+        name, _, value = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_PARAMS._fields or not value:
+            raise argparse.ArgumentTypeError(f"expected NAME=VALUE with NAME one of {DEFAULT_PARAMS._fields}")
+        try:
+            number = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"{name} needs a number, not {value!r}")
+        changes[name] = int(number) if isinstance(getattr(DEFAULT_PARAMS, name), int) and number.is_integer() \
+            else number
+    return DEFAULT_PARAMS._replace(**changes)
+
+
+def cmd_compare(args):
+    from behavior_params import DEFAULT_PARAMS
+    from paired_eval import Config, compare_configs, format_comparison
+
+    name = '-'.join(map(str, args.formation))
+    configs = [Config(name, args.formation)]
+    for params in args.set:
+        changes = ','.join(f"{k}={v}" for k, v in params._asdict().items() if v != getattr(DEFAULT_PARAMS, k))
+        configs.append(Config(f"{name} {changes or 'defaults'}", args.formation,
+                              {'red': params, 'blue': DEFAULT_PARAMS}))
+    for values in args.against:
+        configs.append(Config('-'.join(map(str, values)), _formation(values)))
+    if len(configs) < 2:
+        sys.exit("compare needs at least one --set or --against")
+    differences, comparisons = compare_configs(configs, args.games, args.seed, args.workers)
+    print(format_comparison(differences, comparisons))
+
+
+def cmd_search(args):
+    from param_search import search, format_results
+
+    start = time.perf_counter()
+    evaluations = search(args.strategy, candidates=args.candidates, games=args.games, eta=args.eta,
+                         max_games=args.max_games, formation=args.formation, seed=args.seed, processes=args.workers)
+    print(f"Searched {len(evaluations)} candidates in {time.perf_counter() - start:.1f}s")
+    print(format_results(evaluations, args.top))
+
+
+def cmd_golden(args):
+    from golden_traces import DEFAULT_ATOL, check_golden, default_corpus, format_report, record_golden
+
+    variant = {'backend': args.backend}
+    if args.coarse_ticks is not None:
+        variant['coarse_ticks'] = args.coarse_ticks
+    start = time.perf_counter()
+    if args.action == 'record':
+        corpus = default_corpus(range(args.seeds), args.formation)
+        path = record_golden(args.directory, corpus, args.max_ticks, **variant)
+        print(f"Recorded {len(corpus)} golden traces to {path} in {time.perf_counter() - start:.1f}s")
+        return
+    tolerance = {}
+    for item in args.field_atol:
+        field, _, value = item.partition('=')
+        tolerance[field] = float(value)
+    if args.atol is not None:
+        for field in ('ball', 'x', 'y', 'facing_angle', 'velocity'):
+            tolerance.setdefault(field, args.atol)
+    report = check_golden(args.directory, tolerance, **variant)
+    print(format_report(report))
+    print(f"Checked in {time.perf_counter() - start:.1f}s (default atol {args.atol or DEFAULT_ATOL:g})")
+    if any(divergence is not None for divergence in report.values()):
+        sys.exit(1)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="NAO 2D robot soccer simulator")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--formation', type=int, nargs=4, default=(2, 1, 2, 1),
+                        metavar=('RED_DEF', 'RED_ATT', 'BLUE_DEF', 'BLUE_ATT'))
+    common.add_argument('--seed', type=int, default=0)
+    backend = argparse.ArgumentParser(add_help=False)
+    backend.add_argument('--backend', default='python', choices=BACKENDS)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', parents=[common, backend], help="play one match, rendered unless --headless")
+    run.add_argument('--scenario', help="scenario library name or JSON file to start from")
+    run.add_argument('--headless', action='store_true')
+    run.set_defaults(func=cmd_run)
+
+    batch = commands.add_parser('batch', parents=[common, backend], help="play many headless matches of one formation")
+    batch.add_argument('--games', type=int, default=50)
+    batch.add_argument('--excel', help="write detailed results and a summary to this .xlsx file")
+    batch.add_argument('--store', metavar='FILE', help="SQLite result store to reuse and extend")
+    batch.add_argument('--telemetry', type=int, metavar='PORT', help="serve live progress on localhost:PORT")
+    batch.set_defaults(func=cmd_batch)
+
+    sweep = commands.add_parser('sweep', parents=[common], help="play every formation pairing across workers")
+    sweep.add_argument('--games', type=int, default=20, help="games per formation")
+    sweep.add_argument('--workers', type=int)
+    sweep.add_argument('--only', action='store_true', help="sweep only --formation")
+    sweep.add_argument('--output', help="save the raw results array to this .npy file")
+    sweep.add_argument('--report', action='store_true', help="print the per-formation report")
+    sweep.add_argument('--monitor', action='store_true', help="print the live worker board")
+    sweep.add_argument('--watch', action='store_true', help="watch every worker's match in a tiled window")
+    sweep.add_argument('--fps', type=float, default=15, help="frame rate cap for --watch")
+    sweep.add_argument('--tile-width', type=int, default=300)
+    sweep.add_argument('--telemetry', type=int, metavar='PORT', help="serve live progress on localhost:PORT")
+    sweep.set_defaults(func=cmd_sweep)
+
+    bench = commands.add_parser('bench', parents=[common], help="time headless matches")
+    bench.add_argument('--games', type=int, default=3)
+    bench.add_argument('--backend', nargs='+', default=['python'], choices=BACKENDS)
+    bench.add_argument('--coarse-ticks', type=int, nargs='+', default=[1, 4])
+    bench.set_defaults(func=cmd_bench)
+
+    replay = commands.add_parser('replay', parents=[common, backend], help="watch a seeded headless game")
+    replay.add_argument('--scenario')
+    replay.add_argument('--speed', type=float, default=1.0, help="playback speed relative to real time")
+    replay.set_defaults(func=cmd_replay)
+
+    export = commands.add_parser('export', parents=[common, backend], help="export per-tick trajectories")
+    export.add_argument('directory')
+    export.add_argument('--games', type=int, default=10)
+    export.add_argument('--chunk-rows', type=int, default=8192)
+    export.add_argument('--threads', type=int, default=2, help="background writer threads")
+    export.add_argument('--no-compress', action='store_true', help="write plain .npy chunks")
+    export.set_defaults(func=cmd_export)
+
+    results = commands.add_parser('results', help="summarise games in a result store")
+    results.add_argument('store')
+    results.add_argument('--formation', type=int, nargs=4, metavar=('RED_DEF', 'RED_ATT', 'BLUE_DEF', 'BLUE_ATT'))
+    results.add_argument('--any-engine', action='store_true', help="include games from older engine versions")
+    results.set_defaults(func=cmd_results)
+
+    coordinator = commands.add_parser('coordinator', parents=[common],
+                                      help="hand a sweep's games to TCP workers on this or other hosts")
+    coordinator.add_argument('--games', type=int, default=20, help="games per formation")
+    coordinator.add_argument('--only', action='store_true', help="play only --formation")
+    coordinator.add_argument('--host', default='127.0.0.1', help="address to listen on; 0.0.0.0 for other hosts")
+    coordinator.add_argument('--port', type=int, default=8766)
+    coordinator.add_argument('--lease-timeout', type=float, default=60.0)
+    coordinator.add_argument('--local-workers', type=int, help="also start this many workers on this machine")
+    coordinator.add_argument('--store', metavar='FILE', help="SQLite result store to reuse and extend")
+    coordinator.add_argument('--token', help="shared secret workers must send")
+    coordinator.set_defaults(func=cmd_coordinator)
+
+    worker = commands.add_parser('worker', help="play games for a coordinator")
+    worker.add_argument('address', help="coordinator HOST:PORT")
+    worker.add_argument('--token')
+    worker.set_defaults(func=cmd_worker, formation=None)
+
+    compare = commands.add_parser('compare', parents=[common],
+                                  help="compare red behaviour parameters on common random numbers")
+    compare.add_argument('--set', type=_param_changes, action='append', default=[], metavar='NAME=VALUE[,...]',
+                         help="red BehaviorParams changes to compare with the defaults, paired; repeatable")
+    compare.add_argument('--against', type=int, nargs=4, action='append', default=[],
+                         metavar=('RED_DEF', 'RED_ATT', 'BLUE_DEF', 'BLUE_ATT'),
+                         help="formation to compare, on independent games; repeatable")
+    compare.add_argument('--games', type=int, default=40)
+    compare.add_argument('--workers', type=int)
+    compare.set_defaults(func=cmd_compare)
+
+    search = commands.add_parser('search', parents=[common], help="tune red's behaviour parameters")
+    search.add_argument('--strategy', default='halving', choices=('grid', 'random', 'halving'))
+    search.add_argument('--candidates', type=int, default=27, help="parameter sets drawn for random/halving")
+    search.add_argument('--games', type=int, default=4, help="games per candidate (first rung for halving)")
+    search.add_argument('--eta', type=int, default=3, help="halving keeps the best 1/eta each rung")
+    search.add_argument('--max-games', type=int)
+    search.add_argument('--workers', type=int)
+    search.add_argument('--top', type=int, default=5)
+    search.set_defaults(func=cmd_search)
+
+    golden = commands.add_parser('golden', parents=[common, backend],
+                                 help="record reference traces or check an engine variant against them")
+    golden.add_argument('action', choices=('record', 'check'))
+    golden.add_argument('directory')
+    golden.add_argument('--seeds', type=int, default=4, help="kickoff seeds to record (record only)")
+    golden.add_argument('--max-ticks', type=int, help="stop each trace after this many ticks (record only)")
+    golden.add_argument('--coarse-ticks', type=int, help="engine variant's coarse step size (default 1)")
+    golden.add_argument('--atol', type=float, help="absolute tolerance for positions, angles and speeds")
+    golden.add_argument('--field-atol', action='append', default=[], metavar='FIELD=TOL',
+                        help="tolerance for one trace field; repeatable")
+    golden.set_defaults(func=cmd_golden)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.formation is not None:
+            args.formation = _formation(args.formation)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,5 +1,13 @@
+import math
+import random
 import time
-import pygame
+import numpy as np
+from ring_buffer import RingBuffer
+from contact import first_contact
+from behavior_params import DEFAULT_PARAMS
+from random_streams import GLOBAL_STREAMS
+
+COLLISION_DISTANCE = 1.5  # robot centres closer than this during a move knock both over
 
 class FallRecovery:
     """
@@ -8,9 +16,13 @@ class FallRecovery:
     """
     def __init__(self, player):
         self.player = player
+        self.time_fn = getattr(player, 'time_fn', time.time)
+        self.verbose = getattr(player, 'verbose', True)
         self.is_fallen = False
         self.fall_start_time = 0
-        self.recovery_duration = 2.0  # 2 seconds to get up
+        self.contact_index = -1  # this robot's row in the latest CollisionHandler.contacts matrix
+        self.recovery_duration = getattr(player, 'params', DEFAULT_PARAMS).recovery_duration  # seconds to get up
+        self.rng = getattr(player, 'streams', GLOBAL_STREAMS).collisions
         
         # IMPORTANT: Capture original color on initialization
         # Store as a tuple to prevent reference issues
@@ -26,13 +38,22 @@ class FallRecovery:
         self.fall_position = None  # Store position where robot fell
         
         # Debug info
-        self.debug_last_update_time = time.time()
+        self.debug_last_update_time = self.time_fn()
         self.debug_recovery_progress = 0.0
         
-        print(f"Initialized FallRecovery for {player.team} player with original color {self.original_color}")
+        self.log(f"Initialized FallRecovery for {player.team} player with original color {self.original_color}")
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
 
-    def check_collision(self, other_players):
-        """Check for collisions with other players"""
+    def check_collision(self, other_players, contacts=None):
+        """
+        Check for collisions with other players.
+
+        `contacts` is an optional matrix from CollisionHandler.contacts,
+        looked up instead of testing each pair here.
+        """
         # Skip if already fallen
         if self.is_fallen:
             return
@@ -46,20 +67,40 @@ class FallRecovery:
             if hasattr(other, 'fall_recovery') and other.fall_recovery.is_recovering():
                 continue
                 
-            # Calculate distance between players
-            distance = ((self.player.x - other.x) ** 2 + (self.player.y - other.y) ** 2) ** 0.5
+            if contacts is not None:
+                if contacts[self.contact_index, other.fall_recovery.contact_index]:
+                    self.collide_with(other)
+                    return
+                continue
+
+            # Swept test over both robots' last moves, so robots that pass
+            # through each other within one tick still collide
+            player = self.player
+            offset_x = player.previous_x - other.previous_x
+            offset_y = player.previous_y - other.previous_y
+            motion_x = (player.x - player.previous_x) - (other.x - other.previous_x)
+            motion_y = (player.y - player.previous_y) - (other.y - other.previous_y)
+            # Cheap rejection: apart along one axis for the whole tick
+            end_x = offset_x + motion_x
+            end_y = offset_y + motion_y
+            reach = COLLISION_DISTANCE
+            if (offset_x > reach and end_x > reach) or (offset_x < -reach and end_x < -reach) or \
+               (offset_y > reach and end_y > reach) or (offset_y < -reach and end_y < -reach):
+                continue
             
             # If collision detected
-            if distance < (1.5):
-                self.fall_down()
-                
-                # Make collision mutual - both players fall down
-                if hasattr(other, 'fall_recovery') and not other.fall_recovery.is_recovering():
-                    other.fall_recovery.fall_down()
-                    print(f"Both players fell down: {self.player.team} and {other.team}")
-                
+            if first_contact(offset_x, offset_y, motion_x, motion_y, reach) is not None:
+                self.collide_with(other)
                 return
 
+    def collide_with(self, other):
+        self.fall_down()
+        
+        # Make collision mutual - both players fall down
+        if hasattr(other, 'fall_recovery') and not other.fall_recovery.is_recovering():
+            other.fall_recovery.fall_down()
+            self.log(f"Both players fell down: {self.player.team} and {other.team}")
+
     def fall_down(self):
         """Trigger the fall animation"""
         # Prevent duplicate fall
@@ -73,13 +114,14 @@ class FallRecovery:
             
         # Set fallen state
         self.is_fallen = True
-        self.fall_start_time = time.time()
+        self.fall_start_time = self.time_fn()
+        self.player.velocity = 0.0
         self.player.color = self.fallen_color
         
         # Store the position where the robot fell
         self.fall_position = (self.player.x, self.player.y)
         
-        print(f"{self.player.team} player fell down, original color: {self.original_color}")
+        self.log(f"{self.player.team} player fell down, original color: {self.original_color}")
         
     def update(self):
         """Update recovery state"""
@@ -87,19 +129,19 @@ class FallRecovery:
             return
             
         # Check if recovery time has passed
-        current_time = time.time()
+        current_time = self.time_fn()
         time_fallen = current_time - self.fall_start_time
         
         if time_fallen >= self.recovery_duration:
-            print(f"Player recovered after {time_fallen:.2f} seconds")
+            self.log(f"Player recovered after {time_fallen:.2f} seconds")
             self.recover()
             
     def recover(self):
         """Reset the player to normal state after recovery and move players apart"""
         if self.is_fallen:
             # Log recovery
-            print(f"Player {id(self.player)} of team {self.player.team} recovered from fall")
-            print(f"  Restoring color from {self.player.color} to {self.original_color}")
+            self.log(f"Player {id(self.player)} of team {self.player.team} recovered from fall")
+            self.log(f"  Restoring color from {self.player.color} to {self.original_color}")
             
             # Reset state
             self.is_fallen = False
@@ -110,7 +152,7 @@ class FallRecovery:
             else:
                 # Use team default if original color not found
                 default_color = (255, 0, 0) if self.player.team == 'red' else (0, 0, 255)
-                print(f"  WARNING: No original color found, using default: {default_color}")
+                self.log(f"  WARNING: No original color found, using default: {default_color}")
                 self.player.color = default_color
             
             # Move player away from other players to prevent immediate re-collision
@@ -118,12 +160,10 @@ class FallRecovery:
                 
             self.fall_position = None
         else:
-            print(f"Warning: recover() called but player was not fallen")
+            self.log(f"Warning: recover() called but player was not fallen")
             
     def separate_from_nearby_players(self):
         """Move player away from nearby players to prevent immediate re-collision"""
-        import math
-        
         # Find all nearby players
         nearby_players = []
         separation_distance = 30  # Desired distance between players
@@ -160,8 +200,7 @@ class FallRecovery:
                 dy /= distance
             else:
                 # If exactly at same position, move in random direction
-                import random
-                angle = random.uniform(0, 2 * math.pi)
+                angle = self.rng.uniform(0, 2 * math.pi)
                 dx = math.cos(angle)
                 dy = math.sin(angle)
             
@@ -178,11 +217,13 @@ class FallRecovery:
             new_x = max(x_min + buffer, min(x_max - buffer, new_x))
             new_y = max(y_min + buffer, min(y_max - buffer, new_y))
             
-            # Apply new position
+            # Apply new position; a push is not a move that can cause a collision
             self.player.x = new_x
             self.player.y = new_y
+            self.player.previous_x = new_x
+            self.player.previous_y = new_y
             
-            print(f"{self.player.team} player moved to prevent re-collision: ({new_x:.1f}, {new_y:.1f})")
+            self.log(f"{self.player.team} player moved to prevent re-collision: ({new_x:.1f}, {new_y:.1f})")
 
     def is_recovering(self):
         """Check if player is currently in recovery state"""
@@ -192,9 +233,10 @@ class FallRecovery:
         """Draw recovery animation if player is fallen"""
         if not self.is_fallen:
             return
+        import pygame
             
         # Calculate recovery progress (0.0 to 1.0)
-        current_time = time.time()
+        current_time = self.time_fn()
         progress = min(1.0, (current_time - self.fall_start_time) / self.recovery_duration)
         self.debug_recovery_progress = progress
         
@@ -237,11 +279,40 @@ class FallRecovery:
 
 class CollisionHandler:
 
-    def __init__(self):
+    def __init__(self, verbose=True, backend=None, rng=random):
+        self.verbose = verbose
+        # Shuffles the order collisions are handled in
+        self.rng = rng
+        # kernels.Backend; only a compiled one supplies contact_matrix
+        self.contact_matrix = backend.contact_matrix if backend is not None else None
+        # Input and output arrays for contact_matrix, one set per roster size (whole team or substep movers)
+        self._contact_buffers = {}
         self.collision_count = 0
-        self.collision_positions = []  
         self.max_position_history = 5 
+        self.collision_positions = RingBuffer(self.max_position_history)
         
+    def contacts(self, players):
+        """
+        Fill the compiled contact matrix for `players`; each robot's row and
+        column is left in its FallRecovery.contact_index.
+        """
+        n = len(players)
+        buffers = self._contact_buffers.get(n)
+        if buffers is None:
+            buffers = self._contact_buffers[n] = (np.empty((4, n)), np.empty(n, dtype=np.bool_),
+                                                  np.empty((n, n), dtype=np.bool_))
+        positions, standing, matrix = buffers
+        for i, p in enumerate(players):
+            positions[0, i] = p.previous_x
+            positions[1, i] = p.previous_y
+            positions[2, i] = p.x
+            positions[3, i] = p.y
+            standing[i] = not p.fall_recovery.is_fallen
+            p.fall_recovery.contact_index = i
+        self.contact_matrix(positions[0], positions[1], positions[2], positions[3], standing,
+                            COLLISION_DISTANCE, matrix)
+        return matrix
+
     def check_and_handle_player_collisions(self, players):
         """Check all players for collisions and handle the falling animations"""
         # First update recovery state for all players
@@ -249,18 +320,19 @@ class CollisionHandler:
             player.fall_recovery.update()
             
         # Shuffle the order of players to avoid bias
-        import random
         players_copy = players.copy()
-        random.shuffle(players_copy)
+        self.rng.shuffle(players_copy)
         
         new_collision_positions = []
         
+        contacts = self.contacts(players) if self.contact_matrix is not None else None
+
         # Then check for new collisions in random order
         for player in players_copy:
             previous_state = player.fall_recovery.is_recovering()
             # Only check for new collisions if not already fallen
             if not previous_state:
-                player.fall_recovery.check_collision(players)
+                player.fall_recovery.check_collision(players, contacts)
                 
                 # If player just fell down, track collision
                 if not previous_state and player.fall_recovery.is_recovering():
@@ -276,24 +348,23 @@ class CollisionHandler:
                     
                     if unique_collision:
                         self.collision_count += 1
+                        # The ring buffer keeps only the most recent collision positions
                         self.collision_positions.append(collision_pos)
                         new_collision_positions.append(collision_pos)
-                        # Keep only the most recent collision positions
-                        if len(self.collision_positions) > self.max_position_history:
-                            self.collision_positions.pop(0)
                             
         # Print team-specific collision stats (for debugging)
-        fallen_red = sum(1 for p in players if p.team == 'red' and p.fall_recovery.is_recovering())
-        fallen_blue = sum(1 for p in players if p.team == 'blue' and p.fall_recovery.is_recovering()) 
-        if fallen_red > 0 or fallen_blue > 0:
-            print(f"Currently fallen players: Red={fallen_red}, Blue={fallen_blue}")
+        if self.verbose:
+            fallen_red = sum(1 for p in players if p.team == 'red' and p.fall_recovery.is_recovering())
+            fallen_blue = sum(1 for p in players if p.team == 'blue' and p.fall_recovery.is_recovering()) 
+            if fallen_red > 0 or fallen_blue > 0:
+                print(f"Currently fallen players: Red={fallen_red}, Blue={fallen_blue}")
                     
     def draw_collision_indicators(self, screen):
         """Draw collision indicators at recent collision positions"""
-        for pos in self.collision_positions:
+        import pygame
+        for age, pos in self.collision_positions.with_age():
             # Draw a fading X at collision positions
-            index = self.collision_positions.index(pos)
-            opacity = 255 - (index * 40)  # Fade out older collisions
+            opacity = 255 - (age * 40)  # Fade out older collisions
             if opacity > 0:
                 # Draw an X mark
                 pygame.draw.line(screen, (255, 0, 0, opacity), 
@@ -0,0 +1 @@
+# Lets tests/ import the simulator's top-level modules when pytest runs from the repository root
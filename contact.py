@@ -0,0 +1,49 @@
+import math
+
+CONTACT_SLOP = 0.5  # px a swept contact stops past the contact point, so the next tick starts in contact
+
+
+def first_contact(offset_x, offset_y, motion_x, motion_y, radius):
+    """
+    Earliest fraction of a tick at which two moving circles come within `radius`.
+
+    (offset_x, offset_y) is the centre offset between the circles at the start
+    of the tick and (motion_x, motion_y) how much that offset changes over the
+    tick, both circles moving in straight lines. Returns 0.0 if they already
+    touch at the start, a fraction in (0, 1] for the first contact during the
+    tick, and None if they stay apart or are separating.
+    """
+    c = offset_x * offset_x + offset_y * offset_y - radius * radius
+    if c <= 0:
+        return 0.0
+    a = motion_x * motion_x + motion_y * motion_y
+    half_b = offset_x * motion_x + offset_y * motion_y
+    if a == 0 or half_b >= 0:
+        return None
+    discriminant = half_b * half_b - a * c
+    if discriminant < 0:
+        return None
+    t = (-half_b - math.sqrt(discriminant)) / a
+    return t if t <= 1 else None
+
+
+def sweep_against_static(x0, y0, x1, y1, circles, radius_of):
+    """
+    First circle in `circles` the point moving from (x0, y0) to (x1, y1) runs into.
+
+    Circles it already touches at (x0, y0) are ignored, so an object can move
+    away from something it is in contact with. Returns (t, circle), with t
+    moved CONTACT_SLOP px further along the path, or (None, None).
+    """
+    motion_x = x1 - x0
+    motion_y = y1 - y0
+    first_t = None
+    first_circle = None
+    for circle in circles:
+        t = first_contact(x0 - circle.x, y0 - circle.y, motion_x, motion_y, radius_of(circle))
+        if t and (first_t is None or t < first_t):
+            first_t = t
+            first_circle = circle
+    if first_circle is not None:
+        first_t = min(1.0, first_t + CONTACT_SLOP / math.hypot(motion_x, motion_y))
+    return first_t, first_circle
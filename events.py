@@ -0,0 +1,17 @@
+from collections import namedtuple
+
+GOAL = 'goal'
+TOUCHLINE_EXIT = 'touchline_exit'
+GOAL_LINE_EXIT = 'goal_line_exit'
+
+
+class BallEvent(namedtuple('BallEvent', ['kind', 'team', 'player', 'x', 'y'])):
+    """
+    Something the ball did on one tick, reported once per occurrence by Ball.move.
+
+    `kind` is GOAL, TOUCHLINE_EXIT or GOAL_LINE_EXIT. For a goal `team` is
+    the team credited with it; for an exit it is the team that last touched
+    the ball. `player` is the robot that last touched the ball, if any, and
+    (x, y) where the ball was when it happened.
+    """
+    __slots__ = ()
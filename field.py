@@ -0,0 +1,14 @@
+f_length = 900   
+f_width = 600     
+g_width = 260      
+g_depth = 60       
+pen_area_width = 500  
+pen_area_depth = 200 
+circle_rad = 75  
+GAME_DURATION = 120
+
+# Goal mouth and goal lines, precomputed for the per-tick ball checks
+GOAL_Y_START = (f_width - g_width) // 2
+GOAL_Y_END = GOAL_Y_START + g_width
+LEFT_GOAL_X = g_depth  # ball at or behind this x inside the mouth is a goal for blue
+RIGHT_GOAL_X = f_length - g_depth  # and at or beyond this one a goal for red
@@ -0,0 +1,306 @@
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from twoD import FootballSimulation
+from policy import Policy, ScriptedPolicy
+from field import f_length, f_width, GAME_DURATION
+from kinematics import TICKS_PER_SECOND
+
+ROBOT_FEATURES = 8
+BALL_FEATURES = 4
+ACTION_FEATURES = 5  # target_x, target_y, kick, kick_angle, kick_power
+
+
+class _AgentPolicy(Policy):
+    """Scripted orders for everyone, with the learner's action written over its own team"""
+
+    def __init__(self, team, scripted):
+        self.team = team
+        self.scripted = scripted
+        self.action = None
+
+    def reset(self):
+        self.scripted.reset()
+
+    def use_streams(self, streams):
+        """Draw the scripted robots' kick noise from a simulation's random_streams.RandomStreams"""
+        if isinstance(self.scripted, ScriptedPolicy):
+            self.scripted.rng = streams.kicks
+
+    def controlled(self, observation):
+        """(action row, robot index) of every learner robot"""
+        return zip(self.action, [r.index for r in observation.robots if r.team == self.team])
+
+    def act(self, observation):
+        commands = self.scripted.act(observation)
+        if self.action is None:
+            return commands
+        for row, i in self.controlled(observation):
+            if observation.is_fallen[i]:
+                continue
+            commands.target_x[i] = row[0] * f_length
+            commands.target_y[i] = row[1] * f_width
+        return commands
+
+    def kick(self, observation, commands):
+        self.scripted.kick(observation, commands)
+        if self.action is None:
+            return
+        for row, i in self.controlled(observation):
+            if observation.touching_ball[i]:
+                commands.kick[i] = row[2] > 0.5
+                commands.kick_angle[i] = row[3]
+                commands.kick_power[i] = row[4]
+                commands.shot[i] = False
+                commands.pass_target_x[i] = commands.pass_target_y[i] = np.nan
+
+
+class FootballEnv:
+    """
+    Reset/step environment around one FootballSimulation.
+
+    The learner controls every robot of `team`; the other team runs
+    `opponent_policy` (the scripted behaviour by default). An action is an
+    array of shape (robots on team, 5) holding target x and y as fractions of
+    the field, a kick flag (> 0.5), the kick angle in radians and kick power.
+    Observations are flat float32 vectors of normalised robot rows followed by
+    the ball. The reward is +1 for a goal scored and -1 for one conceded.
+    pygame is only imported when render_mode is "human".
+
+    reset(seed) seeds the episode's own noise streams (FootballSimulation's
+    `seed`), never the global random module, and later resets without a
+    seed draw the next episode seed from it, so a seeded env replays the
+    same sequence of episodes whatever other envs do.
+    """
+    def __init__(self, red_defenders=2, red_attackers=1, blue_defenders=2, blue_attackers=1,
+                 team='red', opponent_policy=None, frame_skip=1, max_steps=None, render_mode=None):
+        self.formation = (red_defenders, red_attackers, blue_defenders, blue_attackers)
+        self.team = team
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps or GAME_DURATION * TICKS_PER_SECOND // frame_skip
+        self.render_mode = render_mode
+        self.policy = _AgentPolicy(team, opponent_policy or ScriptedPolicy())
+        self.simulation = None
+        self.steps = 0
+        self.episode_seeds = None
+
+        robots = 2 + red_defenders + red_attackers + blue_defenders + blue_attackers
+        self.observation_shape = (robots * ROBOT_FEATURES + BALL_FEATURES,)
+        self.action_shape = (1 + (red_defenders + red_attackers if team == 'red' else blue_defenders + blue_attackers),
+                             ACTION_FEATURES)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.episode_seeds = random.Random(seed)
+        elif self.episode_seeds is not None:
+            seed = self.episode_seeds.getrandbits(32)
+        self.simulation = FootballSimulation(*self.formation, policy=self.policy, seed=seed,
+                                             headless=self.render_mode != "human", verbose=False, coarse_ticks=1)
+        self.policy.use_streams(self.simulation.streams)
+        self.policy.action = None
+        self.steps = 0
+        return self.observe(), {}
+
+    def observe(self):
+        observation = self.simulation.observe()
+        robots = np.empty((len(observation), ROBOT_FEATURES), dtype=np.float32)
+        robots[:, 0] = observation.x / f_length
+        robots[:, 1] = observation.y / f_width
+        robots[:, 2] = np.cos(observation.facing_angle)
+        robots[:, 3] = np.sin(observation.facing_angle)
+        robots[:, 4] = np.where(observation.team == (0 if self.team == 'red' else 1), 1.0, -1.0)
+        robots[:, 5] = observation.role
+        robots[:, 6] = observation.is_fallen
+        robots[:, 7] = observation.is_active_pursuer
+        ball = observation.ball_state / np.array([f_length, f_width, 1.0, 1.0])
+        return np.concatenate([robots.ravel(), ball.astype(np.float32)])
+
+    def _goal_difference(self):
+        difference = self.simulation.red_score - self.simulation.blue_score
+        return difference if self.team == 'red' else -difference
+
+    def step(self, action):
+        self.policy.action = np.asarray(action, dtype=np.float64).reshape(self.action_shape)
+        before = self._goal_difference()
+        for _ in range(self.frame_skip):
+            self.simulation.step()
+            if self.simulation.game_over:
+                break
+        self.steps += 1
+        if self.render_mode == "human":
+            self.render()
+
+        reward = float(self._goal_difference() - before)
+        terminated = self.simulation.game_over
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {'red_score': self.simulation.red_score, 'blue_score': self.simulation.blue_score}
+        return self.observe(), reward, terminated, truncated, info
+
+    def render(self):
+        import pygame
+        pygame.event.pump()
+        self.simulation.draw()
+        self.simulation.clock.tick(TICKS_PER_SECOND)
+
+    def close(self):
+        if self.render_mode == "human":
+            import pygame
+            pygame.quit()
+
+
+class VectorEnv:
+    """
+    Several FootballEnvs stepped in one process, batched along the first axis.
+
+    Finished environments are reset automatically; the final observation of
+    the finished episode is returned in info['final_observation'].
+    """
+    def __init__(self, num_envs, seed=None, **env_kwargs):
+        self.envs = [FootballEnv(**env_kwargs) for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.seed = seed
+        self.observation_shape = (num_envs,) + self.envs[0].observation_shape
+        self.action_shape = (num_envs,) + self.envs[0].action_shape
+
+    def reset(self):
+        seeds = _env_seeds(self.seed, self.num_envs)
+        return np.stack([env.reset(s)[0] for env, s in zip(self.envs, seeds)]), {}
+
+    def step(self, actions):
+        observations = np.empty(self.observation_shape, dtype=np.float32)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        infos = []
+        for i, env in enumerate(self.envs):
+            obs, rewards[i], terminated[i], truncated[i], info = env.step(actions[i])
+            if terminated[i] or truncated[i]:
+                info['final_observation'] = obs
+                obs, _ = env.reset()
+            observations[i] = obs
+            infos.append(info)
+        return observations, rewards, terminated, truncated, infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+
+def _env_seeds(seed, count):
+    if seed is None:
+        return [None] * count
+    return [seed + i for i in range(count)]
+
+
+def _subproc_worker(remote, env_kwargs, slots, obs_name, act_name, obs_shape, act_shape, seeds):
+    """Steps the environments in `slots`, reading actions and writing observations in shared memory"""
+    obs_memory = shared_memory.SharedMemory(name=obs_name)
+    act_memory = shared_memory.SharedMemory(name=act_name)
+    observations = np.ndarray(obs_shape, dtype=np.float32, buffer=obs_memory.buf)
+    actions = np.ndarray(act_shape, dtype=np.float64, buffer=act_memory.buf)
+    envs = [FootballEnv(**env_kwargs) for _ in slots]
+    try:
+        while True:
+            command = remote.recv()
+            if command == 'reset':
+                for env, slot, seed in zip(envs, slots, seeds):
+                    observations[slot] = env.reset(seed)[0]
+                remote.send(None)
+            elif command == 'step':
+                results = []
+                for env, slot in zip(envs, slots):
+                    obs, reward, terminated, truncated, info = env.step(actions[slot])
+                    if terminated or truncated:
+                        info['final_observation'] = obs
+                        obs, _ = env.reset()
+                    observations[slot] = obs
+                    results.append((reward, terminated, truncated, info))
+                remote.send(results)
+            elif command == 'close':
+                break
+    finally:
+        for env in envs:
+            env.close()
+        obs_memory.close()
+        act_memory.close()
+        remote.close()
+
+
+class SubprocVectorEnv:
+    """
+    FootballEnvs spread over worker processes.
+
+    Observations and actions travel through shared-memory arrays, so the
+    pipes only carry a command word down and small reward tuples back. Each
+    worker runs num_envs / num_workers environments back to back, which keeps
+    per-step IPC overhead amortised when the simulation step itself is cheap.
+    """
+    def __init__(self, num_envs, num_workers=None, seed=None, **env_kwargs):
+        if env_kwargs.get('render_mode') == "human":
+            raise ValueError("SubprocVectorEnv cannot render; use FootballEnv for human rendering")
+        probe = FootballEnv(**env_kwargs)
+        self.num_envs = num_envs
+        self.observation_shape = (num_envs,) + probe.observation_shape
+        self.action_shape = (num_envs,) + probe.action_shape
+
+        self._obs_memory = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(self.observation_shape)) * np.dtype(np.float32).itemsize)
+        self._act_memory = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(self.action_shape)) * np.dtype(np.float64).itemsize)
+        self.observations = np.ndarray(self.observation_shape, dtype=np.float32, buffer=self._obs_memory.buf)
+        self.actions = np.ndarray(self.action_shape, dtype=np.float64, buffer=self._act_memory.buf)
+
+        num_workers = min(num_workers or mp.cpu_count(), num_envs)
+        seeds = _env_seeds(seed, num_envs)
+        self.remotes = []
+        self.processes = []
+        for w in range(num_workers):
+            slots = list(range(w, num_envs, num_workers))
+            parent, child = mp.Pipe()
+            process = mp.Process(target=_subproc_worker, daemon=True,
+                                 args=(child, env_kwargs, slots, self._obs_memory.name, self._act_memory.name,
+                                       self.observation_shape, self.action_shape, [seeds[s] for s in slots]))
+            process.start()
+            child.close()
+            self.remotes.append((parent, slots))
+            self.processes.append(process)
+        self.closed = False
+
+    def reset(self):
+        for remote, _ in self.remotes:
+            remote.send('reset')
+        for remote, _ in self.remotes:
+            remote.recv()
+        return self.observations.copy(), {}
+
+    def step(self, actions):
+        self.actions[:] = np.asarray(actions, dtype=np.float64).reshape(self.action_shape)
+        for remote, _ in self.remotes:
+            remote.send('step')
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        infos = [None] * self.num_envs
+        for remote, slots in self.remotes:
+            for slot, (reward, term, trunc, info) in zip(slots, remote.recv()):
+                rewards[slot] = reward
+                terminated[slot] = term
+                truncated[slot] = trunc
+                infos[slot] = info
+        return self.observations.copy(), rewards, terminated, truncated, infos
+
+    def close(self):
+        if self.closed:
+            return
+        for remote, _ in self.remotes:
+            remote.send('close')
+        for process in self.processes:
+            process.join()
+        del self.observations, self.actions
+        self._obs_memory.close()
+        self._obs_memory.unlink()
+        self._act_memory.close()
+        self._act_memory.unlink()
+        self.closed = True
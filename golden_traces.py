@@ -0,0 +1,163 @@
+import json
+import os
+from collections import namedtuple
+import numpy as np
+from scenarios import SCENARIO_LIBRARY, GAME_STATES
+from shared_state import MAX_ROBOTS
+
+MANIFEST = 'manifest.json'
+DEFAULT_SEEDS = range(4)
+DEFAULT_ATOL = 1e-9
+
+# Per-step fields of a trace; robot fields have one column per robot, padded with NaN
+STEP_FIELDS = ('tick', 'game_state', 'red_score', 'blue_score', 'ball')
+ROBOT_FIELDS = ('x', 'y', 'facing_angle', 'velocity', 'is_fallen')
+EXACT_FIELDS = ('tick', 'game_state', 'red_score', 'blue_score', 'is_fallen')
+ANGLE_FIELDS = ('facing_angle',)  # compared modulo 2*pi, so pi and -pi agree
+
+
+class Divergence(namedtuple('Divergence', ['case', 'step', 'tick', 'field', 'index', 'expected', 'actual'])):
+    """First place a trace differs from its reference; `index` is the robot (or ball component), if any"""
+    __slots__ = ()
+
+    def __str__(self):
+        where = f"{self.field}[{self.index}]" if self.index is not None else self.field
+        at = f"tick {self.tick}" if self.step is None else f"step {self.step} (tick {self.tick})"
+        return f"{self.case}: first divergence at {at} in {where}: expected {self.expected}, got {self.actual}"
+
+
+def default_corpus(seeds=DEFAULT_SEEDS, formation=(2, 1, 2, 1)):
+    """Kickoff matches for each seed plus every library scenario with the first seed, as {case: kwargs}"""
+    corpus = {f"kickoff_seed{seed}": {'formation': list(formation), 'seed': seed} for seed in seeds}
+    for name in SCENARIO_LIBRARY:
+        corpus[f"scenario_{name}_seed{seeds[0]}"] = {'formation': list(formation), 'seed': seeds[0], 'scenario': name}
+    return corpus
+
+
+def record_trace(case, max_ticks=None, **variant):
+    """
+    Play one corpus case headless and return its trace as a dict of arrays.
+
+    `case` holds the formation, seed and optional scenario; `variant` is
+    passed on to FootballSimulation (e.g. backend='numba') to trace an
+    engine variant. The engine steps one tick at a time unless the variant
+    sets coarse_ticks, so there is a row for every tick and a divergence is
+    placed at the exact tick it happens.
+    """
+    from twoD import FootballSimulation
+
+    variant = {'coarse_ticks': 1, **variant}
+    simulation = FootballSimulation(*case['formation'], headless=True, verbose=False, seed=case['seed'],
+                                    scenario=case.get('scenario'), **variant)
+    rows = {field: [] for field in STEP_FIELDS + ROBOT_FIELDS}
+    while not simulation.game_over and (max_ticks is None or simulation.ticks < max_ticks):
+        simulation.step()
+        ball = simulation.ball
+        rows['tick'].append(simulation.ticks)
+        rows['game_state'].append(GAME_STATES.index(simulation.game_state))
+        rows['red_score'].append(simulation.red_score)
+        rows['blue_score'].append(simulation.blue_score)
+        rows['ball'].append((ball.x, ball.y, ball.velocity_x, ball.velocity_y))
+        players = simulation.players[:MAX_ROBOTS]
+        padding = [np.nan] * (MAX_ROBOTS - len(players))
+        rows['x'].append([p.x for p in players] + padding)
+        rows['y'].append([p.y for p in players] + padding)
+        rows['facing_angle'].append([p.facing_angle for p in players] + padding)
+        rows['velocity'].append([p.velocity for p in players] + padding)
+        rows['is_fallen'].append([p.fall_recovery.is_fallen for p in players] + [False] * len(padding))
+
+    trace = {field: np.array(values, dtype=np.int64 if field in EXACT_FIELDS and field != 'is_fallen' else None)
+             for field, values in rows.items()}
+    trace['is_fallen'] = trace['is_fallen'].astype(bool)
+    trace['event_tick'] = np.array([tick for tick, _ in simulation.events], dtype=np.int64)
+    trace['event'] = np.array([f"{event.kind}:{event.team}" for _, event in simulation.events], dtype=str)
+    return trace
+
+
+def record_golden(directory, corpus=None, max_ticks=None, **variant):
+    """Record reference traces for every corpus case into `directory`; returns the manifest path"""
+    from result_store import engine_version
+
+    corpus = corpus or default_corpus()
+    os.makedirs(directory, exist_ok=True)
+    for name, case in corpus.items():
+        np.savez_compressed(os.path.join(directory, name + '.npz'), **record_trace(case, max_ticks, **variant))
+    path = os.path.join(directory, MANIFEST)
+    with open(path, 'w') as f:
+        json.dump({'engine_version': engine_version(), 'max_ticks': max_ticks, 'variant': variant,
+                   'cases': corpus}, f, indent=2)
+    return path
+
+
+def compare_traces(expected, actual, case='trace', tolerance=None):
+    """
+    First Divergence of `actual` from `expected`, or None if they agree.
+
+    Steps are aligned on tick number, so a variant with another coarse step
+    size is compared at the ticks both traces reached. `tolerance` maps
+    field names to absolute tolerances; float fields not named use
+    DEFAULT_ATOL and EXACT_FIELDS must always match exactly. The final tick
+    and the ball events are checked after the per-step state.
+    """
+    tolerance = tolerance or {}
+    ticks, e_rows, a_rows = np.intersect1d(expected['tick'], actual['tick'], assume_unique=True, return_indices=True)
+    first = None
+    for field in STEP_FIELDS[1:] + ROBOT_FIELDS:
+        e, a = expected[field][e_rows], actual[field][a_rows]
+        if field in EXACT_FIELDS:
+            mismatch = e != a
+        else:
+            difference = a - e
+            if field in ANGLE_FIELDS:
+                difference = (difference + np.pi) % (2 * np.pi) - np.pi
+            # NaN padding of absent robots lines up unless the team sizes differ
+            mismatch = (np.abs(difference) > tolerance.get(field, DEFAULT_ATOL)) | (np.isnan(a) != np.isnan(e))
+        rows = np.flatnonzero(mismatch.any(axis=1) if mismatch.ndim > 1 else mismatch)
+        if len(rows) and (first is None or rows[0] < first[0]):
+            index = int(np.flatnonzero(mismatch[rows[0]])[0]) if mismatch.ndim > 1 else None
+            first = (rows[0], field, index)
+    if first is not None:
+        row, field, index = first
+        e, a = expected[field][e_rows[row]], actual[field][a_rows[row]]
+        if index is not None:
+            e, a = e[index], a[index]
+        return Divergence(case, int(e_rows[row]), int(ticks[row]), field, index, e.item(), a.item())
+
+    e_end, a_end = int(expected['tick'][-1]), int(actual['tick'][-1])
+    if e_end != a_end:
+        return Divergence(case, len(expected['tick']) - 1, min(e_end, a_end), 'end_tick', None, e_end, a_end)
+
+    for i, (e_tick, e_event) in enumerate(zip(expected['event_tick'], expected['event'])):
+        if i >= len(actual['event']) or (actual['event_tick'][i], actual['event'][i]) != (e_tick, e_event):
+            got = f"{actual['event'][i]} at tick {actual['event_tick'][i]}" if i < len(actual['event']) else None
+            return Divergence(case, None, int(e_tick), 'event', i, f"{e_event} at tick {e_tick}", got)
+    if len(actual['event']) > len(expected['event']):
+        i = len(expected['event'])
+        return Divergence(case, None, int(actual['event_tick'][i]), 'event', i, None,
+                          f"{actual['event'][i]} at tick {actual['event_tick'][i]}")
+    return None
+
+
+def check_golden(directory, tolerance=None, **variant):
+    """
+    Re-run every case recorded in `directory` with the engine `variant` and
+    compare it with the reference. Returns {case: Divergence or None}.
+    """
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    report = {}
+    for name, case in manifest['cases'].items():
+        with np.load(os.path.join(directory, name + '.npz')) as archive:
+            expected = dict(archive)
+        actual = record_trace(case, manifest['max_ticks'], **variant)
+        report[name] = compare_traces(expected, actual, name, tolerance)
+    return report
+
+
+def format_report(report):
+    lines = []
+    for name, divergence in report.items():
+        lines.append(f"{name}: ok" if divergence is None else str(divergence))
+    failed = sum(d is not None for d in report.values())
+    lines.append(f"{len(report) - failed}/{len(report)} cases match")
+    return "\n".join(lines)
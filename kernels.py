@@ -0,0 +1,213 @@
+import math
+import random
+import numpy as np
+
+BACKENDS = ('python', 'numba', 'auto')
+
+
+def kinematics_step(x, y, heading, speed, target_x, target_y, max_speed,
+                    max_turn_rate, acceleration, deceleration, walk_angle, slow_down_distance, arrive_distance, dt):
+    """KinematicsModel.step on plain floats; returns (x, y, heading, speed, walking)"""
+    dx = target_x - x
+    dy = target_y - y
+    distance = math.hypot(dx, dy)
+
+    if distance > arrive_distance:
+        error = (math.atan2(dy, dx) - heading + math.pi) % (2 * math.pi) - math.pi
+    else:
+        error = 0.0
+    max_turn = max_turn_rate * dt
+    turn = min(max(error, -max_turn), max_turn)
+    heading = (heading + turn + math.pi) % (2 * math.pi) - math.pi
+    error -= turn
+
+    walking = abs(error) <= walk_angle
+    if walking:
+        desired = max_speed * math.cos(error) * min(1.0, distance / slow_down_distance)
+    else:
+        desired = 0.0
+    if desired > speed:
+        speed = min(desired, speed + acceleration * dt)
+    else:
+        speed = max(desired, speed - deceleration * dt)
+
+    advance = min(speed * dt, distance)
+    x += math.cos(heading) * advance
+    y += math.sin(heading) * advance
+    return x, y, heading, speed, walking
+
+
+def batched_kinematics(step):
+    """
+    `step` looped over the rows of a (robots, 8) state array, each row
+    (x, y, heading, speed, target_x, target_y, max_speed, walking); the first
+    four columns and `walking` are updated in place. Compiled, a whole tick
+    is one call.
+    """
+    def kinematics_steps(state, max_turn_rate, acceleration, deceleration, walk_angle, slow_down_distance,
+                         arrive_distance, dt):
+        for i in range(state.shape[0]):
+            row = state[i]
+            row[0], row[1], row[2], row[3], walking = step(
+                row[0], row[1], row[2], row[3], row[4], row[5], row[6],
+                max_turn_rate, acceleration, deceleration, walk_angle, slow_down_distance, arrive_distance, dt)
+            row[7] = 1.0 if walking else 0.0
+    return kinematics_steps
+
+
+def contact_matrix(previous_x, previous_y, x, y, standing, radius, contacts):
+    """
+    Fill `contacts[i, j]` for every pair of standing robots whose moves this tick
+    brought their centres within `radius`, using the same swept test as
+    contact.first_contact.
+    """
+    n = x.shape[0]
+    for i in range(n):
+        contacts[i, i] = False
+        for j in range(i + 1, n):
+            hit = False
+            if standing[i] and standing[j]:
+                offset_x = previous_x[i] - previous_x[j]
+                offset_y = previous_y[i] - previous_y[j]
+                motion_x = (x[i] - previous_x[i]) - (x[j] - previous_x[j])
+                motion_y = (y[i] - previous_y[i]) - (y[j] - previous_y[j])
+                c = offset_x * offset_x + offset_y * offset_y - radius * radius
+                if c <= 0:
+                    hit = True
+                else:
+                    a = motion_x * motion_x + motion_y * motion_y
+                    half_b = offset_x * motion_x + offset_y * motion_y
+                    if a != 0 and half_b < 0:
+                        discriminant = half_b * half_b - a * c
+                        if discriminant >= 0:
+                            hit = (-half_b - math.sqrt(discriminant)) / a <= 1
+            contacts[i, j] = hit
+            contacts[j, i] = hit
+
+
+class Backend:
+    """
+    The per-tick kernels a simulation runs with.
+
+    'python' uses the functions above as they are; 'numba' compiles them
+    with `numba.njit` on first use (cached on disk); 'auto' picks numba when
+    it is installed and falls back to python otherwise. A compiled backend
+    also supplies `kinematics_steps`, the kinematics of every walking robot
+    in one call per tick, and `contact_matrix`. With the python backend both
+    are None: robots walk one `kinematics_step` call at a time and
+    collisions are tested pair by pair in FallRecovery.check_collision,
+    which is cheaper without a compiler than filling arrays.
+    """
+    _compiled = None
+
+    def __init__(self, name='python'):
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown backend {name!r}, expected one of {BACKENDS}")
+        if name != 'python':
+            try:
+                compiled = Backend._compile()
+            except ImportError:
+                if name == 'numba':
+                    raise
+                name = 'python'
+            else:
+                name = 'numba'
+        self.name = name
+        if name == 'numba':
+            self.kinematics_step, self.kinematics_steps, self.contact_matrix = compiled
+        else:
+            self.kinematics_step, self.kinematics_steps, self.contact_matrix = kinematics_step, None, None
+
+    @classmethod
+    def _compile(cls):
+        if cls._compiled is None:
+            from numba import njit
+            step = njit(cache=True)(kinematics_step)
+            cls._compiled = (step, njit(cache=True)(batched_kinematics(step)), njit(cache=True)(contact_matrix))
+        return cls._compiled
+
+    def __repr__(self):
+        return f"Backend({self.name!r})"
+
+
+def kernel_parity(backend, samples=10_000, seed=0):
+    """
+    Largest kinematics difference between `backend` and the python kernels on random states.
+
+    Raises AssertionError if any walking decision or robot contact differs.
+    """
+    rng = random.Random(seed)
+    reference = Backend('python')
+    worst = 0.0
+    for _ in range(samples):
+        args = (rng.uniform(0, 900), rng.uniform(0, 600), rng.uniform(-math.pi, math.pi), rng.uniform(0, 36),
+                rng.uniform(0, 900), rng.uniform(0, 600), 36.0,
+                math.radians(90), 72.0, 144.0, math.radians(30), 50.0, 0.5, rng.choice((1 / 60, 4 / 60)))
+        expected = reference.kinematics_step(*args)
+        actual = backend.kinematics_step(*args)
+        assert expected[4] == actual[4], f"walking decision differs for {args}"
+        worst = max(worst, max(abs(e - a) for e, a in zip(expected[:4], actual[:4])))
+
+    if backend.kinematics_steps is not None:
+        params = (math.radians(90), 72.0, 144.0, math.radians(30), 50.0, 0.5, 1 / 60)
+        for _ in range(samples // 10):
+            state = np.array([(rng.uniform(0, 900), rng.uniform(0, 600), rng.uniform(-math.pi, math.pi),
+                               rng.uniform(0, 36), rng.uniform(0, 900), rng.uniform(0, 600), 36.0, 0.0)
+                              for _ in range(8)])
+            expected = [reference.kinematics_step(*row[:7], *params) for row in state.tolist()]
+            backend.kinematics_steps(state, *params)
+            for row, e in zip(state.tolist(), expected):
+                assert (row[7] > 0) == e[4], f"batched walking decision differs for {row}"
+                worst = max(worst, max(abs(a - b) for a, b in zip(row[:4], e[:4])))
+
+    if backend.contact_matrix is not None:
+        from contact import first_contact
+        for _ in range(samples // 10):
+            n = 8
+            previous_x = np.array([rng.uniform(0, 60) for _ in range(n)])
+            previous_y = np.array([rng.uniform(0, 60) for _ in range(n)])
+            x = previous_x + np.array([rng.uniform(-3, 3) for _ in range(n)])
+            y = previous_y + np.array([rng.uniform(-3, 3) for _ in range(n)])
+            standing = np.array([rng.random() > 0.2 for _ in range(n)])
+            contacts = np.zeros((n, n), dtype=np.bool_)
+            backend.contact_matrix(previous_x, previous_y, x, y, standing, 10.0, contacts)
+            for i in range(n):
+                for j in range(n):
+                    expected = i != j and standing[i] and standing[j] and first_contact(
+                        previous_x[i] - previous_x[j], previous_y[i] - previous_y[j],
+                        (x[i] - previous_x[i]) - (x[j] - previous_x[j]),
+                        (y[i] - previous_y[i]) - (y[j] - previous_y[j]), 10.0) is not None
+                    assert contacts[i, j] == expected, f"contact decision differs for robots {i}, {j}"
+    return worst
+
+
+def match_parity(backend, seeds=range(3), formation=(2, 1, 2, 1)):
+    """
+    Play seeded headless matches on the python and `backend` kernels.
+
+    Returns one row per seed with both scores, collision counts and event
+    logs and whether they matched exactly.
+    """
+    from twoD import FootballSimulation
+
+    rows = []
+    for seed in seeds:
+        outcomes = []
+        for name in ('python', backend.name):
+            simulation = FootballSimulation(*formation, headless=True, verbose=False, backend=name, seed=seed)
+            while not simulation.game_over:
+                simulation.step()
+            outcomes.append((simulation.red_score, simulation.blue_score,
+                             simulation.collision_handler.get_collision_count(),
+                             [(tick, event.kind, event.team) for tick, event in simulation.events]))
+        rows.append({'seed': seed, 'python': outcomes[0][:3], backend.name: outcomes[1][:3],
+                     'identical': outcomes[0] == outcomes[1]})
+    return rows
+
+
+if __name__ == "__main__":
+    backend = Backend('auto')
+    print(f"Backend: {backend.name}")
+    print(f"Largest kinematics difference: {kernel_parity(backend):.3g} (decisions identical)")
+    for row in match_parity(backend):
+        print(row)
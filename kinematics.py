@@ -0,0 +1,83 @@
+import math
+from kernels import kinematics_step
+
+TICKS_PER_SECOND = 60
+
+
+class KinematicsModel:
+    """
+    Per-tick NAO gait model shared by every robot.
+
+    Each tick a robot rotates towards its target at up to `max_turn_rate`
+    and, once the remaining heading error is within `walk_angle`, walks
+    forward while still turning. The commanded walking speed is the robot's
+    max speed scaled down by the heading error (cos) and inside the last
+    `slow_down_distance` px; the actual speed follows it within the
+    `acceleration`/`deceleration` limits. Units are px, radians and seconds;
+    `dt` is the tick length.
+
+    `step` advances one robot through `kernel` (kernels.kinematics_step or
+    its compiled twin); with a compiled `batch_kernel`, `step_many`
+    advances a whole state array of robots in a single call.
+    """
+    def __init__(self, max_turn_rate=math.radians(90), acceleration=72.0, deceleration=144.0,
+                 walk_angle=math.radians(30), slow_down_distance=50.0, arrive_distance=0.5,
+                 dt=1 / TICKS_PER_SECOND, kernel=kinematics_step, batch_kernel=None):
+        self.max_turn_rate = max_turn_rate
+        self.acceleration = acceleration
+        self.deceleration = deceleration
+        self.walk_angle = walk_angle
+        self.slow_down_distance = slow_down_distance
+        self.arrive_distance = arrive_distance
+        self.dt = dt
+        self.kernel = kernel
+        self.batch_kernel = batch_kernel
+
+    def with_dt(self, dt):
+        """Copy of this model taking steps of `dt` seconds"""
+        return KinematicsModel(self.max_turn_rate, self.acceleration, self.deceleration, self.walk_angle,
+                               self.slow_down_distance, self.arrive_distance, dt, self.kernel, self.batch_kernel)
+
+    def with_backend(self, backend):
+        """Copy of this model running on a kernels.Backend's kernels"""
+        return KinematicsModel(self.max_turn_rate, self.acceleration, self.deceleration, self.walk_angle,
+                               self.slow_down_distance, self.arrive_distance, self.dt,
+                               backend.kinematics_step, backend.kinematics_steps)
+
+    def step(self, x, y, heading, speed, target_x, target_y, max_speed):
+        """One tick for one robot; returns (x, y, heading, speed, walking)"""
+        return self.kernel(x, y, heading, speed, target_x, target_y, max_speed,
+                           self.max_turn_rate, self.acceleration, self.deceleration, self.walk_angle,
+                           self.slow_down_distance, self.arrive_distance, self.dt)
+
+    def step_many(self, state):
+        """`step` for every row of a kernels.batched_kinematics state array, in place, in one kernel call"""
+        self.batch_kernel(state, self.max_turn_rate, self.acceleration, self.deceleration, self.walk_angle,
+                          self.slow_down_distance, self.arrive_distance, self.dt)
+
+    def turn_ticks(self, angle):
+        """Ticks spent turning on the spot before walking off at `angle` from the current heading"""
+        angle = abs(((angle + math.pi) % (2 * math.pi)) - math.pi)
+        if angle <= self.walk_angle:
+            return 0.0
+        return (angle - self.walk_angle) / (self.max_turn_rate * self.dt)
+
+    def walk_ticks(self, distance, max_speed, stop_distance=0.0):
+        """
+        Ticks to walk from rest until `distance` px away becomes `stop_distance`.
+
+        Cruising at `max_speed` with the time lost accelerating added on, then
+        closing the last `slow_down_distance` px geometrically.
+        """
+        if distance <= stop_distance:
+            return 0.0
+        step = max_speed * self.dt
+        slow = self.slow_down_distance
+        ticks = max_speed / (2 * self.acceleration * self.dt)
+        if distance > slow:
+            ticks += (distance - slow) / step
+            distance = slow
+        return ticks + math.log(max(stop_distance, self.arrive_distance) / distance) / math.log(1 - step / slow)
+
+
+DEFAULT_KINEMATICS = KinematicsModel()
@@ -0,0 +1,19 @@
+def play_match(formation, params=None, seed=None, **options):
+    """
+    Play one headless match of `formation` to the end and return the finished
+    FootballSimulation; `options` are further FootballSimulation arguments.
+    """
+    # Imported here so process pools load the engine in their workers, not in the process handing out games
+    from twoD import FootballSimulation
+
+    simulation = FootballSimulation(*formation, headless=True, verbose=False, params=params, seed=seed, **options)
+    while not simulation.game_over:
+        simulation.step()
+    return simulation
+
+
+def play_task(task):
+    """Process-pool task: (key, formation, params, seed) -> (key, red score, blue score)"""
+    key, formation, params, seed = task
+    simulation = play_match(formation, params, seed)
+    return key, simulation.red_score, simulation.blue_score
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+from policy import TEAMS
+from field import f_length, f_width
+
+HEATMAP_CELL = 50
+TELEPORT_DISTANCE = 10  # position jumps above this (resets, separation pushes) are not walking
+
+
+class MatchStats:
+    """
+    In-stream statistics for one match, kept in fixed-size counters.
+
+    FootballSimulation.step feeds it touches, kicks and one `record_tick` per
+    tick; nothing allocates per event. The per-tick counters are plain
+    preallocated lists, which beat numpy on rosters this small, and are
+    turned into arrays only when the match is summarised. Touches are counted
+    when contact starts and each contact yields at most one kick; a pass is a
+    kick that is neither a dribble (no harder than the kicker's
+    BehaviorParams.dribble_power) nor a shot, and it completes when the next
+    robot to touch the ball is a teammate. Restart ticks count towards
+    possession, with the restarting team, like any other tick.
+    """
+    def __init__(self, players, dt=1 / 60):
+        n = len(players)
+        self.dt = dt
+        self.dribble_power = [p.params.dribble_power for p in players]
+        self.names = [f"{p.team}_{p.player_type}_{i}" for i, p in enumerate(players)]
+        self.team_index = [TEAMS.index(p.team) for p in players]
+        self.heatmap_shape = (n, int(math.ceil(f_length / HEATMAP_CELL)), int(math.ceil(f_width / HEATMAP_CELL)))
+
+        self.ticks = 0
+        self.possession_ticks = [0] * len(TEAMS)
+        self.touches = [0] * n
+        self.passes_attempted = [0] * n
+        self.passes_completed = [0] * n
+        self.shots = [0] * n
+        self.falls = [0] * n
+        self.fallen_ticks = [0] * n
+        self.distance = [0.0] * n
+        self.heatmap_counts = [0] * (self.heatmap_shape[0] * self.heatmap_shape[1] * self.heatmap_shape[2])
+
+        self._position = [(p.x, p.y) for p in players]
+        self._in_contact = [False] * n
+        self._touching = [False] * n
+        self._kicked = [False] * n
+        self._was_fallen = [False] * n
+        self._possession = -1
+        self._pending_pass = -1
+
+    def record_touch(self, index):
+        self._touching[index] = True
+        if self._in_contact[index]:
+            return
+        self.touches[index] += 1
+        self._kicked[index] = False
+        passer = self._pending_pass
+        if passer >= 0 and passer != index:
+            if self.team_index[passer] == self.team_index[index]:
+                self.passes_completed[passer] += 1
+            self._pending_pass = -1
+        self._possession = self.team_index[index]
+
+    def record_kick(self, index, power, is_shot):
+        if self._kicked[index]:
+            return
+        self._kicked[index] = True
+        if is_shot:
+            self.shots[index] += 1
+            self._pending_pass = -1
+        elif power > self.dribble_power[index]:
+            self.passes_attempted[index] += 1
+            self._pending_pass = index
+
+    def clear_pending_pass(self, team=None):
+        """Play stopped for a restart by `team` (None for a kickoff): an unfinished pass can no longer be completed"""
+        self._pending_pass = -1
+        self._possession = -1 if team is None else TEAMS.index(team)
+
+    def record_tick(self, players):
+        self.ticks += 1
+        if self._possession >= 0:
+            self.possession_ticks[self._possession] += 1
+
+        self._in_contact, self._touching = self._touching, self._in_contact
+        touching = self._touching
+        position = self._position
+        _, nx, ny = self.heatmap_shape
+        for i, p in enumerate(players):
+            touching[i] = False
+            x, y = p.x, p.y
+            px, py = position[i]
+            step = math.hypot(x - px, y - py)
+            if step < TELEPORT_DISTANCE:
+                self.distance[i] += step
+            position[i] = (x, y)
+
+            fallen = p.fall_recovery.is_fallen
+            if fallen:
+                self.fallen_ticks[i] += 1
+                if not self._was_fallen[i]:
+                    self.falls[i] += 1
+            self._was_fallen[i] = fallen
+
+            bx = min(max(int(x // HEATMAP_CELL), 0), nx - 1)
+            by = min(max(int(y // HEATMAP_CELL), 0), ny - 1)
+            self.heatmap_counts[(i * nx + bx) * ny + by] += 1
+
+    @property
+    def heatmap(self):
+        """Ticks spent by each robot in each HEATMAP_CELL square, shape (robots, x bins, y bins)"""
+        return np.array(self.heatmap_counts, dtype=np.int32).reshape(self.heatmap_shape)
+
+    def row(self):
+        """
+        Dict of the match totals, one column per statistic and robot, plus
+        'heatmap' as nested lists in the shape of `heatmap`.
+        """
+        row = {'ticks': self.ticks}
+        for t, team in enumerate(TEAMS):
+            mine = [i for i, ti in enumerate(self.team_index) if ti == t]
+            row[f'{team}_possession_time'] = self.possession_ticks[t] * self.dt
+            row[f'{team}_touches'] = sum(self.touches[i] for i in mine)
+            row[f'{team}_passes_attempted'] = sum(self.passes_attempted[i] for i in mine)
+            row[f'{team}_passes_completed'] = sum(self.passes_completed[i] for i in mine)
+            row[f'{team}_shots'] = sum(self.shots[i] for i in mine)
+            row[f'{team}_falls'] = sum(self.falls[i] for i in mine)
+        for i, name in enumerate(self.names):
+            row[f'{name}_touches'] = self.touches[i]
+            row[f'{name}_passes_attempted'] = self.passes_attempted[i]
+            row[f'{name}_passes_completed'] = self.passes_completed[i]
+            row[f'{name}_shots'] = self.shots[i]
+            row[f'{name}_falls'] = self.falls[i]
+            row[f'{name}_fallen_time'] = self.fallen_ticks[i] * self.dt
+            row[f'{name}_distance'] = self.distance[i]
+        row['heatmap'] = self.heatmap.tolist()
+        return row
@@ -0,0 +1,125 @@
+import math
+import time
+from field import f_length, f_width
+from policy import TEAMS, ROLES
+from scenarios import TEAM_ROLE_COLORS
+from shared_state import MAX_ROBOTS, IDLE, DONE
+
+
+class MatchViewer:
+    """
+    Watches every slot of a shared_state board as a scaled tile in one window.
+
+    Pass an instance as the `monitor` of run_shared_sweep (with
+    `monitor_interval=viewer.frame_interval`). Each call redraws the live
+    matches from the board, which workers keep writing without waiting for
+    it, so rendering only ever costs the coordinator process. Calls closer
+    together than `frame_interval` are skipped, capping the frame rate at
+    `fps`. Closing the window stops rendering; the sweep carries on.
+
+    Tiles are drawn at full field size with twoD.draw_pitch and Player.draw
+    onto an offscreen surface, then scaled to `tile_width`.
+    """
+    def __init__(self, tile_width=300, columns=None, fps=15):
+        self.tile_width = tile_width
+        self.tile_height = round(tile_width * f_width / f_length)
+        self.columns = columns
+        self.frame_interval = 1 / fps
+        self.last_frame = 0.0
+        self.window = None
+        self.closed = False
+        # Simulated time of the slot being drawn, read by its Players' fall animations
+        self.sim_time = 0.0
+        # One list of Players per slot, rebuilt when the slot starts another game
+        self.players = {}
+
+    def open(self, slots):
+        import pygame
+        from twoD import draw_pitch
+
+        pygame.init()
+        self.columns = self.columns or math.ceil(math.sqrt(slots))
+        rows = math.ceil(slots / self.columns)
+        self.window = pygame.display.set_mode((self.columns * self.tile_width, rows * self.tile_height))
+        pygame.display.set_caption("Robot Soccer Sweep")
+        self.font = pygame.font.Font(None, 20)
+        self.canvas = pygame.Surface((f_length, f_width))
+        self.pitch = pygame.Surface((f_length, f_width))
+        draw_pitch(self.pitch)
+
+    def __call__(self, board):
+        if self.closed:
+            return
+        now = time.perf_counter()
+        if now - self.last_frame < self.frame_interval:
+            return
+        self.last_frame = now
+
+        import pygame
+        if self.window is None:
+            self.open(len(board))
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.close()
+                return
+
+        for i, slot in enumerate(board):
+            x = (i % self.columns) * self.tile_width
+            y = (i // self.columns) * self.tile_height
+            self.window.blit(self.draw_tile(i, slot), (x, y))
+        pygame.display.flip()
+
+    def draw_tile(self, index, slot):
+        import pygame
+
+        canvas = self.canvas
+        canvas.blit(self.pitch, (0, 0))
+        if slot['status'] != IDLE:
+            for player in self.sync_players(index, slot):
+                player.draw(canvas)
+            ball_x, ball_y = slot['ball'][:2]
+            pygame.draw.circle(canvas, (255, 255, 255), (int(ball_x), int(ball_y)), 8)
+
+        tile = pygame.transform.smoothscale(canvas, (self.tile_width, self.tile_height))
+        if slot['status'] == DONE:
+            tile.fill((90, 90, 90), special_flags=pygame.BLEND_RGB_MULT)
+        label = (f"w{slot['worker']} game {slot['game']}  {'-'.join(map(str, slot['formation']))}  "
+                 f"Red {slot['red_score']} - {slot['blue_score']} Blue  t={slot['sim_time']:.0f}s")
+        tile.blit(self.font.render(label, True, (255, 255, 255)), (4, 4))
+        pygame.draw.rect(tile, (0, 0, 0), tile.get_rect(), 1)
+        return tile
+
+    def sync_players(self, index, slot):
+        """Players mirroring slot `index`, updated from the board"""
+        from twoD import Player
+
+        sim_time = float(slot['sim_time'])
+        key = (int(slot['game']), int(slot['num_robots']))
+        players = self.players.get(index)
+        if players is None or players[0] != key:
+            robots = slot['robots'][:min(int(slot['num_robots']), MAX_ROBOTS)]
+            team_players = []
+            for robot in robots:
+                team, role = TEAMS[robot['team']], ROLES[robot['role']]
+                team_players.append(Player(robot['x'], robot['y'], team, TEAM_ROLE_COLORS[(team, role)], role,
+                                           time_fn=lambda: self.sim_time, verbose=False))
+            players = self.players[index] = (key, team_players)
+
+        self.sim_time = sim_time
+        for player, robot in zip(players[1], slot['robots']):
+            player.x = float(robot['x'])
+            player.y = float(robot['y'])
+            player.facing_angle = float(robot['facing_angle'])
+            player.update_player_type(ROLES[robot['role']])
+            player.is_active_pursuer = bool(robot['is_active_pursuer'])
+            recovery = player.fall_recovery
+            if robot['is_fallen'] and not recovery.is_fallen:
+                recovery.fall_start_time = sim_time
+            recovery.is_fallen = bool(robot['is_fallen'])
+            player.color = recovery.fallen_color if recovery.is_fallen else recovery.original_color
+        return players[1]
+
+    def close(self):
+        import pygame
+        self.closed = True
+        pygame.quit()
@@ -0,0 +1,178 @@
+import itertools
+import math
+import multiprocessing as mp
+import random
+from behavior_params import DEFAULT_PARAMS
+from match_runner import play_task
+
+# (low, high) samples uniformly (integers if both bounds are ints); a list is a grid of choices.
+# recovery_duration is a robot property rather than a strategy, so it is left at its default.
+SEARCH_SPACE = {
+    'threat_radius': (50, 160),
+    'avoidance_weight': (0.3, 0.95),
+    'boundary_buffer': (10, 40),
+    'dribble_power': (0.3, 1.2),
+    'pass_power': (1.5, 3.0),
+    'shot_power': (2.0, 4.0),
+    'shooting_distance': (120, 320),
+    'pass_lateral_min': (10, 90),
+    'pass_margin': (0.0, 20.0),
+}
+
+
+def grid_candidates(space):
+    """Every combination of the listed values in `space`; ranges must be given as lists here"""
+    names = list(space)
+    for name in names:
+        if not isinstance(space[name], list):
+            raise ValueError(f"grid search needs a list of values for {name!r}, not {space[name]!r}")
+    return [DEFAULT_PARAMS._replace(**dict(zip(names, values)))
+            for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_candidates(space, count, rng=random):
+    """`count` BehaviorParams drawn independently from `space`"""
+    candidates = []
+    for _ in range(count):
+        values = {}
+        for name, choices in space.items():
+            if isinstance(choices, list):
+                values[name] = rng.choice(choices)
+            elif all(isinstance(bound, int) for bound in choices):
+                values[name] = rng.randint(*choices)
+            else:
+                values[name] = rng.uniform(*choices)
+        candidates.append(DEFAULT_PARAMS._replace(**values))
+    return candidates
+
+
+class Evaluation:
+    """Games played so far by one candidate: red plays `params`, blue the baseline"""
+
+    def __init__(self, params):
+        self.params = params
+        self.games = 0
+        self.red_goals = 0
+        self.blue_goals = 0
+        self.wins = 0
+        self.losses = 0
+
+    def add(self, red_score, blue_score):
+        self.games += 1
+        self.red_goals += red_score
+        self.blue_goals += blue_score
+        self.wins += red_score > blue_score
+        self.losses += red_score < blue_score
+
+    @property
+    def goal_difference(self):
+        """Mean red minus blue goals per game; the search objective"""
+        return (self.red_goals - self.blue_goals) / self.games if self.games else -math.inf
+
+    def row(self):
+        return {'games': self.games, 'goal_difference': self.goal_difference,
+                'win_rate': self.wins / self.games if self.games else 0.0,
+                'loss_rate': self.losses / self.games if self.games else 0.0,
+                **self.params._asdict()}
+
+
+class ParameterSearch:
+    """
+    Tunes the red team's BehaviorParams against a fixed blue `baseline`.
+
+    Games are spread over a process pool one match per task. Game i of every
+    candidate draws its noise from RandomStreams(seed + i), so candidates are
+    compared on common random numbers (see paired_eval). Progress is
+    printed only when `verbose`.
+    """
+    def __init__(self, formation=(2, 1, 2, 1), baseline=DEFAULT_PARAMS, seed=0, processes=None, verbose=True):
+        self.formation = tuple(formation)
+        self.baseline = baseline
+        self.seed = seed
+        self.processes = processes
+        self.verbose = verbose
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def play(self, evaluations, games, pool):
+        """Play games [e.games, games) of every evaluation"""
+        tasks = [(i, self.formation, {'red': e.params, 'blue': self.baseline}, self.seed + game)
+                 for i, e in enumerate(evaluations) for game in range(e.games, games)]
+        for i, red_score, blue_score in pool.imap_unordered(play_task, tasks):
+            evaluations[i].add(red_score, blue_score)
+
+    def evaluate(self, candidates, games):
+        """Every candidate over `games` games; evaluations sorted best first"""
+        evaluations = [Evaluation(params) for params in candidates]
+        with mp.Pool(self.processes) as pool:
+            self.play(evaluations, games, pool)
+        return sorted(evaluations, key=lambda e: e.goal_difference, reverse=True)
+
+    def successive_halving(self, candidates, min_games=4, eta=3, max_games=None):
+        """
+        Successive halving: play every candidate `min_games` games, keep the
+        best 1/`eta`, play the survivors up to `eta` times as many games, and
+        repeat until one candidate is left or `max_games` is reached. Returns
+        the evaluations of every candidate, best first, ranked by the rung
+        each reached and then its goal difference.
+        """
+        evaluations = [Evaluation(params) for params in candidates]
+        survivors = list(evaluations)
+        rung_of = {}
+        games = min_games
+        rung = 0
+        with mp.Pool(self.processes) as pool:
+            while True:
+                self.play(survivors, games, pool)
+                survivors.sort(key=lambda e: e.goal_difference, reverse=True)
+                for e in survivors:
+                    rung_of[id(e)] = rung
+                self.log(f"Rung {rung}: {len(survivors)} candidates x {games} games, "
+                         f"best goal difference {survivors[0].goal_difference:+.2f}")
+                if len(survivors) == 1 or (max_games is not None and games >= max_games):
+                    break
+                survivors = survivors[:max(1, len(survivors) // eta)]
+                games = games * eta if max_games is None else min(games * eta, max_games)
+                rung += 1
+        return sorted(evaluations, key=lambda e: (rung_of[id(e)], e.goal_difference), reverse=True)
+
+
+def search(strategy='halving', space=SEARCH_SPACE, candidates=27, games=4, eta=3, max_games=None,
+           formation=(2, 1, 2, 1), seed=0, processes=None, verbose=True):
+    """
+    Run a 'grid', 'random' or 'halving' search and return evaluations best first.
+
+    Grid search needs list-valued `space` entries; random and halving draw
+    `candidates` parameter sets from `space` (halving uses the grid if every
+    entry is a list). Grid and random play `games` games per candidate;
+    halving starts there and grows by `eta` each rung.
+    """
+    if strategy not in ('grid', 'random', 'halving'):
+        raise ValueError(f"Unknown search strategy {strategy!r}, expected 'grid', 'random' or 'halving'")
+    rng = random.Random(seed)
+    if strategy == 'grid' or (strategy == 'halving' and all(isinstance(v, list) for v in space.values())):
+        population = grid_candidates(space)
+    else:
+        population = random_candidates(space, candidates, rng)
+
+    runner = ParameterSearch(formation, seed=seed, processes=processes, verbose=verbose)
+    if strategy == 'halving':
+        return runner.successive_halving(population, games, eta, max_games)
+    return runner.evaluate(population, games)
+
+
+def format_results(evaluations, top=5):
+    lines = [f"{'games':>5} {'goal diff':>9} {'win':>6} {'loss':>6}  params"]
+    for e in evaluations[:top]:
+        row = e.row()
+        changed = {k: round(v, 2) if isinstance(v, float) else v
+                   for k, v in e.params._asdict().items() if v != getattr(DEFAULT_PARAMS, k)}
+        lines.append(f"{row['games']:>5} {row['goal_difference']:>+9.2f} {row['win_rate']:>6.0%} "
+                     f"{row['loss_rate']:>6.0%}  {changed}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_results(search()))
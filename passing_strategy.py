@@ -1,9 +1,21 @@
 import math
+from reachability import PassEvaluator
+from behavior_params import DEFAULT_PARAMS
+from kinematics import DEFAULT_KINEMATICS
+
+# Shared by every PassingStrategy with the default pass power; players build a fresh strategy on each touch
+DEFAULT_PASS_EVALUATOR = PassEvaluator(DEFAULT_PARAMS.pass_power, boundary_buffer=DEFAULT_PARAMS.boundary_buffer)
 
 class PassingStrategy:
-    def __init__(self):
+    def __init__(self, evaluator=None, params=DEFAULT_PARAMS, kinematics=DEFAULT_KINEMATICS):
         self.field_length = 900
         self.field_width = 600
+        self.params = params
+        if evaluator is None and ((params.pass_power, params.boundary_buffer) !=
+                                  (DEFAULT_PARAMS.pass_power, DEFAULT_PARAMS.boundary_buffer) or
+                                  kinematics is not DEFAULT_KINEMATICS):
+            evaluator = PassEvaluator(params.pass_power, boundary_buffer=params.boundary_buffer, kinematics=kinematics)
+        self.evaluator = evaluator or DEFAULT_PASS_EVALUATOR
     
     def find_best_pass_target(self, player, ball, all_players):
         
@@ -50,26 +62,13 @@ class PassingStrategy:
         best_score = float('-inf')
         
         for receiver in potential_receivers:
-            if abs(receiver.y - player.y) < 50:
+            if abs(receiver.y - player.y) < self.params.pass_lateral_min:
                 continue
                 
             distance = math.hypot(receiver.x - player.x, receiver.y - player.y)
             
-            pass_blocked = False
-            for opponent in opponents:
-               
-                min_x = min(player.x, receiver.x) - 30
-                max_x = max(player.x, receiver.x) + 30
-                min_y = min(player.y, receiver.y) - 30
-                max_y = max(player.y, receiver.y) + 30
-                
-                if (min_x <= opponent.x <= max_x and min_y <= opponent.y <= max_y):
-                    if self.is_point_near_line(player.x, player.y, receiver.x, receiver.y, 
-                                               opponent.x, opponent.y, 40):
-                        pass_blocked = True
-                        break
-            
-            if pass_blocked:
+            # Skip passes an opponent can reach before the ball gets there, or less than pass_margin ticks after
+            if self.evaluator.interception_margin(ball, receiver, opponents) < self.params.pass_margin:
                 continue
                 
             score = 1000 - distance
@@ -86,19 +85,3 @@ class PassingStrategy:
             return best_receiver.x, best_receiver.y
         
         return target_x, target_y
-    
-    def is_point_near_line(self, x1, y1, x2, y2, px, py, threshold):
-        line_length = math.hypot(x2 - x1, y2 - y1)
-        
-        if line_length == 0:
-            return math.hypot(px - x1, py - y1) <= threshold
-            
-        t = ((px - x1) * (x2 - x1) + (py - y1) * (y2 - y1)) / (line_length * line_length)
-        t = max(0, min(1, t)) 
-        
-        nearest_x = x1 + t * (x2 - x1)
-        nearest_y = y1 + t * (y2 - y1)
-        
-        distance = math.hypot(px - nearest_x, py - nearest_y)
-        
-        return distance <= threshold
\ No newline at end of file
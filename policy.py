@@ -0,0 +1,333 @@
+import math
+import random
+from collections import namedtuple
+from functools import cached_property
+import numpy as np
+from passing_strategy import PassingStrategy
+from kinematics import DEFAULT_KINEMATICS
+from behavior_params import DEFAULT_PARAMS, team_params
+from threat_field import ThreatField
+from field import f_length, f_width, pen_area_depth
+
+TEAMS = ('red', 'blue')
+ROLES = ('goalkeeper', 'defender', 'attacker')
+
+
+class RobotView(namedtuple('RobotView', [
+        'index', 'x', 'y', 'facing_angle', 'speed', 'radius', 'team', 'player_type',
+        'original_x', 'original_y', 'zone', 'assigned_corner', 'is_active_pursuer',
+        'is_fallen', 'is_throwing_in', 'touching_ball'])):
+    """Immutable per-robot row of an Observation, usable wherever a Player is read"""
+    __slots__ = ()
+
+    def get_zone_limits(self):
+        return self.zone
+
+
+BallView = namedtuple('BallView', ['x', 'y', 'velocity_x', 'velocity_y', 'radius'])
+
+
+def _frozen(values, dtype):
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+class Observation:
+    """
+    Read-only snapshot of every robot and the ball for one tick.
+
+    Robot state is exposed twice: as read-only column arrays (`x`, `y`,
+    `team`, ...) indexed by robot for batched policies, and as `robots`, a
+    tuple of RobotView rows for policies written one robot at a time. Teams
+    and roles in the arrays are indices into TEAMS and ROLES. Columns are
+    built on first access, so per-robot policies never pay for them.
+    """
+    def __init__(self, robots, ball, game_state="playing"):
+        self.robots = tuple(robots)
+        self.ball = ball
+        self.game_state = game_state
+
+    @cached_property
+    def x(self):
+        return _frozen([r.x for r in self.robots], np.float64)
+
+    @cached_property
+    def y(self):
+        return _frozen([r.y for r in self.robots], np.float64)
+
+    @cached_property
+    def facing_angle(self):
+        return _frozen([r.facing_angle for r in self.robots], np.float64)
+
+    @cached_property
+    def team(self):
+        return _frozen([TEAMS.index(r.team) for r in self.robots], np.int8)
+
+    @cached_property
+    def role(self):
+        return _frozen([ROLES.index(r.player_type) for r in self.robots], np.int8)
+
+    @cached_property
+    def zone(self):
+        return _frozen([r.zone for r in self.robots], np.float64).reshape(-1, 4)
+
+    @cached_property
+    def is_active_pursuer(self):
+        return _frozen([r.is_active_pursuer for r in self.robots], bool)
+
+    @cached_property
+    def is_fallen(self):
+        return _frozen([r.is_fallen for r in self.robots], bool)
+
+    @cached_property
+    def touching_ball(self):
+        return _frozen([r.touching_ball for r in self.robots], bool)
+
+    @cached_property
+    def ball_state(self):
+        ball = self.ball
+        return _frozen([ball.x, ball.y, ball.velocity_x, ball.velocity_y], np.float64)
+
+    @classmethod
+    def from_players(cls, players, ball, game_state="playing", touching=None):
+        """Snapshot of `players`; `touching` overrides the per-robot ball contact test"""
+        robots = []
+        for i, p in enumerate(players):
+            robots.append(RobotView(
+                i, p.x, p.y, p.facing_angle, p.speed, p.radius, p.team, p.player_type,
+                p.original_x, p.original_y, p.get_zone_limits(), p.assigned_corner,
+                p.is_active_pursuer, p.fall_recovery.is_recovering(), p.is_throwing_in,
+                math.hypot(p.x - ball.x, p.y - ball.y) <= p.radius + ball.radius if touching is None
+                else touching[i]))
+        return cls(robots, BallView(ball.x, ball.y, ball.velocity_x, ball.velocity_y, ball.radius), game_state)
+
+    def __len__(self):
+        return len(self.robots)
+
+
+class Commands:
+    """
+    Per-robot orders returned by a Policy, one array entry per robot.
+
+    A robot walks towards (target_x, target_y). Robots that reach the ball
+    on the way are then offered to Policy.kick, and if `kick` is set for one
+    the ball is kicked along `kick_angle` with `kick_power`. `shot` marks
+    kicks counted as shots on goal and (pass_target_x, pass_target_y) is the
+    point the kick was aimed at, NaN when no kick is ordered.
+    """
+    def __init__(self, observation):
+        n = len(observation)
+        self.target_x = np.array([r.x for r in observation.robots], dtype=np.float64)
+        self.target_y = np.array([r.y for r in observation.robots], dtype=np.float64)
+        self.kick = np.zeros(n, dtype=bool)
+        self.kick_angle = np.zeros(n, dtype=np.float64)
+        self.kick_power = np.zeros(n, dtype=np.float64)
+        self.shot = np.zeros(n, dtype=bool)
+        self.pass_target_x = np.full(n, np.nan)
+        self.pass_target_y = np.full(n, np.nan)
+
+    def set_kick(self, i, angle, power, shot=False, target=(np.nan, np.nan)):
+        self.kick[i] = True
+        self.kick_angle[i] = angle
+        self.kick_power[i] = power
+        self.shot[i] = shot
+        self.pass_target_x[i], self.pass_target_y[i] = target
+
+
+class Policy:
+    """
+    Base class for decision making; receives an Observation, returns Commands.
+
+    `act` orders every robot's walk at the start of a tick. Once the robots
+    have walked, `kick` is called with a fresh observation in which only the
+    robots that reached the ball are touching it, and sets their kicks. The
+    default keeps whatever kicks `act` ordered.
+    """
+
+    def reset(self):
+        """Called when a new match starts"""
+        pass
+
+    def act(self, observation):
+        raise NotImplementedError
+
+    def kick(self, observation, commands):
+        pass
+
+
+def select_target(robot, zone, ball, players, params=DEFAULT_PARAMS):
+    """Walking target for `robot` under the scripted role behaviour"""
+    x_min, x_max, y_min, y_max = zone
+
+    if robot.player_type == 'goalkeeper':
+        if (robot.team == 'red' and ball.x < pen_area_depth) or \
+           (robot.team == 'blue' and ball.x > f_length - pen_area_depth):
+            target_x = ball.x
+            target_y = ball.y
+        else:
+            target_x = (x_min + x_max) // 2
+            target_y = ball.y
+
+    elif robot.is_active_pursuer:
+        target_x = ball.x
+        target_y = ball.y
+
+    elif robot.team == 'red' and robot.player_type == 'defender':
+        attacker = next((p for p in players if p.team == 'red' and p.player_type == 'attacker'), None)
+        if attacker and robot.assigned_corner:
+            corner_x, corner_y = robot.assigned_corner
+            target_x = (corner_x + attacker.x) / 2
+            target_y = (corner_y + attacker.y) / 2
+
+            y_offset = 100
+
+            if corner_y == 100:
+                target_x += y_offset
+            else:
+                target_x -= y_offset
+        else:
+            return robot.original_x, robot.original_y
+    else:
+        return robot.original_x, robot.original_y
+
+    buffer = params.boundary_buffer
+    target_x = max(x_min + buffer, min(x_max - buffer, target_x))
+    target_y = max(y_min + buffer, min(y_max - buffer, target_y))
+    return target_x, target_y
+
+
+def normalize_angle(angle):
+    return ((angle + math.pi) % (2 * math.pi)) - math.pi
+
+
+def avoid_opponent(robot, players, goal_x, goal_y, threat_field=None, threat_radius=100, avoidance_weight=0.7):
+    """Dribbling heading around opponents ahead of `robot`, or None if the way is clear"""
+    if threat_field is not None:
+        return threat_field.avoidance_angle(robot.team, robot.x, robot.y, goal_x, goal_y, avoidance_weight)
+
+    closest_opponent = None
+    min_distance = float('inf')
+
+    for opponent in players:
+        if opponent.team != robot.team:
+            distance = math.hypot(robot.x - opponent.x, robot.y - opponent.y)
+            if distance < min_distance and distance < threat_radius and opponent.x > robot.x:
+                min_distance = distance
+                closest_opponent = opponent
+
+    if closest_opponent is None:
+        return None
+
+    angle_to_opponent = math.atan2(closest_opponent.y - robot.y, closest_opponent.x - robot.x)
+
+    avoid_angle_left = angle_to_opponent + math.pi / 2
+    avoid_angle_right = angle_to_opponent - math.pi / 2
+
+    goal_angle = math.atan2(goal_y - robot.y, goal_x - robot.x)
+
+    diff_left = abs(normalize_angle(avoid_angle_left - goal_angle))
+    diff_right = abs(normalize_angle(avoid_angle_right - goal_angle))
+    avoid_angle = avoid_angle_left if diff_left < diff_right else avoid_angle_right
+
+    return normalize_angle(avoidance_weight * avoid_angle + (1 - avoidance_weight) * goal_angle)
+
+
+def select_kick(robot, ball, players, threat_field=None, passing_strategy=None, rng=random, target=None,
+                params=DEFAULT_PARAMS):
+    """
+    Kick `robot` takes when touching the ball, as (angle, power, is_shot).
+
+    Red attackers in the opponent half and more than `params.shooting_distance`
+    from goal dribble with light touches; everyone else passes or shoots.
+    `target` is the pass target if the caller already asked
+    `passing_strategy` for it.
+    """
+    passing_strategy = passing_strategy or PassingStrategy(params=params)
+
+    if robot.team == 'red':
+        goal_x = f_length
+    else:
+        goal_x = 0
+    goal_y = f_width / 2
+
+    distance_to_goal = math.hypot(robot.x - goal_x, robot.y - goal_y)
+
+    in_opponent_half = (robot.team == 'red' and robot.x > f_length / 2) or \
+                       (robot.team == 'blue' and robot.x < f_length / 2)
+
+    target_x, target_y = target or passing_strategy.find_best_pass_target(robot, ball, players)
+    if robot.team == 'red' and robot.player_type == 'attacker':
+        target_x -= 50
+
+    shooting_distance = params.shooting_distance
+    if robot.player_type == 'attacker' and in_opponent_half and distance_to_goal > shooting_distance \
+            and robot.team == "red":
+        avoid_angle = avoid_opponent(robot, players, target_x, target_y, threat_field,
+                                     params.threat_radius, params.avoidance_weight)
+        if avoid_angle is not None:
+            angle = avoid_angle
+        else:
+            angle = math.atan2(target_y - ball.y, target_x - ball.x)
+
+        angle += math.radians(rng.uniform(-params.dribble_spread, params.dribble_spread))
+        return angle, params.dribble_power, False
+
+    # Attackers of either team within range shoot; every other kick is a pass
+    is_shot = robot.player_type == 'attacker' and distance_to_goal <= shooting_distance
+    kick_power = params.shot_power if is_shot else params.pass_power
+
+    angle = math.atan2(target_y - ball.y, target_x - ball.x)
+    angle += math.radians(rng.uniform(-params.kick_spread, params.kick_spread))
+    return angle, kick_power, is_shot
+
+
+class ScriptedPolicy(Policy):
+    """
+    The hand-written role behaviour, applied to every robot at once.
+
+    `params` is one behavior_params.BehaviorParams for both teams or a
+    {team: BehaviorParams} dict; a `threat_field` passed in is shared by
+    both teams instead of one per threat radius. Passes are judged with
+    the robots' `kinematics`.
+    """
+
+    def __init__(self, rng=random, threat_field=None, params=None, kinematics=DEFAULT_KINEMATICS):
+        self.rng = rng
+        self.params = team_params(params)
+        self.passing_strategies = {team: PassingStrategy(params=p, kinematics=kinematics)
+                                   for team, p in self.params.items()}
+        fields = {}
+        self.threat_fields = {}
+        for team, p in self.params.items():
+            if threat_field is None and p.threat_radius not in fields:
+                fields[p.threat_radius] = ThreatField(threat_radius=p.threat_radius)
+            self.threat_fields[team] = threat_field or fields[p.threat_radius]
+        self.unique_threat_fields = list({id(f): f for f in self.threat_fields.values()}.values())
+
+    def act(self, observation):
+        commands = Commands(observation)
+        robots = observation.robots
+        ball = observation.ball
+        for robot in robots:
+            if robot.is_fallen or robot.is_throwing_in:
+                continue
+            commands.target_x[robot.index], commands.target_y[robot.index] = select_target(
+                robot, robot.zone, ball, robots, self.params[robot.team])
+        return commands
+
+    def kick(self, observation, commands):
+        """Kick for every robot that reached the ball, judged from where the robots have walked to"""
+        robots = observation.robots
+        ball = observation.ball
+        for threat_field in self.unique_threat_fields:
+            threat_field.update(robots)
+
+        for robot in robots:
+            if not robot.touching_ball or robot.is_fallen or robot.is_throwing_in:
+                continue
+            params = self.params[robot.team]
+            passing_strategy = self.passing_strategies[robot.team]
+            target = passing_strategy.find_best_pass_target(robot, ball, robots)
+            commands.set_kick(robot.index, *select_kick(robot, ball, robots, self.threat_fields[robot.team],
+                                                        passing_strategy, self.rng, target, params), target)
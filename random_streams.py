@@ -0,0 +1,25 @@
+import random
+
+STREAMS = ('kicks', 'collisions', 'throw_ins')
+
+
+class RandomStreams:
+    """
+    One random source per kind of match noise: kick and dribble jitter,
+    collision handling order and push-apart directions, and throw-in error.
+
+    With a `seed` each stream is its own random.Random derived from it, so
+    two matches given the same seed draw identical kick noise however many
+    collisions or throw-ins each has (common random numbers). Without one
+    every stream is the global `random` module, as seeded by random.seed.
+    """
+    def __init__(self, seed=None):
+        self.seed = seed
+        for name in STREAMS:
+            setattr(self, name, random if seed is None else random.Random(f"{seed}:{name}"))
+
+    def __repr__(self):
+        return f"RandomStreams({self.seed!r})"
+
+
+GLOBAL_STREAMS = RandomStreams()
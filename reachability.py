@@ -0,0 +1,179 @@
+import math
+from kinematics import DEFAULT_KINEMATICS, TICKS_PER_SECOND
+
+GRID_CELL = 25
+BALL_FRICTION = 0.99
+CONTACT_RADIUS = 17  # robot radius + ball radius
+
+
+class ReachabilityTable:
+    """
+    Precomputed time-to-point table for a robot of a given speed.
+
+    The table is indexed by the offset between robot and point on a coarse
+    grid covering the whole field and by the robot's facing sector, and holds
+    the number of ticks the robot needs to get within contact distance of the
+    point under its KinematicsModel: the turn on the spot that brings the
+    heading within walking range, then the walk from rest at `speed` px/s.
+    """
+    _cache = {}
+
+    def __init__(self, speed, field_length=900, field_width=600, cell=GRID_CELL,
+                 facing_sectors=16, contact_radius=CONTACT_RADIUS, kinematics=DEFAULT_KINEMATICS):
+        self.speed = speed
+        self.kinematics = kinematics
+        self.cell = cell
+        self.facing_sectors = facing_sectors
+        self.contact_radius = contact_radius
+        self.nx = int(math.ceil(field_length / cell))
+        self.ny = int(math.ceil(field_width / cell))
+        self.sector_width = 2 * math.pi / facing_sectors
+
+        walk = [self.walk_ticks(math.hypot(ix * cell, iy * cell))
+                for ix in range(self.nx + 1) for iy in range(self.ny + 1)]
+
+        # ticks[sector][ix][iy] with ix, iy shifted so that index nx/ny is a zero offset
+        self.ticks = []
+        for sector in range(facing_sectors):
+            facing = sector * self.sector_width
+            rows = []
+            for ix in range(-self.nx, self.nx + 1):
+                row = []
+                for iy in range(-self.ny, self.ny + 1):
+                    walk_ticks = walk[abs(ix) * (self.ny + 1) + abs(iy)]
+                    if walk_ticks == 0:
+                        row.append(0.0)
+                        continue
+                    bearing = math.atan2(iy, ix)
+                    row.append(self.turn_ticks(bearing - facing) + walk_ticks)
+                rows.append(row)
+            self.ticks.append(rows)
+
+    @classmethod
+    def for_speed(cls, speed, kinematics=DEFAULT_KINEMATICS):
+        """
+        Return the shared table for `speed` under `kinematics`, building it on first use.
+
+        Tables are shared by models with the same gait, so the per-simulation
+        copies FootballSimulation makes for its backend reuse one table.
+        """
+        key = (speed, kinematics.max_turn_rate, kinematics.acceleration, kinematics.walk_angle,
+               kinematics.slow_down_distance, kinematics.arrive_distance, kinematics.dt)
+        table = cls._cache.get(key)
+        if table is None:
+            table = cls._cache[key] = cls(speed, kinematics=kinematics)
+        return table
+
+    def walk_ticks(self, distance):
+        return self.kinematics.walk_ticks(distance, self.speed, self.contact_radius)
+
+    def turn_ticks(self, angle):
+        return self.kinematics.turn_ticks(angle)
+
+    def ticks_to_reach(self, robot, px, py):
+        """Ticks `robot` needs to get within contact distance of (px, py)"""
+        ix = min(max(int(round((px - robot.x) / self.cell)), -self.nx), self.nx) + self.nx
+        iy = min(max(int(round((py - robot.y) / self.cell)), -self.ny), self.ny) + self.ny
+        sector = int(round((robot.facing_angle % (2 * math.pi)) / self.sector_width)) % self.facing_sectors
+        return self.ticks[sector][ix][iy]
+
+
+def ball_ticks(distance, power):
+    """Ticks a ball kicked with `power` needs to roll `distance`, inf if it stops short"""
+    remaining = 1 - distance * (1 - BALL_FRICTION) / power
+    if remaining <= 0:
+        return float('inf')
+    return math.log(remaining) / math.log(BALL_FRICTION)
+
+
+def max_roll_distance(power):
+    return power / (1 - BALL_FRICTION)
+
+
+def is_fallen(robot):
+    if hasattr(robot, 'fall_recovery'):
+        return robot.fall_recovery.is_recovering()
+    return getattr(robot, 'is_fallen', False)
+
+
+class PassEvaluator:
+    """
+    Estimates whether an opponent can get to a pass before the ball does.
+
+    The ball path is sampled every grid cell; at each sample the ball arrival
+    time is compared against every opponent's time-to-point looked up from a
+    `ReachabilityTable`. Opponents are confined to their zone limits, and a
+    pass longer than the ball can roll is judged at its resting point against
+    the receiver's own time to get there. Robot times come from tables for
+    `kinematics`, which should be the simulation's own model.
+    """
+    def __init__(self, kick_power=2, sample_spacing=GRID_CELL, boundary_buffer=20, kinematics=DEFAULT_KINEMATICS):
+        self.kick_power = kick_power
+        self.kinematics = kinematics
+        self.sample_spacing = sample_spacing
+        self.boundary_buffer = boundary_buffer
+        # stop judging the roll slightly before it asymptotically comes to rest
+        self.rest_distance = 0.95 * max_roll_distance(kick_power)
+
+    def can_stand_at(self, robot, px, py):
+        if not hasattr(robot, 'get_zone_limits'):
+            return True
+        x_min, x_max, y_min, y_max = robot.get_zone_limits()
+        reach = self.boundary_buffer - CONTACT_RADIUS
+        return (x_min + reach <= px <= x_max - reach and
+                y_min + reach <= py <= y_max - reach)
+
+    def interception_margin(self, ball, receiver, opponents):
+        """
+        Smallest lead in ticks the ball holds over any opponent along the pass.
+
+        Negative means some opponent reaches the path first; inf means no
+        opponent can reach it at all.
+        """
+        dx = receiver.x - ball.x
+        dy = receiver.y - ball.y
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return float('inf')
+        ux = dx / length
+        uy = dy / length
+
+        path_length = min(length, self.rest_distance)
+        end_x = ball.x + ux * path_length
+        end_y = ball.y + uy * path_length
+        stops_short = length > self.rest_distance
+        if stops_short:
+            receiver_ticks = ReachabilityTable.for_speed(receiver.speed, self.kinematics).ticks_to_reach(receiver, end_x, end_y)
+            end_ticks = max(ball_ticks(path_length, self.kick_power), receiver_ticks)
+        else:
+            end_ticks = ball_ticks(path_length, self.kick_power)
+
+        # Opponents further from the path than they can walk during the whole roll are skipped
+        min_x, max_x = min(ball.x, end_x), max(ball.x, end_x)
+        min_y, max_y = min(ball.y, end_y), max(ball.y, end_y)
+
+        samples = max(1, int(path_length // self.sample_spacing))
+        margin = float('inf')
+        for opponent in opponents:
+            if is_fallen(opponent):
+                continue
+            reach = end_ticks * opponent.speed / TICKS_PER_SECOND + CONTACT_RADIUS
+            if not (min_x - reach <= opponent.x <= max_x + reach and
+                    min_y - reach <= opponent.y <= max_y + reach):
+                continue
+
+            table = ReachabilityTable.for_speed(opponent.speed, self.kinematics)
+            for i in range(1, samples + 1):
+                s = path_length * i / samples
+                px = ball.x + ux * s
+                py = ball.y + uy * s
+                if not self.can_stand_at(opponent, px, py):
+                    continue
+                arrival = end_ticks if i == samples else ball_ticks(s, self.kick_power)
+                lead = table.ticks_to_reach(opponent, px, py) - arrival
+                if lead < margin:
+                    margin = lead
+        return margin
+
+    def is_intercepted(self, ball, receiver, opponents):
+        return self.interception_margin(ball, receiver, opponents) < 0
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from behavior_params import team_params
+
+STORE_FILE = 'simulation_results.sqlite'
+
+# Modules whose source decides match outcomes; editing any of them changes engine_version()
+ENGINE_MODULES = ('twoD', 'policy', 'collision_handler', 'kinematics', 'kernels', 'contact', 'passing_strategy',
+                  'reachability', 'threat_field', 'field', 'events', 'behavior_params', 'random_streams',
+                  'match_stats', 'sim_clock')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    engine_version TEXT NOT NULL,
+    formation TEXT NOT NULL,
+    param_hash TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    coarse_ticks INTEGER NOT NULL,
+    red_score INTEGER NOT NULL,
+    blue_score INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    stats TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS results_key
+    ON results (engine_version, formation, param_hash, seed, coarse_ticks);
+CREATE INDEX IF NOT EXISTS results_formation ON results (formation, param_hash);
+"""
+
+_engine_version = None
+
+
+def engine_version():
+    """Short hash of the engine's source, so results from an older engine are never reused"""
+    global _engine_version
+    if _engine_version is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha1()
+        for module in ENGINE_MODULES:
+            with open(os.path.join(here, module + '.py'), 'rb') as f:
+                digest.update(f.read())
+        _engine_version = digest.hexdigest()[:12]
+    return _engine_version
+
+
+def params_json(params=None):
+    """Canonical JSON of the per-team behaviour params a simulation would use"""
+    return json.dumps({team: p._asdict() for team, p in team_params(params).items()}, sort_keys=True)
+
+
+def param_hash(params=None):
+    return hashlib.sha1(params_json(params).encode()).hexdigest()[:16]
+
+
+def formation_key(formation):
+    return '-'.join(str(int(n)) for n in formation)
+
+
+class ResultStore:
+    """
+    Append-only SQLite store of finished matches.
+
+    A match is keyed by engine version, formation, parameter hash, seed
+    (as in FootballSimulation(seed=...)) and coarse step size; results
+    with a key already stored are never overwritten, so repeated
+    experiments can look results up instead of re-simulating them.
+    """
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def key(self, formation, seed, params=None, coarse_ticks=None):
+        if coarse_ticks is None:
+            from twoD import COARSE_TICKS
+            coarse_ticks = COARSE_TICKS
+        return (engine_version(), formation_key(formation), param_hash(params), int(seed), coarse_ticks)
+
+    def lookup(self, key):
+        """The stored row for `key` as a dict, or None"""
+        row = self.connection.execute(
+            'SELECT * FROM results WHERE engine_version = ? AND formation = ? AND param_hash = ? '
+            'AND seed = ? AND coarse_ticks = ?', key).fetchone()
+        return _row_dict(row) if row is not None else None
+
+    def add(self, key, red_score, blue_score, params=None, stats=None):
+        """Store one match; False if `key` was already stored"""
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT OR IGNORE INTO results (created, engine_version, formation, param_hash, seed, '
+                'coarse_ticks, red_score, blue_score, params, stats) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (time.time(), *key, red_score, blue_score, params_json(params), json.dumps(stats or {})))
+        return cursor.rowcount == 1
+
+    def query(self, formation=None, params=None, any_engine=False):
+        """Stored matches, optionally of one formation and parameter set, from this engine unless `any_engine`"""
+        clauses, values = [], []
+        if not any_engine:
+            clauses.append('engine_version = ?')
+            values.append(engine_version())
+        if formation is not None:
+            clauses.append('formation = ?')
+            values.append(formation_key(formation))
+        if params is not None:
+            clauses.append('param_hash = ?')
+            values.append(param_hash(params))
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return [_row_dict(row) for row in
+                self.connection.execute(f'SELECT * FROM results{where} ORDER BY formation, param_hash, seed', values)]
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+def _row_dict(row):
+    result = dict(row)
+    result['params'] = json.loads(result['params'])
+    result['stats'] = json.loads(result['stats'])
+    return result
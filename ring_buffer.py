@@ -0,0 +1,56 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity history of numeric rows, e.g. (x, y) positions.
+
+    Appending is O(1) and overwrites the oldest row once the buffer is full,
+    so memory stays constant however long a session runs. Iteration goes
+    from oldest to newest; `array()` returns the rows in that order as one
+    numpy array, ready for a single pygame.draw.lines call.
+    """
+    def __init__(self, capacity, width=2, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self.data = np.zeros((capacity, width), dtype=dtype)
+        self.start = 0
+        self.size = 0
+
+    def append(self, row):
+        end = self.start + self.size
+        if end >= self.capacity:
+            end -= self.capacity
+        self.data[end] = row
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = end + 1 if end + 1 < self.capacity else 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        """Row `index` counted from the oldest; negative indices count from the newest"""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("RingBuffer index out of range")
+        return tuple(self.data[(self.start + index) % self.capacity].tolist())
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+    def with_age(self):
+        """Yield (age, row) from oldest to newest; the newest row has age 0"""
+        for i in range(self.size):
+            yield self.size - 1 - i, self[i]
+
+    def array(self):
+        """Rows from oldest to newest as a (len, width) array"""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return self.data[self.start:end]
+        return np.concatenate((self.data[self.start:], self.data[:end - self.capacity]))
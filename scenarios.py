@@ -0,0 +1,223 @@
+import copy
+import json
+import math
+import os
+from field import f_length, f_width
+
+TEAM_ROLE_COLORS = {
+    ('red', 'goalkeeper'): (255, 0, 0),
+    ('red', 'defender'): (255, 100, 0),
+    ('red', 'attacker'): (255, 50, 0),
+    ('blue', 'goalkeeper'): (0, 0, 255),
+    ('blue', 'defender'): (0, 100, 255),
+    ('blue', 'attacker'): (0, 150, 255),
+}
+GAME_STATES = ('playing', 'throw_in', 'corner_kick', 'goal_kick')
+
+# Scenario format (JSON). Only "players" is required; angles are in degrees.
+#
+# {
+#   "name": "crowded_box",
+#   "description": "free text",
+#   "players": [{"team": "red", "role": "attacker", "x": 700, "y": 300,
+#                "facing": 0, "home": [400, 300], "fallen": false}, ...],
+#   "ball": {"x": 720, "y": 300, "vx": 0, "vy": 0, "last_touch_team": "red",
+#            "last_touch_player": 3},  (index into "players"; its team is the default last_touch_team)
+#   "game_state": "playing",          (or a restart: "throw_in", "corner_kick", "goal_kick")
+#   "restart": {"team": "blue", "position": [450, 40]},
+#   "score": {"red": 0, "blue": 0},
+#   "elapsed": 0
+# }
+
+
+def _kickoff_players(red_def, red_att, blue_def, blue_att):
+    """Same layout as FootballSimulation.initialize_players"""
+    players = [{'team': 'red', 'role': 'goalkeeper', 'x': 50, 'y': f_width // 2}]
+    players += [{'team': 'red', 'role': 'defender', 'x': 200 + (i + 1) * 50, 'y': (i + 1) * (f_width // (red_def + 1))}
+                for i in range(red_def)]
+    players += [{'team': 'red', 'role': 'attacker', 'x': 400, 'y': (i + 1) * (f_width // (red_att + 1))}
+                for i in range(red_att)]
+    players += [{'team': 'blue', 'role': 'goalkeeper', 'x': 850, 'y': f_width // 2}]
+    players += [{'team': 'blue', 'role': 'defender', 'x': 700, 'y': (i + 1) * (f_width // (blue_def + 1))}
+                for i in range(blue_def)]
+    players += [{'team': 'blue', 'role': 'attacker', 'x': 600, 'y': (i + 1) * (f_width // (blue_att + 1))}
+                for i in range(blue_att)]
+    return players
+
+
+def _moved(players, positions, facing=None):
+    """Copy of `players` with robots moved to `positions`, keeping kickoff spots as home"""
+    moved = []
+    for player, (x, y) in zip(players, positions):
+        player = dict(player, home=[player['x'], player['y']], x=x, y=y)
+        if facing is not None:
+            player['facing'] = facing
+        moved.append(player)
+    return moved
+
+
+_KICKOFF = _kickoff_players(2, 1, 2, 1)
+
+SCENARIO_LIBRARY = {
+    'kickoff': {
+        'description': "Standard 2-1 v 2-1 kickoff",
+        'players': _KICKOFF,
+        'ball': {'x': f_length // 2, 'y': f_width // 2},
+    },
+    'crowded_box': {
+        'description': "Red attacker on the ball at the edge of a packed blue penalty area",
+        'players': _moved(_KICKOFF, [(50, 300), (380, 200), (420, 400), (690, 300),
+                                     (850, 300), (730, 260), (740, 340), (720, 200)]),
+        'ball': {'x': 702, 'y': 300, 'last_touch_team': 'red', 'last_touch_player': 3},
+    },
+    'counter_attack': {
+        'description': "Blue attacker breaks from halfway with the red defence caught high",
+        'players': _moved(_KICKOFF, [(50, 300), (430, 220), (440, 380), (600, 300),
+                                     (850, 300), (700, 200), (700, 400), (430, 300)], facing=180),
+        'ball': {'x': 418, 'y': 300, 'vx': -1.5, 'vy': 0, 'last_touch_team': 'blue', 'last_touch_player': 7},
+    },
+    'goalmouth_scramble': {
+        'description': "Loose ball in front of the red goal with attackers and defenders converging",
+        'players': _moved(_KICKOFF, [(60, 300), (230, 260), (240, 350), (420, 300),
+                                     (850, 300), (680, 200), (690, 400), (150, 320)]),
+        'ball': {'x': 120, 'y': 300, 'vx': -0.5, 'vy': 0.2},
+    },
+    'fallen_defenders': {
+        'description': "Both red defenders down after a collision while blue attacks",
+        'players': [dict(p, fallen=True) if p['team'] == 'red' and p['role'] == 'defender' else p
+                    for p in _moved(_KICKOFF, [(50, 300), (300, 280), (310, 300), (400, 300),
+                                               (850, 300), (700, 200), (700, 400), (350, 300)])],
+        'ball': {'x': 335, 'y': 300, 'last_touch_team': 'blue', 'last_touch_player': 7},
+    },
+    'attacking_throw_in': {
+        'description': "Red throw-in on the left touchline level with the blue penalty area",
+        'players': _moved(_KICKOFF, [(50, 300), (350, 200), (400, 400), (650, 80),
+                                     (850, 300), (720, 150), (720, 380), (500, 250)]),
+        'ball': {'x': 680, 'y': 40, 'last_touch_team': 'blue', 'last_touch_player': 5},
+        'game_state': 'throw_in',
+        'restart': {'team': 'red', 'position': [680, 40]},
+    },
+}
+
+
+def load_scenario(source):
+    """
+    Return a normalised copy of a scenario given as a dict, a library name or a JSON file path.
+
+    Missing optional fields get their defaults: facing 0, home at the
+    starting spot, ball at rest in the centre and untouched, play in
+    progress from 0-0.
+    """
+    if isinstance(source, dict):
+        scenario = copy.deepcopy(source)
+    elif source in SCENARIO_LIBRARY:
+        scenario = copy.deepcopy(SCENARIO_LIBRARY[source])
+        scenario.setdefault('name', source)
+    else:
+        with open(source) as f:
+            scenario = json.load(f)
+        scenario.setdefault('name', os.path.splitext(os.path.basename(source))[0])
+
+    if not scenario.get('players'):
+        raise ValueError("Scenario must list at least one player")
+    for player in scenario['players']:
+        if (player.get('team'), player.get('role')) not in TEAM_ROLE_COLORS:
+            raise ValueError(f"Unknown team/role in scenario player: {player}")
+        player.setdefault('facing', 0)
+        player.setdefault('home', [player['x'], player['y']])
+        player.setdefault('fallen', False)
+
+    ball = scenario.setdefault('ball', {})
+    ball.setdefault('x', f_length // 2)
+    ball.setdefault('y', f_width // 2)
+    ball.setdefault('vx', 0)
+    ball.setdefault('vy', 0)
+    ball.setdefault('last_touch_player', None)
+    toucher = ball['last_touch_player']
+    if toucher is not None:
+        if not 0 <= toucher < len(scenario['players']):
+            raise ValueError(f"Ball last_touch_player {toucher} is not a scenario player")
+        ball.setdefault('last_touch_team', scenario['players'][toucher]['team'])
+        if ball['last_touch_team'] != scenario['players'][toucher]['team']:
+            raise ValueError(f"Ball last_touch_player {toucher} is not on team {ball['last_touch_team']}")
+    ball.setdefault('last_touch_team', None)
+
+    scenario.setdefault('name', 'custom')
+    scenario.setdefault('game_state', 'playing')
+    if scenario['game_state'] not in GAME_STATES:
+        raise ValueError(f"Unknown game state: {scenario['game_state']}")
+    if scenario['game_state'] != 'playing' and 'restart' not in scenario:
+        raise ValueError(f"A {scenario['game_state']} scenario needs a 'restart' entry with team and position")
+    scenario.setdefault('score', {'red': 0, 'blue': 0})
+    scenario.setdefault('elapsed', 0)
+    return scenario
+
+
+def save_scenario(scenario, path):
+    with open(path, 'w') as f:
+        json.dump(load_scenario(scenario), f, indent=2)
+
+
+def apply_scenario(simulation, source):
+    """Replace the robots, ball and game state of `simulation` with a scenario"""
+    from twoD import Player
+
+    scenario = load_scenario(source)
+    players = []
+    for spec in scenario['players']:
+        player = Player(spec['x'], spec['y'], spec['team'], TEAM_ROLE_COLORS[(spec['team'], spec['role'])],
+                        spec['role'], time_fn=simulation.time_fn, verbose=simulation.verbose,
+                        params=simulation.team_params[spec['team']], streams=simulation.streams)
+        player.original_x, player.original_y = spec['home']
+        player.facing_angle = math.radians(spec['facing'])
+        player.set_all_players_accessor(lambda: simulation.players)
+        player.kinematics = simulation.kinematics
+        players.append(player)
+    simulation.players = players
+    for player, spec in zip(players, scenario['players']):
+        if spec['fallen']:
+            player.fall_recovery.fall_down()
+
+    ball = scenario['ball']
+    simulation.ball.reset(ball['x'], ball['y'])
+    simulation.ball.velocity_x = ball['vx']
+    simulation.ball.velocity_y = ball['vy']
+    simulation.ball.last_touch_team = ball['last_touch_team']
+    simulation.ball.last_touch_player = None if ball['last_touch_player'] is None else players[ball['last_touch_player']]
+
+    simulation.red_score = scenario['score']['red']
+    simulation.blue_score = scenario['score']['blue']
+    simulation.start_time = simulation.time_fn() - scenario['elapsed']
+    simulation.game_state = scenario['game_state']
+    if scenario['game_state'] != 'playing':
+        restart = scenario['restart']
+        simulation.start_restart(scenario['game_state'], restart['team'], tuple(restart['position']))
+    if simulation.stats is not None:
+        simulation.stats = type(simulation.stats)(players, simulation.stats.dt)
+        if scenario['game_state'] != 'playing':
+            simulation.stats.clear_pending_pass(scenario['restart']['team'])
+    simulation.scenario = scenario
+    return simulation
+
+
+def scenario_from_simulation(simulation, name='snapshot'):
+    """Capture the current state of `simulation` as a scenario dict"""
+    ball = simulation.ball
+    scenario = {
+        'name': name,
+        'players': [{
+            'team': p.team, 'role': p.player_type, 'x': p.x, 'y': p.y,
+            'facing': math.degrees(p.facing_angle), 'home': [p.original_x, p.original_y],
+            'fallen': p.fall_recovery.is_recovering(),
+        } for p in simulation.players],
+        'ball': {'x': ball.x, 'y': ball.y, 'vx': ball.velocity_x, 'vy': ball.velocity_y,
+                 'last_touch_team': ball.last_touch_team,
+                 'last_touch_player': next((i for i, p in enumerate(simulation.players)
+                                            if p is ball.last_touch_player), None)},
+        'game_state': simulation.game_state,
+        'score': {'red': simulation.red_score, 'blue': simulation.blue_score},
+        'elapsed': simulation.time_fn() - simulation.start_time,
+    }
+    if simulation.game_state != 'playing':
+        scenario['restart'] = {'team': simulation.throw_in_team, 'position': list(simulation.throw_in_position)}
+    return scenario
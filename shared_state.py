@@ -0,0 +1,231 @@
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from policy import TEAMS, ROLES
+
+MAX_ROBOTS = 8
+IDLE, RUNNING, DONE = 0, 1, 2
+
+ROBOT_DTYPE = np.dtype([
+    ('x', 'f8'), ('y', 'f8'), ('vx', 'f8'), ('vy', 'f8'), ('facing_angle', 'f8'),
+    ('team', 'i1'), ('role', 'i1'), ('is_fallen', '?'), ('is_active_pursuer', '?'),
+])
+
+# One live match per slot; robot velocities are px per tick averaged since the previous publish, like the ball's
+SLOT_DTYPE = np.dtype([
+    ('status', 'i1'), ('worker', 'i4'), ('game', 'i8'), ('tick', 'i8'), ('sim_time', 'f8'),
+    ('wall_time', 'f8'), ('formation', 'i1', 4), ('red_score', 'i4'), ('blue_score', 'i4'),
+    ('collisions', 'i4'), ('game_over', '?'), ('num_robots', 'i1'),
+    ('ball', 'f8', 4), ('robots', ROBOT_DTYPE, MAX_ROBOTS),
+])
+
+RESULT_DTYPE = np.dtype([
+    ('game', 'i8'), ('formation', 'i1', 4), ('seed', 'i8'), ('red_score', 'i4'),
+    ('blue_score', 'i4'), ('collisions', 'i4'), ('ticks', 'i8'), ('done', '?'),
+])
+
+
+class SweepFailed(RuntimeError):
+    """A sweep worker died; `results` holds the rows of the games that did finish"""
+
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+class SharedArray:
+    """
+    A numpy array living in a named multiprocessing.shared_memory block.
+
+    The creating process owns the block and must `unlink` it; other
+    processes `attach` through the picklable `spec` and only `close` it.
+    """
+    def __init__(self, shape, dtype, name=None):
+        self.shape = shape if isinstance(shape, tuple) else (shape,)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.memory.buf)
+        if self.owner:
+            self.array[...] = np.zeros((), dtype=self.dtype)
+
+    @property
+    def spec(self):
+        return (self.shape, self.dtype, self.memory.name)
+
+    @classmethod
+    def attach(cls, spec):
+        shape, dtype, name = spec
+        return cls(shape, dtype, name)
+
+    def close(self):
+        del self.array
+        self.memory.close()
+
+    def unlink(self):
+        self.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class MatchSlot:
+    """Writes one simulation's live state into slot `index` of a SLOT_DTYPE array"""
+
+    def __init__(self, board, index, worker=0, publish_every=1):
+        self.board = board
+        self.index = index
+        self.publish_every = publish_every
+        self.robots = board['robots'][index]
+        self.ball = board['ball'][index]
+        board['worker'][index] = worker
+
+    def start(self, simulation, game=0, formation=(0, 0, 0, 0)):
+        board, i = self.board, self.index
+        board['game'][i] = game
+        board['formation'][i] = formation
+        board['tick'][i] = 0
+        board['game_over'][i] = False
+        board['num_robots'][i] = len(simulation.players)
+        board['status'][i] = RUNNING
+        # Clear the previous game's robots, so the first velocities are zero rather than a jump between games
+        self.robots[...] = np.zeros((), dtype=ROBOT_DTYPE)
+        for row, p in zip(self.robots, simulation.players[:MAX_ROBOTS]):
+            row['x'] = p.x
+            row['y'] = p.y
+        self.ticks = self.written = simulation.ticks
+        self.write(simulation)
+
+    def publish(self, simulation):
+        """Called by FootballSimulation.step after every step, which may cover several ticks"""
+        previous = self.ticks
+        self.ticks = simulation.ticks
+        if self.ticks // self.publish_every != previous // self.publish_every or simulation.game_over:
+            self.write(simulation)
+
+    def write(self, simulation):
+        board, i = self.board, self.index
+        robots = self.robots
+        elapsed = max(1, self.ticks - self.written)
+        self.written = self.ticks
+        for j, p in enumerate(simulation.players[:MAX_ROBOTS]):
+            row = robots[j]
+            row['vx'] = (p.x - row['x']) / elapsed
+            row['vy'] = (p.y - row['y']) / elapsed
+            row['x'] = p.x
+            row['y'] = p.y
+            row['facing_angle'] = p.facing_angle
+            row['team'] = TEAMS.index(p.team)
+            row['role'] = ROLES.index(p.player_type)
+            row['is_fallen'] = p.fall_recovery.is_recovering()
+            row['is_active_pursuer'] = p.is_active_pursuer
+        ball = simulation.ball
+        self.ball[:] = (ball.x, ball.y, ball.velocity_x, ball.velocity_y)
+        board['tick'][i] = self.ticks
+        board['sim_time'][i] = simulation.time_fn() - simulation.start_time
+        board['wall_time'][i] = time.time()
+        board['red_score'][i] = simulation.red_score
+        board['blue_score'][i] = simulation.blue_score
+        board['collisions'][i] = simulation.collision_handler.get_collision_count()
+        board['game_over'][i] = simulation.game_over
+
+    def finish(self, simulation):
+        self.write(simulation)
+        self.board['status'][self.index] = DONE
+
+
+def format_board(board):
+    """One line per slot; enough for a terminal dashboard over a whole sweep"""
+    lines = []
+    for slot in board:
+        state = ('idle', 'running', 'done')[slot['status']]
+        lines.append(f"worker {slot['worker']:>3} game {slot['game']:>6} {state:<7} "
+                     f"t={slot['sim_time']:6.1f}s  Red {slot['red_score']} - {slot['blue_score']} Blue  "
+                     f"collisions {slot['collisions']}")
+    return "\n".join(lines)
+
+
+def _sweep_worker(worker, jobs, board_spec, results_spec, publish_every):
+    # Imported here so the coordinator doesn't pay for the engine import
+    from twoD import FootballSimulation
+
+    board = SharedArray.attach(board_spec)
+    results = SharedArray.attach(results_spec)
+    try:
+        slot = MatchSlot(board.array, worker, worker, publish_every)
+        for game, formation, seed in jobs:
+            simulation = FootballSimulation(*formation, headless=True, seed=seed)
+            simulation.state_slot = slot
+            slot.start(simulation, game, formation)
+            while not simulation.game_over:
+                simulation.step()
+            slot.finish(simulation)
+
+            row = results.array[game]
+            row['game'] = game
+            row['formation'] = formation
+            row['seed'] = seed
+            row['red_score'] = simulation.red_score
+            row['blue_score'] = simulation.blue_score
+            row['collisions'] = simulation.collision_handler.get_collision_count()
+            row['ticks'] = slot.ticks
+            row['done'] = True
+    finally:
+        board.close()
+        results.close()
+
+
+def run_shared_sweep(formations, games_per_formation, num_workers=None, seed=0,
+                     publish_every=10, monitor=None, monitor_interval=1.0, telemetry=None):
+    """
+    Play every formation `games_per_formation` times across worker processes.
+
+    Workers publish live match state into a shared board and write results
+    straight into a shared RESULT_DTYPE array, so nothing but the job list is
+    pickled. `monitor(board)` is called every `monitor_interval` seconds with
+    the live board while the sweep runs, and a telemetry.SweepTelemetry
+    passed as `telemetry` is updated just as often. Returns a copy of the
+    results; if a worker dies, raises SweepFailed carrying the finished rows.
+    """
+    jobs = [(game, tuple(formation), seed + game)
+            for game, formation in enumerate(f for f in formations for _ in range(games_per_formation))]
+    num_workers = max(1, min(num_workers or mp.cpu_count(), len(jobs)))
+
+    board = SharedArray(num_workers, SLOT_DTYPE)
+    results = SharedArray(len(jobs), RESULT_DTYPE)
+    board.array['worker'] = np.arange(num_workers)
+    if telemetry is not None:
+        telemetry.start(len(jobs))
+    try:
+        processes = []
+        for worker in range(num_workers):
+            process = mp.Process(target=_sweep_worker, daemon=True,
+                                 args=(worker, jobs[worker::num_workers], board.spec, results.spec, publish_every))
+            process.start()
+            processes.append(process)
+
+        while any(p.is_alive() for p in processes):
+            if monitor is not None:
+                monitor(board.array)
+            if telemetry is not None:
+                telemetry.observe_sweep(board.array, results.array)
+            for p in processes:
+                p.join(timeout=monitor_interval / len(processes))
+        if monitor is not None:
+            monitor(board.array)
+        if telemetry is not None:
+            telemetry.observe_sweep(board.array, results.array)
+        finished = results.array[results.array['done']].copy()
+        failed = [worker for worker, p in enumerate(processes) if p.exitcode != 0]
+        if failed or len(finished) < len(jobs):
+            raise SweepFailed(f"Worker(s) {failed} exited abnormally; {len(jobs) - len(finished)} of {len(jobs)} "
+                              f"games unfinished", finished)
+        return finished
+    finally:
+        board.unlink()
+        results.unlink()
@@ -0,0 +1,17 @@
+class SimClock:
+    """
+    Simulated time source for headless matches.
+
+    Called like `time.time`, but only moves when the simulation ticks, so
+    turn times, fall recovery and the match length are measured in game
+    seconds regardless of how fast the machine runs the loop.
+    """
+    def __init__(self, dt=1 / 60):
+        self.dt = dt
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def tick(self):
+        self.now += self.dt
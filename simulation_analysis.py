@@ -1,99 +1,129 @@
-import pandas as pd
-from itertools import combinations_with_replacement
-import pygame
-import sys
-import os
-from twoD import *
+from twoD import FootballSimulation
 
-# Redirect pygame output to devnull to suppress hello message
-os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+RESULTS_FILE = 'simulation_results_GK_Strstegy.xlsx'
 
 
-def run_multiple_games(red_def, red_att, blue_def, blue_att, num_games=50):
+def play_games(red_def, red_att, blue_def, blue_att, num_games=50, seed=None, backend='python', telemetry=None,
+               params=None, store=None):
+    """
+    Play `num_games` headless matches of one formation; one result dict per game.
+
+    With a `seed`, game i is seeded with seed + i, so any game can be
+    replayed on its own (see `cli.py replay`), and seeded games already in
+    a result_store.ResultStore `store` are read back instead of played.
+    Progress is reported to an optional telemetry.SweepTelemetry as worker 0.
+    """
+    formation = (red_def, red_att, blue_def, blue_att)
+    if telemetry is not None:
+        telemetry.start(num_games)
     results = []
-    
-    print(f"Running {num_games} games with:")
-    print(f"Red team: {red_def} defenders, {red_att} attackers")
-    print(f"Blue team: {blue_def} defenders, {blue_att} attackers")
-    
+    cached = 0
     for game in range(num_games):
         print(f"Running game {game + 1}/{num_games}", end='\r')
-        
-        # Initialize simulation
-        simulation = FootballSimulation(red_defenders=red_def, red_attackers=red_att,
-                                      blue_defenders=blue_def, blue_attackers=blue_att)
-        
-        # Run without visual display for speed
-        pygame.display.set_mode((f_length, f_width), flags=pygame.HIDDEN)
-        
-        # Run single game
-        while not simulation.game_over:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-            
-            if time.time() - simulation.start_time >= GAME_DURATION:
-                simulation.game_over = True
-            
-            simulation.update_pursuers()
-            for player in simulation.players:
-                player.move(simulation.ball, simulation.players)
-            
-            simulation.ball.move()
-            if simulation.ball.is_ball_stuck():
-                simulation.reset_after_goal()
-            simulation.check_goal()
-            
-            simulation.clock.tick(120)
-        
+        game_seed = None if seed is None else seed + game
+        key = stored = None
+        if game_seed is not None and store is not None:
+            key = store.key(formation, game_seed, params)
+            stored = store.lookup(key)
+
+        if stored is not None:
+            cached += 1
+            red_score, blue_score, stats = stored['red_score'], stored['blue_score'], stored['stats']
+        else:
+            simulation = FootballSimulation(red_defenders=red_def, red_attackers=red_att,
+                                            blue_defenders=blue_def, blue_attackers=blue_att,
+                                            headless=True, collect_stats=True, backend=backend, params=params,
+                                            seed=game_seed)
+            while not simulation.game_over:
+                simulation.step()
+                if telemetry is not None:
+                    telemetry.worker_progress(0, game, simulation.ticks)
+            red_score, blue_score, stats = simulation.red_score, simulation.blue_score, simulation.stats.row()
+            if key is not None:
+                store.add(key, red_score, blue_score, params, stats)
+        if telemetry is not None:
+            telemetry.worker_progress(0, game, stats['ticks'], running=False)
+            telemetry.game_finished(formation, red_score, blue_score)
+
         # Record results
-        winner = "Red" if simulation.red_score > simulation.blue_score else "Blue"
-        if simulation.red_score == simulation.blue_score:
+        winner = "Red" if red_score > blue_score else "Blue"
+        if red_score == blue_score:
             winner = "Draw"
-            
+
         results.append({
             'game_number': game + 1,
+            'seed': game_seed,
             'red_defenders': red_def,
             'red_attackers': red_att,
             'blue_defenders': blue_def,
             'blue_attackers': blue_att,
-            'red_score': simulation.red_score,
-            'blue_score': simulation.blue_score,
-            'winner': winner
+            'red_score': red_score,
+            'blue_score': blue_score,
+            'winner': winner,
+            **stats
         })
-    
-    # Create DataFrame and save to Excel
-    df = pd.DataFrame(results)
-    filename = 'simulation_results_GK_Strstegy.xlsx'
-    
-    # Calculate summary statistics
-    summary = {
-        'Total Games': len(df),
-        'Red Wins': (df['winner'] == 'Red').sum(),
-        'Blue Wins': (df['winner'] == 'Blue').sum(),
-        'Draws': (df['winner'] == 'Draw').sum(),
-        'Average Red Score': df['red_score'].mean(),
-        'Average Blue Score': df['blue_score'].mean()
+    if cached:
+        print(f"\n{cached} of {num_games} games read from {store.path}")
+    return results
+
+
+def summarize(results):
+    games = len(results)
+    return {
+        'Total Games': games,
+        'Red Wins': sum(1 for r in results if r['winner'] == 'Red'),
+        'Blue Wins': sum(1 for r in results if r['winner'] == 'Blue'),
+        'Draws': sum(1 for r in results if r['winner'] == 'Draw'),
+        'Average Red Score': sum(r['red_score'] for r in results) / games,
+        'Average Blue Score': sum(r['blue_score'] for r in results) / games,
     }
-    
-    summary_df = pd.DataFrame([summary])
-    
-    # Save both detailed results and summary to Excel
-    with pd.ExcelWriter(filename) as writer:
-        df.to_excel(writer, sheet_name='Detailed Results', index=False)
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-    
-    print(f"\nResults saved to {filename}")
-    
-    # Print summary
+
+
+def print_summary(summary):
     print("\nSummary of Results:")
     print(f"Red Wins: {summary['Red Wins']} ({summary['Red Wins']/summary['Total Games']*100:.1f}%)")
     print(f"Blue Wins: {summary['Blue Wins']} ({summary['Blue Wins']/summary['Total Games']*100:.1f}%)")
     print(f"Draws: {summary['Draws']} ({summary['Draws']/summary['Total Games']*100:.1f}%)")
     print(f"Average Score - Red: {summary['Average Red Score']:.2f}, Blue: {summary['Average Blue Score']:.2f}")
 
+
+def save_results(results, filename=RESULTS_FILE):
+    """
+    Write the detailed results and their summary to Excel; the only place pandas is needed.
+
+    Position heatmaps, when collected, are summed over the games into their
+    own sheet: one row per robot and HEATMAP_CELL column, one column per row
+    of cells.
+    """
+    import numpy as np
+    import pandas as pd
+
+    heatmaps = [r['heatmap'] for r in results if 'heatmap' in r]
+    detailed = [{k: v for k, v in r.items() if k != 'heatmap'} for r in results]
+    with pd.ExcelWriter(filename) as writer:
+        pd.DataFrame(detailed).to_excel(writer, sheet_name='Detailed Results', index=False)
+        pd.DataFrame([summarize(results)]).to_excel(writer, sheet_name='Summary', index=False)
+        if heatmaps:
+            total = np.sum(heatmaps, axis=0)
+            robots, columns, rows = total.shape
+            index = pd.MultiIndex.from_product([range(robots), range(columns)], names=['robot', 'x_cell'])
+            pd.DataFrame(total.reshape(robots * columns, rows), index=index).to_excel(writer, sheet_name='Heatmap')
+    print(f"\nResults saved to {filename}")
+
+
+def run_multiple_games(red_def, red_att, blue_def, blue_att, num_games=50, seed=None, filename=RESULTS_FILE,
+                       store=None):
+    print(f"Running {num_games} games with:")
+    print(f"Red team: {red_def} defenders, {red_att} attackers")
+    print(f"Blue team: {blue_def} defenders, {blue_att} attackers")
+
+    results = play_games(red_def, red_att, blue_def, blue_att, num_games, seed, store=store)
+    if filename:
+        save_results(results, filename)
+    print_summary(summarize(results))
+    return results
+
 # Example usage
 if __name__ == "__main__":
     # You can change these values to whatever combination you want to test
-    run_multiple_games(red_def=2, red_att=1, blue_def=2, blue_att=1, num_games=20)
\ No newline at end of file
+    run_multiple_games(red_def=2, red_att=1, blue_def=2, blue_att=1, num_games=20)
@@ -0,0 +1,169 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from paired_eval import Z_95
+
+FORMATION_COLUMNS = ['red_defenders', 'red_attackers', 'blue_defenders', 'blue_attackers']
+RESULT_COLUMNS = FORMATION_COLUMNS + ['red_score', 'blue_score']
+TOTAL_COLUMNS = ['games', 'red_wins', 'blue_wins', 'draws', 'red_goals', 'blue_goals']
+
+
+def results_to_frame(results):
+    """
+    DataFrame with RESULT_COLUMNS from a shared_state RESULT_DTYPE array or a
+    result DataFrame; rows of games that never finished are dropped.
+    """
+    if isinstance(results, np.ndarray) and results.dtype.names and 'formation' in results.dtype.names:
+        if 'done' in results.dtype.names:
+            results = results[results['done']]
+        frame = pd.DataFrame(results['formation'], columns=FORMATION_COLUMNS)
+        frame['red_score'] = results['red_score']
+        frame['blue_score'] = results['blue_score']
+        return frame
+    if isinstance(results, np.ndarray):
+        return pd.DataFrame(results)[RESULT_COLUMNS]
+    return results[RESULT_COLUMNS]
+
+
+def iter_result_chunks(sources, chunksize=100_000):
+    """
+    Yield result DataFrames of at most `chunksize` rows from each source in turn.
+
+    A source is a DataFrame, a structured numpy array, or a path to a .csv,
+    .parquet, .npy (memory-mapped) or .xlsx file; only Excel files are read
+    whole, since they cannot be streamed.
+    """
+    if isinstance(sources, (str, os.PathLike, np.ndarray, pd.DataFrame)):
+        sources = [sources]
+
+    for source in sources:
+        if isinstance(source, (np.ndarray, pd.DataFrame)):
+            for start in range(0, len(source), chunksize):
+                yield results_to_frame(source[start:start + chunksize])
+            continue
+
+        path = os.fspath(source)
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            for chunk in pd.read_csv(path, usecols=RESULT_COLUMNS, chunksize=chunksize):
+                yield chunk
+        elif extension == '.parquet':
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=RESULT_COLUMNS):
+                yield batch.to_pandas()
+        elif extension == '.npy':
+            array = np.load(path, mmap_mode='r')
+            for start in range(0, len(array), chunksize):
+                yield results_to_frame(np.asarray(array[start:start + chunksize]))
+        elif extension in ('.xlsx', '.xls'):
+            yield results_to_frame(pd.read_excel(path, sheet_name='Detailed Results'))
+        else:
+            raise ValueError(f"Unsupported result file: {path}")
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Vectorized Wilson score interval for binomial proportions"""
+    successes = np.asarray(successes, dtype=float)
+    trials = np.asarray(trials, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = successes / trials
+        denominator = 1 + z ** 2 / trials
+        centre = (p + z ** 2 / (2 * trials)) / denominator
+        half = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return centre - half, centre + half
+
+
+RATE_WIDTH = 22  # a 20 character cell, "100.0% [100.0,100.0]" at its widest, plus a gap
+
+
+def _rate_cell(row, rate):
+    return f"{row[rate] * 100:5.1f}% [{row[rate + '_low'] * 100:5.1f},{row[rate + '_high'] * 100:5.1f}]"
+
+
+class SweepAggregator:
+    """
+    Streaming per-formation aggregates over any number of result chunks.
+
+    Each chunk is reduced with group-bys to counts and sums, which are added
+    into running totals, so memory depends on the number of formations and
+    distinct goal differences, not on the number of games.
+    """
+    def __init__(self):
+        self.totals = None
+        self.goal_differences = None
+
+    def add(self, chunk):
+        chunk = results_to_frame(chunk)
+        difference = chunk['red_score'] - chunk['blue_score']
+        frame = chunk[FORMATION_COLUMNS].assign(
+            games=1,
+            red_wins=(difference > 0).astype(np.int64),
+            blue_wins=(difference < 0).astype(np.int64),
+            draws=(difference == 0).astype(np.int64),
+            red_goals=chunk['red_score'],
+            blue_goals=chunk['blue_score'],
+        )
+        totals = frame.groupby(FORMATION_COLUMNS).sum()
+        self.totals = totals if self.totals is None else self.totals.add(totals, fill_value=0)
+
+        counts = chunk[FORMATION_COLUMNS].assign(goal_difference=difference) \
+            .groupby(FORMATION_COLUMNS + ['goal_difference']).size()
+        self.goal_differences = counts if self.goal_differences is None else \
+            self.goal_differences.add(counts, fill_value=0)
+        return self
+
+    def add_all(self, sources, chunksize=100_000):
+        for chunk in iter_result_chunks(sources, chunksize):
+            self.add(chunk)
+        return self
+
+    def summary(self):
+        """Win/draw/loss rates from red's point of view with 95% Wilson intervals; empty before any chunk"""
+        if self.totals is None:
+            index = pd.MultiIndex.from_tuples([], names=FORMATION_COLUMNS)
+            totals = pd.DataFrame(0, index=index, columns=TOTAL_COLUMNS, dtype=np.int64)
+        else:
+            totals = self.totals.astype(np.int64)
+        games = totals['games']
+        summary = totals.copy()
+        for outcome, rate in (('red_wins', 'red_win_rate'), ('blue_wins', 'blue_win_rate'), ('draws', 'draw_rate')):
+            summary[rate] = totals[outcome] / games
+            summary[rate + '_low'], summary[rate + '_high'] = wilson_interval(totals[outcome], games)
+        summary['average_red_score'] = totals['red_goals'] / games
+        summary['average_blue_score'] = totals['blue_goals'] / games
+        summary['average_goal_difference'] = (totals['red_goals'] - totals['blue_goals']) / games
+        return summary
+
+    def goal_difference_distribution(self):
+        """Share of games at each goal difference, one row per formation"""
+        counts = self.goal_differences.unstack('goal_difference', fill_value=0)
+        return counts.div(counts.sum(axis=1), axis=0)
+
+    def pairwise_matrix(self, value='red_win_rate'):
+        """Red formation (defenders, attackers) against blue formation for one summary column"""
+        return self.summary()[value].unstack(['blue_defenders', 'blue_attackers'])
+
+    def render_report(self):
+        summary = self.summary()
+        lines = [f"{'formation (R def/att v B def/att)':<34}{'games':>8}{'red win':>{RATE_WIDTH}}"
+                 f"{'draw':>{RATE_WIDTH}}{'blue win':>{RATE_WIDTH}}{'avg GD':>8}"]
+        for formation, row in summary.iterrows():
+            label = f"{formation[0]}/{formation[1]} v {formation[2]}/{formation[3]}"
+            lines.append(f"{label:<34}{int(row['games']):>8}{_rate_cell(row, 'red_win_rate'):>{RATE_WIDTH}}"
+                         f"{_rate_cell(row, 'draw_rate'):>{RATE_WIDTH}}{_rate_cell(row, 'blue_win_rate'):>{RATE_WIDTH}}"
+                         f"{row['average_goal_difference']:>8.2f}")
+        if summary.empty:
+            return "\n".join(lines + ["No finished games"])
+        lines.append("")
+        lines.append("Red win rate by red (rows) against blue (columns) formation:")
+        lines.append(self.pairwise_matrix().map(lambda v: '-' if pd.isna(v) else f"{v * 100:.1f}%").to_string())
+        return "\n".join(lines)
+
+
+def analyse(sources, chunksize=100_000):
+    return SweepAggregator().add_all(sources, chunksize)
+
+
+if __name__ == "__main__":
+    print(analyse(sys.argv[1:]).render_report())
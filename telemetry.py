@@ -0,0 +1,263 @@
+import asyncio
+import base64
+import collections
+import hashlib
+import ipaddress
+import json
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+TELEMETRY_PORT = 8765
+RATE_WINDOW = 5.0  # seconds of history behind games/s and ticks/s
+STALL_AFTER = 10.0  # seconds without new ticks before a running worker is reported stalled
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class _Rate:
+    """Rate of a growing count over the last RATE_WINDOW seconds"""
+
+    def __init__(self):
+        self.samples = collections.deque()
+
+    def add(self, now, count):
+        self.samples.append((now, count))
+        while len(self.samples) > 2 and now - self.samples[1][0] >= RATE_WINDOW:
+            self.samples.popleft()
+
+    def per_second(self):
+        if len(self.samples) < 2:
+            return 0.0
+        (t0, c0), (t1, c1) = self.samples[0], self.samples[-1]
+        return (c1 - c0) / (t1 - t0) if t1 > t0 else 0.0
+
+
+class SweepTelemetry:
+    """
+    Live progress of a batch or sweep, safe to update and read from different threads.
+
+    Coordinators report finished games with `game_finished` and per-worker
+    progress with `worker_progress` (or hand run_shared_sweep's board and
+    results to `observe_sweep`); `snapshot` returns everything as a
+    JSON-ready dict.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start(0)
+
+    def start(self, total_games):
+        with self.lock:
+            self.total_games = total_games
+            self.start_time = time.monotonic()
+            self.games_completed = 0
+            self.game_rate = _Rate()
+            self.game_rate.add(self.start_time, 0)
+            self.formations = {}
+            self.workers = {}
+            self.counted = None
+
+    def game_finished(self, formation, red_score, blue_score):
+        now = time.monotonic()
+        key = '-'.join(str(int(n)) for n in formation)
+        with self.lock:
+            self.games_completed += 1
+            self.game_rate.add(now, self.games_completed)
+            row = self.formations.setdefault(key, {'games': 0, 'red_wins': 0, 'blue_wins': 0, 'draws': 0})
+            row['games'] += 1
+            if red_score > blue_score:
+                row['red_wins'] += 1
+            elif blue_score > red_score:
+                row['blue_wins'] += 1
+            else:
+                row['draws'] += 1
+
+    def worker_progress(self, worker, game, ticks, running=True):
+        """Worker `worker` is `ticks` ticks into game `game`"""
+        now = time.monotonic()
+        with self.lock:
+            state = self.workers.get(worker)
+            if state is None:
+                state = self.workers[worker] = {'game': game, 'base': 0, 'ticks': 0, 'rate': _Rate(),
+                                                'changed': now, 'running': running}
+            if game != state['game']:
+                state['base'] += state['ticks']
+                state['game'] = game
+                state['ticks'] = 0
+            if ticks != state['ticks']:
+                state['changed'] = now
+            state['ticks'] = ticks
+            state['running'] = running
+            state['rate'].add(now, state['base'] + ticks)
+
+    def observe_sweep(self, board, results):
+        """Pick up worker progress and newly finished games from run_shared_sweep's shared arrays"""
+        from shared_state import RUNNING
+
+        for slot in board:
+            self.worker_progress(int(slot['worker']), int(slot['game']), int(slot['tick']),
+                                 bool(slot['status'] == RUNNING))
+        if self.counted is None:
+            self.counted = np.zeros(len(results), dtype=bool)
+        for i in np.flatnonzero(results['done'] & ~self.counted):
+            row = results[i]
+            self.game_finished(row['formation'], row['red_score'], row['blue_score'])
+            self.counted[i] = True
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            workers = []
+            for worker, state in sorted(self.workers.items()):
+                idle = now - state['changed']
+                workers.append({'worker': worker, 'game': state['game'], 'ticks': state['ticks'],
+                                'ticks_per_second': round(state['rate'].per_second(), 1),
+                                'stalled': state['running'] and idle >= STALL_AFTER,
+                                'seconds_since_progress': round(idle, 1)})
+            formations = {key: dict(row, red_win_rate=row['red_wins'] / row['games'])
+                          for key, row in self.formations.items()}
+            return {
+                'games_completed': self.games_completed,
+                'total_games': self.total_games,
+                'elapsed': round(now - self.start_time, 1),
+                'games_per_second': round(self.game_rate.per_second(), 3),
+                'workers': workers,
+                'formations': formations,
+            }
+
+
+class TelemetryServer:
+    """
+    Serves a SweepTelemetry over HTTP from an asyncio loop in a background thread.
+
+    GET /stats returns one JSON snapshot; GET /ws upgrades to a websocket
+    that pushes a snapshot every `interval` seconds. Only loopback
+    addresses are accepted for `host`. `port=0` picks a free port, stored
+    in `port` once `start` returns.
+    """
+    def __init__(self, telemetry, host='127.0.0.1', port=TELEMETRY_PORT, interval=1.0):
+        if host != 'localhost' and not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"Telemetry only listens on localhost, not {host!r}")
+        self.telemetry = telemetry
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._serve, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self.server is None:
+            raise OSError(f"Telemetry server could not listen on {self.host}:{self.port}")
+        print(f"Telemetry on http://{self.host}:{self.port}/stats and ws://{self.host}:{self.port}/ws")
+        return self
+
+    def _serve(self, ready):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, family=socket.AF_INET))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError:
+            self.server = None
+            ready.set()
+            return
+        ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    def stop(self):
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+            lines = request.decode('latin-1').split('\r\n')
+            method, path, _ = lines[0].split(' ', 2)
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            if method != 'GET':
+                await self._respond(writer, '405 Method Not Allowed', {'error': 'GET only'})
+            elif path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                await self._stream(reader, writer, headers['sec-websocket-key'])
+            elif path in ('/', '/stats'):
+                await self._respond(writer, '200 OK', self.telemetry.snapshot())
+            else:
+                await self._respond(writer, '404 Not Found', {'error': f"no such endpoint {path}"})
+        except (asyncio.IncompleteReadError, ConnectionError, KeyError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, body):
+        payload = json.dumps(body).encode()
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+        await writer.drain()
+
+    async def _stream(self, reader, writer, key):
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+        await writer.drain()
+        closed = asyncio.ensure_future(_wait_for_close(reader))
+        try:
+            while not closed.done():
+                writer.write(_text_frame(json.dumps(self.telemetry.snapshot())))
+                await writer.drain()
+                await asyncio.wait([closed], timeout=self.interval)
+            writer.write(b'\x88\x00')
+            await writer.drain()
+        finally:
+            closed.cancel()
+
+
+def _text_frame(text):
+    """Unmasked server-to-client websocket text frame"""
+    payload = text.encode()
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x81, n)
+    elif n < 1 << 16:
+        header = struct.pack('!BBH', 0x81, 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x81, 127, n)
+    return header + payload
+
+
+async def _wait_for_close(reader):
+    """Read (and discard) client frames until a close frame or disconnect"""
+    try:
+        while True:
+            first, second = await reader.readexactly(2)
+            length = second & 0x7f
+            if length == 126:
+                length, = struct.unpack('!H', await reader.readexactly(2))
+            elif length == 127:
+                length, = struct.unpack('!Q', await reader.readexactly(8))
+            await reader.readexactly(length + (4 if second & 0x80 else 0))
+            if first & 0x0f == 0x8:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+import pytest
+from contact import CONTACT_SLOP, first_contact, sweep_against_static
+
+
+def test_head_on_contact_fraction():
+    # Gap of 10 closed by 20 px of motion: contact half way through the tick
+    assert first_contact(-15, 0, 20, 0, 5) == pytest.approx(0.5)
+    # Not reached within the tick, or moving apart
+    assert first_contact(-30, 0, 20, 0, 5) is None
+    assert first_contact(-15, 0, -20, 0, 5) is None
+
+
+def test_tangent_pass_touches_and_a_near_miss_does_not():
+    assert first_contact(-10, 5, 20, 0, 5) == pytest.approx(0.5)
+    assert first_contact(-10, 5.01, 20, 0, 5) is None
+
+
+def test_already_overlapping_circles_touch_at_the_start():
+    assert first_contact(3, 0, 20, 0, 5) == 0.0
+    assert first_contact(0, 0, 0, 0, 5) == 0.0
+    assert first_contact(5, 0, 20, 0, 5) == 0.0
+
+
+def test_no_motion_never_makes_contact():
+    assert first_contact(10, 0, 0, 0, 5) is None
+
+
+def circle(x, y):
+    return SimpleNamespace(x=x, y=y)
+
+
+def test_sweep_stops_at_the_nearest_circle_plus_slop():
+    near, far = circle(50, 0), circle(80, 0)
+    t, hit = sweep_against_static(0, 0, 100, 0, [far, near], lambda c: 10)
+    assert hit is near
+    assert t == pytest.approx((40 + CONTACT_SLOP) / 100)
+
+
+def test_sweep_ignores_circles_touched_at_the_start():
+    touching = circle(5, 0)
+    assert sweep_against_static(0, 0, -100, 0, [touching], lambda c: 10) == (None, None)
+    ahead = circle(60, 0)
+    t, hit = sweep_against_static(0, 0, 100, 0, [touching, ahead], lambda c: 10)
+    assert hit is ahead
+
+
+def test_sweep_slop_never_carries_past_the_end_of_the_move():
+    wall = circle(50, 0)
+    assert sweep_against_static(0, 0, 40, 0, [wall], lambda c: 10) == (1.0, wall)
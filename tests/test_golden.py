@@ -0,0 +1,11 @@
+import os
+from golden_traces import check_golden, format_report
+
+# Recorded from this tree with `python cli.py golden record tests/golden --max-ticks 1800`; re-record
+# only when a behaviour change is intended, and say so in the commit
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+
+
+def test_engine_matches_golden_traces():
+    report = check_golden(GOLDEN)
+    assert all(divergence is None for divergence in report.values()), format_report(report)
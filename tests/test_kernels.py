@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import kernels
+from kernels import Backend, kernel_parity, match_parity
+
+
+def test_contact_kernel_matches_swept_test():
+    # The uncompiled kernels against contact.first_contact, so this runs without numba too
+    source = SimpleNamespace(name='source', kinematics_step=kernels.kinematics_step,
+                             kinematics_steps=kernels.batched_kinematics(kernels.kinematics_step),
+                             contact_matrix=kernels.contact_matrix)
+    assert kernel_parity(source, samples=2_000) == 0.0
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        Backend('fortran')
+
+
+def test_auto_backend_falls_back_to_python():
+    backend = Backend('auto')
+    assert backend.name in ('python', 'numba')
+
+
+@pytest.fixture(scope='module')
+def numba_backend():
+    pytest.importorskip('numba')
+    return Backend('numba')
+
+
+def test_compiled_kernels_match_python(numba_backend):
+    assert kernel_parity(numba_backend) < 1e-9
+
+
+def test_compiled_contact_matrix_marks_standing_pairs(numba_backend):
+    previous = np.array([0.0, 0.5, 100.0])
+    contacts = np.zeros((3, 3), dtype=np.bool_)
+    numba_backend.contact_matrix(previous, np.zeros(3), previous, np.zeros(3), np.array([True, True, True]),
+                                 1.5, contacts)
+    assert contacts.tolist() == [[False, True, False], [True, False, False], [False, False, False]]
+
+
+def test_whole_matches_are_identical(numba_backend):
+    rows = match_parity(numba_backend, seeds=range(2))
+    assert all(row['identical'] for row in rows), rows
@@ -0,0 +1,18 @@
+import math
+from scenarios import SCENARIO_LIBRARY
+from twoD import FootballSimulation
+
+
+def test_robot_kicks_in_the_tick_it_reaches_the_ball():
+    players = [dict(p) for p in SCENARIO_LIBRARY['kickoff']['players']]
+    attacker = next(i for i, p in enumerate(players) if p['team'] == 'red' and p['role'] == 'attacker')
+    # Just out of contact, facing the ball, so its first step closes the gap
+    players[attacker].update(x=500, y=300, facing=0, home=[400, 300])
+    simulation = FootballSimulation(2, 1, 2, 1, headless=True, verbose=False, seed=0, coarse_ticks=1,
+                                    collect_stats=True, scenario={'players': players, 'ball': {'x': 517.01, 'y': 300}})
+    robot, ball = simulation.players[attacker], simulation.ball
+    assert math.hypot(robot.x - ball.x, robot.y - ball.y) > robot.radius + ball.radius
+
+    simulation.step()
+    assert math.hypot(ball.velocity_x, ball.velocity_y) > 0
+    assert ball.last_touch_player is robot
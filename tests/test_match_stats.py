@@ -0,0 +1,41 @@
+import random
+import numpy as np
+from behavior_params import BehaviorParams
+from policy import select_kick
+from scenarios import load_scenario
+from twoD import FootballSimulation
+
+
+def play(steps=None, **kwargs):
+    simulation = FootballSimulation(2, 1, 2, 1, headless=True, verbose=False, collect_stats=True, **kwargs)
+    while not simulation.game_over and (steps is None or steps > 0):
+        simulation.step()
+        steps = None if steps is None else steps - 1
+    return simulation
+
+
+def test_attackers_of_both_teams_shoot_in_range():
+    # Red attacker 150 px from the blue goal, blue attacker 150 px from the red goal
+    scenario = load_scenario('kickoff')
+    positions = [(50, 300), (250, 150), (250, 450), (750, 300), (850, 300), (650, 150), (650, 450), (150, 300)]
+    for player, (x, y) in zip(scenario['players'], positions):
+        player['x'], player['y'] = x, y
+    observation = play(0, scenario=scenario).observe()
+    for index in (3, 7):
+        robot = observation.robots[index]
+        _, power, is_shot = select_kick(robot, observation.ball, observation.robots, rng=random.Random(0))
+        assert is_shot and power == BehaviorParams().shot_power, robot.team
+
+
+def test_restart_ticks_are_recorded():
+    simulation = play(500, seed=0, scenario='attacking_throw_in')
+    row = simulation.stats.row()
+    assert row['ticks'] == simulation.ticks
+    assert np.array(row['heatmap']).sum() == simulation.ticks * len(simulation.players)
+    # Red has the throw-in, so it has the ball from the first tick
+    assert row['red_possession_time'] > 0
+
+
+def test_dribble_threshold_follows_behaviour_params():
+    simulation = play(1, params={'red': BehaviorParams(dribble_power=1.2), 'blue': BehaviorParams()})
+    assert simulation.stats.dribble_power == [1.2 if p.team == 'red' else 0.5 for p in simulation.players]
@@ -0,0 +1,78 @@
+import math
+from types import SimpleNamespace
+import pytest
+import paired_eval
+from behavior_params import DEFAULT_PARAMS
+from paired_eval import Config, Z_95, evaluate_configs, independent_comparison, paired_comparison
+
+A = [1, 2, 3, 4]
+B = [0, 2, 2, 2]
+
+
+def test_paired_interval_uses_the_spread_of_the_differences():
+    # Differences 1, 0, 1, 2: mean 1, sample variance 2/3
+    result = paired_comparison(A, B)
+    paired_se = math.sqrt(2 / 3 / 4)
+    assert result['mean_difference'] == 1.0
+    assert result['paired_se'] == pytest.approx(paired_se)
+    assert (result['ci_low'], result['ci_high']) == pytest.approx((1 - Z_95 * paired_se, 1 + Z_95 * paired_se))
+    # Sample variances 5/3 and 1 would give an unpaired variance of (5/3 + 1) / 4
+    assert result['unpaired_se'] == pytest.approx(math.sqrt((5 / 3 + 1) / 4))
+    assert result['variance_reduction'] == pytest.approx(4.0)
+
+
+def test_independent_interval_adds_the_two_variances():
+    result = independent_comparison(A, B[:3])
+    se = math.sqrt(5 / 3 / 4 + 4 / 3 / 3)
+    assert result['mean_difference'] == pytest.approx(2.5 - 4 / 3)
+    assert (result['ci_low'], result['ci_high']) == pytest.approx(
+        (result['mean_difference'] - Z_95 * se, result['mean_difference'] + Z_95 * se))
+    assert result['games'] == 4 and not result['paired']
+
+
+def test_identical_differences_reduce_variance_without_bound():
+    result = paired_comparison([3, 1, 2], [2, 0, 1])
+    assert result['ci_low'] == result['ci_high'] == 1.0
+    assert result['variance_reduction'] == math.inf
+
+
+def test_comparisons_need_enough_games():
+    with pytest.raises(ValueError):
+        paired_comparison([1], [0])
+    with pytest.raises(ValueError):
+        paired_comparison([1, 2, 3], [0, 1])
+    with pytest.raises(ValueError):
+        independent_comparison([1, 2], [0])
+
+
+class RecordingPool:
+    tasks = []
+
+    def __init__(self, processes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def imap_unordered(self, function, tasks):
+        RecordingPool.tasks = list(tasks)
+        return [(key, seed, 0) for key, _, _, seed in tasks]
+
+
+def test_only_configs_with_the_baseline_formation_share_seeds(monkeypatch):
+    monkeypatch.setattr(paired_eval, 'mp', SimpleNamespace(Pool=RecordingPool))
+    configs = [Config('base', (2, 1, 2, 1)),
+               Config('tweak', (2, 1, 2, 1), DEFAULT_PARAMS._replace(pass_power=2.5)),
+               Config('other', (1, 2, 2, 1))]
+    # The recording pool scores each game as its seed to nil
+    paired = evaluate_configs(configs, 3, seed=10)
+    assert {name: d.tolist() for name, d in paired.items()} == {
+        'base': [10, 11, 12], 'tweak': [10, 11, 12], 'other': [16, 17, 18]}
+
+    independent = evaluate_configs(configs, 3, seed=10, paired=False)
+    assert {name: d.tolist() for name, d in independent.items()} == {
+        'base': [10, 11, 12], 'tweak': [13, 14, 15], 'other': [16, 17, 18]}
+    assert RecordingPool.tasks[1][2] is None and RecordingPool.tasks[3][2] == configs[1].params
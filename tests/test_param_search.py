@@ -0,0 +1,87 @@
+import pytest
+from behavior_params import DEFAULT_PARAMS
+from param_search import Evaluation, ParameterSearch, grid_candidates, random_candidates, search
+
+
+def candidate(i):
+    return DEFAULT_PARAMS._replace(pass_margin=float(i))
+
+
+class ScriptedSearch(ParameterSearch):
+    """Candidate i scores results[i][game] instead of playing matches"""
+
+    def __init__(self, results):
+        super().__init__(processes=1, verbose=False)
+        self.results = results
+
+    def play(self, evaluations, games, pool):
+        for e in evaluations:
+            for game in range(e.games, games):
+                e.add(*self.results[int(e.params.pass_margin)][game])
+
+
+def test_successive_halving_ranks_by_rung_then_goal_difference():
+    # Candidate 0 wins its first game and then loses; 5 and 6 win once and never play again
+    results = {0: [(3, 0)] + [(0, 1)] * 8, 1: [(2, 0)] + [(0, 0)] * 8, 2: [(1, 0)] + [(1, 0)] * 8}
+    results.update({i: [(0, 0)] for i in (3, 4, 7, 8)})
+    results.update({i: [(1, 0)] for i in (5, 6)})
+    ranked = ScriptedSearch(results).successive_halving([candidate(i) for i in range(9)], min_games=1, eta=3)
+
+    assert [int(e.params.pass_margin) for e in ranked[:3]] == [2, 1, 0]
+    assert [e.games for e in ranked] == [9, 3, 3] + [1] * 6
+    assert ranked[2].goal_difference < ranked[3].goal_difference
+    assert [int(e.params.pass_margin) for e in ranked[3:5]] == [5, 6]
+
+
+def test_max_games_caps_the_last_rung():
+    results = {i: [(i, 0)] * 10 for i in range(4)}
+    ranked = ScriptedSearch(results).successive_halving([candidate(i) for i in range(4)], min_games=2, eta=2,
+                                                        max_games=3)
+    assert [e.games for e in ranked] == [3, 3, 2, 2]
+    assert [int(e.params.pass_margin) for e in ranked] == [3, 2, 1, 0]
+
+
+class RecordingPool:
+    def __init__(self):
+        self.tasks = []
+
+    def imap_unordered(self, function, tasks):
+        self.tasks.extend(tasks)
+        return [(i, 1, 0) for i, *_ in tasks]
+
+
+def test_games_are_topped_up_on_common_seeds():
+    runner = ParameterSearch(seed=10, baseline=DEFAULT_PARAMS)
+    evaluations = [Evaluation(candidate(0)), Evaluation(candidate(1))]
+    evaluations[1].add(0, 0)
+    pool = RecordingPool()
+    runner.play(evaluations, 2, pool)
+    assert [(i, seed) for i, _, _, seed in pool.tasks] == [(0, 10), (0, 11), (1, 11)]
+    assert all(task[2] == {'red': evaluations[task[0]].params, 'blue': DEFAULT_PARAMS} for task in pool.tasks)
+    assert [e.games for e in evaluations] == [2, 2]
+
+
+def test_evaluation_rates():
+    e = Evaluation(DEFAULT_PARAMS)
+    assert e.goal_difference == float('-inf')
+    for score in ((2, 0), (0, 1), (1, 1), (3, 1)):
+        e.add(*score)
+    row = e.row()
+    assert (row['games'], row['goal_difference'], row['win_rate'], row['loss_rate']) == (4, 0.75, 0.5, 0.25)
+
+
+def test_candidates_stay_within_the_space():
+    grid = grid_candidates({'pass_power': [1.5, 2.0], 'threat_radius': [50, 100, 150]})
+    assert len(grid) == 6
+    assert {(p.pass_power, p.threat_radius) for p in grid} == {(a, b) for a in (1.5, 2.0) for b in (50, 100, 150)}
+    with pytest.raises(ValueError):
+        grid_candidates({'pass_power': (1.5, 2.0)})
+
+    drawn = random_candidates({'threat_radius': (50, 60), 'pass_power': (1.5, 2.0), 'pass_margin': [1.0, 2.0]}, 50)
+    assert all(isinstance(p.threat_radius, int) and 50 <= p.threat_radius <= 60 for p in drawn)
+    assert all(1.5 <= p.pass_power <= 2.0 and p.pass_margin in (1.0, 2.0) for p in drawn)
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        search('annealing')
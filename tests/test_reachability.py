@@ -0,0 +1,15 @@
+import math
+from kinematics import KinematicsModel
+from reachability import ReachabilityTable
+from twoD import FootballSimulation
+
+
+def test_pass_evaluator_uses_the_simulations_kinematics():
+    kinematics = KinematicsModel(max_turn_rate=math.radians(30))
+    simulation = FootballSimulation(2, 1, 2, 1, headless=True, verbose=False, seed=0, kinematics=kinematics)
+    for strategy in simulation.policy.passing_strategies.values():
+        evaluator = strategy.evaluator
+        assert evaluator.kinematics is simulation.kinematics
+        table = ReachabilityTable.for_speed(100, evaluator.kinematics)
+        assert table.turn_ticks(math.pi) == kinematics.turn_ticks(math.pi)
+        assert table is not ReachabilityTable.for_speed(100)
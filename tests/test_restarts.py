@@ -0,0 +1,57 @@
+import math
+import pytest
+from scenarios import load_scenario
+from twoD import FootballSimulation, RESTART_STATES
+
+# Restarts whose taker ends up outside its own zone; robot order is the 2-1 v 2-1 kickoff order
+RESTARTS = {
+    'red_defender_throw_in': ([(50, 300), (700, 60), (400, 400), (600, 300),
+                               (850, 300), (720, 150), (720, 380), (500, 250)], 'throw_in', 'red', (714, 40)),
+    'red_defender_corner': ([(50, 300), (840, 60), (400, 400), (600, 300),
+                             (850, 300), (720, 150), (720, 380), (500, 250)], 'corner_kick', 'red', (860, 40)),
+    'blue_defender_throw_in': ([(50, 300), (300, 200), (300, 400), (400, 300),
+                                (850, 300), (180, 540), (720, 380), (500, 250)], 'throw_in', 'blue', (160, 560)),
+    'attacking_throw_in': 'attacking_throw_in',
+}
+
+
+def restart_scenario(spec):
+    if isinstance(spec, str):
+        return load_scenario(spec)
+    positions, kind, team, position = spec
+    scenario = load_scenario('kickoff')
+    for player, (x, y) in zip(scenario['players'], positions):
+        player['x'], player['y'] = x, y
+    scenario.update(ball={'x': position[0], 'y': position[1]}, game_state=kind,
+                    restart={'team': team, 'position': list(position)})
+    return scenario
+
+
+@pytest.mark.parametrize('name', RESTARTS)
+def test_no_robot_moves_more_than_one_step_around_a_restart(name):
+    simulation = FootballSimulation(2, 1, 2, 1, headless=True, verbose=False, seed=0, coarse_ticks=1,
+                                    scenario=restart_scenario(RESTARTS[name]))
+    max_step = max(p.speed for p in simulation.players) * simulation.kinematics.dt
+    resets = []
+    reset_after_goal = simulation.reset_after_goal
+
+    def reset():
+        resets.append(simulation.ticks)
+        reset_after_goal()
+
+    # Kickoff resets after goals, stalls and timeouts put every robot back on its spot
+    simulation.reset_after_goal = reset
+    resumed = None
+    while resumed is None or simulation.ticks < resumed + 10 * 60:
+        before = [(p.x, p.y, p.fall_recovery.is_fallen) for p in simulation.players]
+        simulation.step()
+        if resets:
+            break
+        if resumed is None and simulation.game_state not in RESTART_STATES:
+            resumed = simulation.ticks
+        for i, (p, (x, y, fallen)) in enumerate(zip(simulation.players, before)):
+            # Robots getting up are pushed clear of their neighbours on purpose
+            if not fallen and not p.fall_recovery.is_fallen:
+                step = math.hypot(p.x - x, p.y - y)
+                assert step <= max_step + 1e-9, f"robot {i} moved {step:.1f} px at tick {simulation.ticks}"
+    assert resumed is not None, "the restart was never taken"
@@ -0,0 +1,47 @@
+import pytest
+from behavior_params import DEFAULT_PARAMS
+from result_store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    yield store
+    store.close()
+
+
+def test_a_key_is_stored_once_and_never_overwritten(store):
+    key = store.key((2, 1, 2, 1), seed=3, coarse_ticks=4)
+    assert store.lookup(key) is None
+    assert store.add(key, 2, 1, stats={'shots': 5})
+    assert not store.add(key, 0, 0, stats={'shots': 9})
+
+    row = store.lookup(key)
+    assert (row['red_score'], row['blue_score'], row['stats']) == (2, 1, {'shots': 5})
+    assert len(store) == 1
+
+
+def test_every_key_field_keeps_results_apart(store):
+    base = dict(formation=(2, 1, 2, 1), seed=3, coarse_ticks=4)
+    variants = [base,
+                dict(base, formation=(1, 2, 2, 1)),
+                dict(base, seed=4),
+                dict(base, coarse_ticks=1),
+                dict(base, params=DEFAULT_PARAMS._replace(pass_power=DEFAULT_PARAMS.pass_power + 1))]
+    keys = [store.key(**variant) for variant in variants]
+    assert len(set(keys)) == len(keys)
+    for i, key in enumerate(keys):
+        assert store.add(key, i, 0)
+    assert [store.lookup(key)['red_score'] for key in keys] == list(range(len(keys)))
+
+
+def test_query_filters_by_formation_and_params(store):
+    tweaked = DEFAULT_PARAMS._replace(pass_power=DEFAULT_PARAMS.pass_power + 1)
+    store.add(store.key((2, 1, 2, 1), 0), 1, 0)
+    store.add(store.key((2, 1, 2, 1), 1), 0, 1)
+    store.add(store.key((2, 1, 2, 1), 0, tweaked), 3, 3, params=tweaked)
+    store.add(store.key((1, 2, 2, 1), 0), 2, 2)
+
+    assert [row['seed'] for row in store.query((2, 1, 2, 1), params=DEFAULT_PARAMS)] == [0, 1]
+    assert [row['red_score'] for row in store.query((2, 1, 2, 1), params=tweaked)] == [3]
+    assert len(store.query()) == 4
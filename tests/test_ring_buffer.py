@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from ring_buffer import RingBuffer
+
+
+def filled(capacity, count):
+    buffer = RingBuffer(capacity)
+    for i in range(count):
+        buffer.append((i, -i))
+    return buffer
+
+
+def test_wrapping_keeps_the_newest_rows_oldest_first():
+    buffer = filled(3, 5)
+    assert len(buffer) == 3
+    assert list(buffer) == [(2.0, -2.0), (3.0, -3.0), (4.0, -4.0)]
+    assert buffer[0] == (2.0, -2.0)
+    assert buffer[-1] == (4.0, -4.0)
+    with pytest.raises(IndexError):
+        buffer[3]
+
+
+def test_with_age_counts_back_from_the_newest_row():
+    assert list(filled(3, 4).with_age()) == [(2, (1.0, -1.0)), (1, (2.0, -2.0)), (0, (3.0, -3.0))]
+
+
+@pytest.mark.parametrize('count', [0, 2, 4, 5, 9])
+def test_array_matches_iteration_before_and_after_wrapping(count):
+    buffer = filled(4, count)
+    array = buffer.array()
+    assert array.shape == (min(count, 4), 2)
+    assert array.tolist() == [list(row) for row in buffer]
+
+
+def test_capacity_one_holds_only_the_newest_row():
+    buffer = filled(1, 3)
+    assert list(buffer) == [(2.0, -2.0)]
+    assert np.array_equal(buffer.array(), [[2.0, -2.0]])
+    assert list(buffer.with_age()) == [(0, (2.0, -2.0))]
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
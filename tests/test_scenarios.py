@@ -0,0 +1,20 @@
+import pytest
+from scenarios import SCENARIO_LIBRARY, load_scenario, scenario_from_simulation
+from twoD import FootballSimulation
+
+
+@pytest.mark.parametrize('name', [name for name, s in SCENARIO_LIBRARY.items() if 'last_touch_player' in s['ball']])
+def test_last_touch_player_survives_apply_and_capture(name):
+    simulation = FootballSimulation(2, 1, 2, 1, headless=True, verbose=False, seed=0, scenario=name)
+    index = SCENARIO_LIBRARY[name]['ball']['last_touch_player']
+    assert simulation.ball.last_touch_player is simulation.players[index]
+    assert simulation.ball.last_touch_team == simulation.players[index].team
+    assert scenario_from_simulation(simulation)['ball']['last_touch_player'] == index
+
+
+def test_last_touch_team_defaults_to_the_last_touch_players_team():
+    ball = load_scenario({'players': SCENARIO_LIBRARY['kickoff']['players'], 'ball': {'last_touch_player': 7}})['ball']
+    assert ball['last_touch_team'] == 'blue'
+    with pytest.raises(ValueError):
+        load_scenario({'players': SCENARIO_LIBRARY['kickoff']['players'],
+                       'ball': {'last_touch_player': 7, 'last_touch_team': 'red'}})
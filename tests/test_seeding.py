@@ -0,0 +1,13 @@
+import random
+from match_runner import play_match
+from simulation_analysis import play_games
+
+
+def test_batch_and_match_runner_play_the_same_seeded_game():
+    random.seed(1)
+    state = random.getstate()
+    row, = play_games(2, 1, 2, 1, num_games=1, seed=5)
+    assert random.getstate() == state
+    simulation = play_match((2, 1, 2, 1), seed=5, collect_stats=True)
+    assert (row['red_score'], row['blue_score'], row['ticks']) == \
+        (simulation.red_score, simulation.blue_score, simulation.stats.row()['ticks'])
@@ -0,0 +1,24 @@
+import numpy as np
+from shared_state import SLOT_DTYPE, MatchSlot
+from twoD import FootballSimulation
+
+
+def test_slot_velocities_are_per_tick_and_reset_between_games():
+    board = np.zeros(1, dtype=SLOT_DTYPE)
+    slot = MatchSlot(board, 0, publish_every=8)
+    robots = board['robots'][0]
+    for game, seed in enumerate((0, 1)):
+        simulation = FootballSimulation(2, 1, 2, 1, headless=True, verbose=False, seed=seed)
+        simulation.state_slot = slot
+        slot.start(simulation, game)
+        assert not robots['vx'].any() and not robots['vy'].any()
+
+        while board['tick'][0] < 200:
+            x = robots['x'].copy()
+            ticks = board['tick'][0]
+            simulation.step()
+            if board['tick'][0] != ticks:
+                expected = (robots['x'] - x) / (board['tick'][0] - ticks)
+                assert np.allclose(robots['vx'], expected)
+        # Walking robots cover at most a few px per tick
+        assert 0 < np.abs(robots['vx']).max() < 5
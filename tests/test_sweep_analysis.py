@@ -0,0 +1,29 @@
+import numpy as np
+from shared_state import RESULT_DTYPE
+from sweep_analysis import SweepAggregator, results_to_frame
+
+
+def test_unfinished_rows_are_dropped():
+    results = np.zeros(3, dtype=RESULT_DTYPE)
+    results['formation'][0] = (2, 1, 2, 1)
+    results['red_score'][0] = 2
+    results['done'][0] = True
+    frame = results_to_frame(results)
+    assert len(frame) == 1
+    assert frame.iloc[0].tolist() == [2, 1, 2, 1, 2, 0]
+
+
+def test_report_columns_stay_apart_at_full_rates():
+    results = np.zeros(3, dtype=RESULT_DTYPE)
+    results['formation'] = (2, 1, 2, 1)
+    results['red_score'] = 1
+    results['done'] = True
+    header, row = SweepAggregator().add(results).render_report().splitlines()[:2]
+    assert len(row) == len(header)
+    assert "100.0% [" in row and "1100.0%" not in row
+
+
+def test_empty_aggregator_reports_no_games():
+    aggregator = SweepAggregator()
+    assert aggregator.summary().empty
+    assert aggregator.render_report().endswith("No finished games")
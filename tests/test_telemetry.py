@@ -0,0 +1,95 @@
+import base64
+import hashlib
+import json
+import socket
+import struct
+import urllib.error
+import urllib.request
+import pytest
+import telemetry
+from telemetry import SweepTelemetry, TelemetryServer, WEBSOCKET_GUID
+
+
+def test_snapshot_tallies_results_per_formation():
+    stats = SweepTelemetry()
+    stats.start(4)
+    for red, blue in ((2, 0), (0, 1), (1, 1)):
+        stats.game_finished((2, 1, 2, 1), red, blue)
+    stats.game_finished((1, 2, 2, 1), 3, 0)
+
+    snapshot = stats.snapshot()
+    assert (snapshot['games_completed'], snapshot['total_games']) == (4, 4)
+    assert snapshot['formations']['2-1-2-1'] == {'games': 3, 'red_wins': 1, 'blue_wins': 1, 'draws': 1,
+                                                 'red_win_rate': pytest.approx(1 / 3)}
+    assert snapshot['formations']['1-2-2-1']['red_win_rate'] == 1.0
+
+
+def test_worker_ticks_carry_over_between_games(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(telemetry.time, 'monotonic', lambda: float(next(clock)))
+    stats = SweepTelemetry()
+    stats.worker_progress(0, game=0, ticks=100)
+    stats.worker_progress(0, game=0, ticks=300)
+    stats.worker_progress(0, game=1, ticks=100)
+
+    worker, = stats.snapshot()['workers']
+    assert (worker['game'], worker['ticks']) == (1, 100)
+    # 200 more ticks of game 0 and 100 of game 1 over the two seconds since the first report
+    assert worker['ticks_per_second'] == 150.0
+
+
+def test_a_running_worker_without_new_ticks_is_stalled(monkeypatch):
+    monkeypatch.setattr(telemetry, 'STALL_AFTER', 0.0)
+    stats = SweepTelemetry()
+    stats.worker_progress(0, 0, 10)
+    stats.worker_progress(1, 0, 10, running=False)
+    assert [w['stalled'] for w in stats.snapshot()['workers']] == [True, False]
+
+
+def test_server_refuses_non_loopback_hosts():
+    with pytest.raises(ValueError):
+        TelemetryServer(SweepTelemetry(), host='0.0.0.0')
+
+
+@pytest.fixture
+def server():
+    stats = SweepTelemetry()
+    stats.start(10)
+    stats.game_finished((2, 1, 2, 1), 1, 0)
+    with TelemetryServer(stats, port=0, interval=0.05) as server:
+        yield server
+
+
+def test_stats_endpoint_serves_the_snapshot(server):
+    with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/stats', timeout=5) as response:
+        body = json.load(response)
+    assert (body['games_completed'], body['total_games']) == (1, 10)
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f'http://127.0.0.1:{server.port}/nope', timeout=5)
+    assert error.value.code == 404
+
+
+def test_websocket_pushes_snapshots(server):
+    key = base64.b64encode(b'0123456789abcdef').decode()
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as connection:
+        connection.sendall(f'GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                           f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n'.encode())
+        stream = connection.makefile('rb')
+        assert b'101' in stream.readline()
+        headers = {}
+        for line in iter(stream.readline, b'\r\n'):
+            name, value = line.decode().split(':', 1)
+            headers[name.lower()] = value.strip()
+        expected = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        assert headers['sec-websocket-accept'] == expected
+
+        for _ in range(2):
+            first, length = stream.read(2)
+            assert first == 0x81
+            if length == 126:
+                length, = struct.unpack('!H', stream.read(2))
+            assert json.loads(stream.read(length))['games_completed'] == 1
+        # Masked close frame; the server answers with its own
+        connection.sendall(b'\x88\x80' + b'\x00' * 4)
+        while stream.read(2) != b'\x88\x00':
+            pass
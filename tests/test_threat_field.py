@@ -0,0 +1,48 @@
+import math
+from types import SimpleNamespace
+import pytest
+from threat_field import ThreatField
+
+
+def robot(team, x, y):
+    return SimpleNamespace(team=team, x=x, y=y)
+
+
+def field_with(*robots):
+    field = ThreatField()
+    field.update(robots)
+    return field
+
+
+def test_only_opponents_ahead_within_the_radius_count():
+    ahead = field_with(robot('red', 400, 300), robot('blue', 440, 300))
+    behind = field_with(robot('red', 400, 300), robot('blue', 360, 300))
+    far = field_with(robot('red', 400, 300), robot('blue', 520, 300))
+    team_mate = field_with(robot('red', 400, 300), robot('red', 440, 300))
+
+    push_x, push_y, threat = ahead.sample('red', 400, 300)
+    assert threat == pytest.approx(1 - 40 / 100)
+    assert push_x < 0 and push_y == pytest.approx(0)
+    for field in (behind, far, team_mate):
+        assert field.sample('red', 400, 300) == pytest.approx((0, 0, 0))
+
+
+def test_threat_is_felt_by_the_other_team_only():
+    field = field_with(robot('red', 400, 300), robot('blue', 440, 300))
+    assert field.sample('red', 400, 300)[2] > 0
+    # The red robot is behind the blue one, so it threatens nobody
+    assert field.sample('blue', 440, 300)[2] == 0
+
+
+def test_update_discards_the_previous_tick():
+    field = field_with(robot('red', 400, 300), robot('blue', 440, 300))
+    assert field.sample('red', 400, 300)[2] > 0
+    field.update([robot('red', 400, 300), robot('blue', 360, 300)])
+    assert field.sample('red', 400, 300)[2] == 0
+
+
+def test_avoidance_sidesteps_an_opponent_straight_ahead():
+    field = field_with(robot('red', 400, 300), robot('blue', 440, 300))
+    angle = field.avoidance_angle('red', 400, 300, 900, 300)
+    assert angle is not None and abs(angle) > math.radians(10)
+    assert field_with(robot('red', 400, 300)).avoidance_angle('red', 400, 300, 900, 300) is None
@@ -0,0 +1,71 @@
+import json
+import os
+import numpy as np
+import pytest
+from trajectory_export import MANIFEST, TrajectoryDataset, TrajectoryWriter, export_matches
+from twoD import FootballSimulation
+
+
+class Tee:
+    """Forwards to a MatchRecorder and keeps what it was given"""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.rows = []
+
+    def record(self, tick, observation, commands):
+        self.recorder.record(tick, observation, commands)
+        self.rows.append((tick, observation.x.copy(), commands.target_x.copy()))
+
+
+def record(directory, games, ticks, chunk_rows, compress):
+    tees = []
+    with TrajectoryWriter(directory, chunk_rows=chunk_rows, compress=compress) as writer:
+        for game in range(games):
+            simulation = FootballSimulation(2, 1, 2, 1, headless=True, verbose=False, seed=game, coarse_ticks=1)
+            tee = simulation.recorder = Tee(writer.recorder(game))
+            tees.append(tee)
+            while len(tee.rows) < ticks:
+                simulation.step()
+    return [(game, *row) for game, tee in enumerate(tees) for row in tee.rows]
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_rows_round_trip_across_chunk_boundaries(tmp_path, compress):
+    expected = record(str(tmp_path), games=2, ticks=12, chunk_rows=5, compress=compress)
+    with open(tmp_path / MANIFEST) as f:
+        manifest = json.load(f)
+    assert [chunk['rows'] for chunk in manifest['chunks']] == [5, 5, 5, 5, 4]
+    assert manifest['rows'] == len(expected) == 24
+
+    dataset = TrajectoryDataset(str(tmp_path))
+    assert len(dataset) == 24
+    for i, (game, tick, x, target_x) in enumerate(expected):
+        row = dataset[i]
+        n = row['num_robots']
+        assert (row['game'], row['tick']) == (game, tick)
+        assert np.allclose(row['x'][:n], x, atol=1e-3)
+        assert np.allclose(row['target_x'][:n], target_x, atol=1e-3)
+
+    indices = np.array([23, 0, 4, 5, 13])
+    assert dataset.take(indices)['tick'].tolist() == [expected[i][1] for i in indices]
+    assert dataset[3:8]['tick'].tolist() == [row[1] for row in expected[3:8]]
+    assert dataset[-1]['tick'] == expected[-1][1]
+    with pytest.raises(IndexError):
+        dataset[24]
+
+
+def test_compressed_chunks_are_unpacked_once(tmp_path):
+    record(str(tmp_path), games=1, ticks=3, chunk_rows=2, compress=True)
+    TrajectoryDataset(str(tmp_path))
+    unpacked = tmp_path / 'chunk_000000.npy'
+    modified = os.path.getmtime(unpacked)
+    assert len(TrajectoryDataset(str(tmp_path))) == 3
+    assert os.path.getmtime(unpacked) == modified
+
+
+def test_export_matches_writes_one_game_after_another(tmp_path):
+    export_matches(str(tmp_path), num_games=2, chunk_rows=4096)
+    games = TrajectoryDataset(str(tmp_path))[:]['game']
+    assert games[0] == 0 and games[-1] == 1
+    assert (np.diff(games) >= 0).all()
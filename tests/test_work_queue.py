@@ -0,0 +1,81 @@
+import asyncio
+import time
+import pytest
+from result_store import ResultStore
+from work_queue import Coordinator, make_units
+
+RESULT = {'red_score': 1, 'blue_score': 0, 'collisions': 2, 'ticks': 100}
+
+
+def coordinator(units=2, **kwargs):
+    coordinator = Coordinator(make_units([(2, 1, 2, 1)], range(units)), verbose=False, **kwargs)
+    # Set by serve(); the queue logic is driven directly here
+    coordinator.finished = asyncio.Event()
+    return coordinator
+
+
+def expire(coordinator):
+    for lease, (unit_id, owner, _) in coordinator.leases.items():
+        coordinator.leases[lease] = (unit_id, owner, time.monotonic() - 1)
+    coordinator.expire_leases()
+
+
+def test_units_are_leased_in_order_then_waited_on():
+    queue = coordinator()
+    first, second = queue.lease('a'), queue.lease('b')
+    assert [first['unit']['id'], second['unit']['id']] == [0, 1]
+    assert 'wait' in queue.lease('c')
+
+
+def test_an_expired_lease_is_requeued_first():
+    queue = coordinator()
+    leased = queue.lease('a')
+    expire(queue)
+    again = queue.lease('b')
+    assert again['unit']['id'] == leased['unit']['id']
+    assert again['lease'] != leased['lease']
+    assert queue.attempts[0] == 2
+
+
+def test_a_disconnect_requeues_only_that_workers_units():
+    queue = coordinator()
+    queue.lease('a')
+    queue.lease('b')
+    queue.expire_leases('a')
+    assert list(queue.pending) == [0]
+    assert [unit_id for unit_id, _, _ in queue.leases.values()] == [1]
+
+
+def test_a_unit_fails_after_max_attempts():
+    queue = coordinator(units=1, max_attempts=2)
+    for _ in range(2):
+        assert queue.lease('a')['unit']['id'] == 0
+        expire(queue)
+    assert queue.failed == {0}
+    assert queue.complete and queue.finished.is_set()
+    assert queue.lease('a') == {'done': True}
+
+
+def test_only_the_first_result_is_kept():
+    queue = coordinator(units=1)
+    first = queue.lease('a')
+    expire(queue)
+    second = queue.lease('b')
+    assert queue.submit({'lease': second['lease'], 'unit': 0, 'result': RESULT}) == {'ok': True, 'duplicate': False}
+    late = dict(RESULT, red_score=5)
+    assert queue.submit({'lease': first['lease'], 'unit': 0, 'result': late}) == {'ok': True, 'duplicate': True}
+    assert queue.results == {0: RESULT}
+    assert queue.duplicates == 1
+    assert 'error' in queue.submit({'unit': 7, 'result': RESULT})
+
+
+def test_stored_units_are_not_handed_out(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    queue = coordinator(store=store)
+    lease = queue.lease('a')
+    queue.submit({'lease': lease['lease'], 'unit': lease['unit']['id'], 'result': RESULT})
+
+    restarted = coordinator(store=store)
+    assert restarted.results[0]['cached']
+    assert restarted.lease('a')['unit']['id'] == 1
+    store.close()
@@ -0,0 +1,104 @@
+import math
+import numpy as np
+
+
+class ThreatField:
+    """
+    Opponent threat potential on a coarse grid, rebuilt once per tick.
+
+    Every opponent within `threat_radius` of a grid node and ahead of it
+    (larger x, the same rule as the closest-opponent scan in
+    policy.avoid_opponent) contributes a weight w = 1 - d / threat_radius and
+    a push of w along the direction away from it.
+    The grid is built lazily from the positions recorded by `update`, so ticks
+    where nobody dribbles cost nothing, and each sample is a fixed-cost
+    bilinear lookup however many robots are on the field.
+    """
+    def __init__(self, field_length=900, field_width=600, cell=20, threat_radius=100):
+        self.cell = cell
+        self.threat_radius = threat_radius
+        self.nx = int(math.ceil(field_length / cell)) + 1
+        self.ny = int(math.ceil(field_width / cell)) + 1
+        self.grid_x, self.grid_y = np.meshgrid(np.arange(self.nx) * cell,
+                                               np.arange(self.ny) * cell, indexing='ij')
+        self.positions = {}
+        self.grids = {}
+
+    def update(self, players):
+        """Record this tick's opponent positions; grids are rebuilt on first sample"""
+        self.positions = {}
+        for p in players:
+            self.positions.setdefault(p.team, []).append((p.x, p.y))
+        self.grids = {}
+
+    def _build(self, team):
+        opponents = [pos for t, positions in self.positions.items() if t != team for pos in positions]
+        grid = np.zeros((self.nx, self.ny, 3))
+        if opponents:
+            ox, oy = np.array(opponents).T
+            dx = self.grid_x[..., None] - ox
+            dy = self.grid_y[..., None] - oy
+            dist = np.hypot(dx, dy)
+            weight = np.where(dx < 0, np.clip(1 - dist / self.threat_radius, 0, None), 0)
+            scale = np.divide(weight, dist, out=np.zeros_like(dist), where=dist > 0)
+            grid[..., 0] = (scale * dx).sum(axis=-1)
+            grid[..., 1] = (scale * dy).sum(axis=-1)
+            grid[..., 2] = weight.sum(axis=-1)
+        self.grids[team] = grid
+        return grid
+
+    def sample(self, team, x, y):
+        """Bilinearly interpolated (push_x, push_y, threat) felt by `team` at (x, y)"""
+        grid = self.grids.get(team)
+        if grid is None:
+            grid = self._build(team)
+
+        fx = min(max(x / self.cell, 0), self.nx - 1.001)
+        fy = min(max(y / self.cell, 0), self.ny - 1.001)
+        ix = int(fx)
+        iy = int(fy)
+        tx = fx - ix
+        ty = fy - iy
+        w00 = (1 - tx) * (1 - ty)
+        w01 = (1 - tx) * ty
+        w10 = tx * (1 - ty)
+        w11 = tx * ty
+        # ndarray.item is far cheaper than numpy indexing for single scalars
+        item = grid.item
+        a = (ix * self.ny + iy) * 3
+        b = a + 3
+        c = a + self.ny * 3
+        d = c + 3
+        return tuple(item(a + k) * w00 + item(b + k) * w01 + item(c + k) * w10 + item(d + k) * w11
+                     for k in range(3))
+
+    def avoidance_angle(self, team, x, y, goal_x, goal_y, avoidance_weight=0.7):
+        """
+        Heading that steers around every nearby opponent towards the goal.
+
+        The push is turned sideways relative to the goal direction so that a
+        robot directly ahead is passed rather than backed away from. Returns
+        None when no opponent is within the threat radius.
+        """
+        push_x, push_y, threat = self.sample(team, x, y)
+        if threat <= 0:
+            return None
+
+        goal_angle = math.atan2(goal_y - y, goal_x - x)
+        gx = math.cos(goal_angle)
+        gy = math.sin(goal_angle)
+
+        along = push_x * gx + push_y * gy
+        side_x = push_x - along * gx
+        side_y = push_y - along * gy
+        side = math.hypot(side_x, side_y)
+        if along < 0:
+            # Opponents ahead: sidestep with the full strength of the push
+            strength = math.hypot(push_x, push_y)
+            if side > 1e-9:
+                side_x, side_y = side_x / side * strength, side_y / side * strength
+            else:
+                side_x, side_y = -gy * strength, gx * strength
+
+        gain = avoidance_weight / (1 - avoidance_weight)
+        return math.atan2(gy + gain * side_y, gx + gain * side_x)
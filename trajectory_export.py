@@ -0,0 +1,226 @@
+import json
+import os
+import queue
+import threading
+import numpy as np
+from policy import TEAMS, ROLES
+from scenarios import GAME_STATES
+from shared_state import MAX_ROBOTS
+
+SCHEMA_VERSION = 1
+MANIFEST = 'manifest.json'
+
+# One row per policy decision; robot columns are padded to MAX_ROBOTS with team -1 and NaN positions.
+# team, role and game_state are indices into policy.TEAMS, policy.ROLES and scenarios.GAME_STATES.
+STEP_DTYPE = np.dtype([
+    ('game', 'i8'), ('tick', 'i8'), ('game_state', 'i1'), ('num_robots', 'i1'),
+    ('ball', 'f4', 4),
+    ('x', 'f4', MAX_ROBOTS), ('y', 'f4', MAX_ROBOTS), ('facing_angle', 'f4', MAX_ROBOTS),
+    ('team', 'i1', MAX_ROBOTS), ('role', 'i1', MAX_ROBOTS),
+    ('is_fallen', '?', MAX_ROBOTS), ('is_active_pursuer', '?', MAX_ROBOTS), ('touching_ball', '?', MAX_ROBOTS),
+    ('target_x', 'f4', MAX_ROBOTS), ('target_y', 'f4', MAX_ROBOTS),
+    ('kick', '?', MAX_ROBOTS), ('kick_angle', 'f4', MAX_ROBOTS), ('kick_power', 'f4', MAX_ROBOTS),
+    ('pass_target', 'f4', (MAX_ROBOTS, 2)),
+])
+
+
+def _empty_chunk(rows):
+    chunk = np.zeros(rows, dtype=STEP_DTYPE)
+    for field in ('x', 'y', 'facing_angle', 'target_x', 'target_y', 'pass_target'):
+        chunk[field] = np.nan
+    chunk['team'] = -1
+    chunk['role'] = -1
+    return chunk
+
+
+class TrajectoryWriter:
+    """
+    Collects per-tick states and actions into fixed-size STEP_DTYPE chunks.
+
+    The simulation thread only copies a row into the current chunk; full
+    chunks are handed to `threads` background threads that write them to
+    `directory` as .npz (compressed) or .npy files, so the match loop never
+    waits on disk. `close` writes manifest.json listing the chunks in order.
+    """
+    def __init__(self, directory, chunk_rows=8192, compress=True, threads=2):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.compress = compress
+        self.chunk = _empty_chunk(chunk_rows)
+        self.rows = 0
+        self.total_rows = 0
+        self.chunks = []
+        self.errors = []
+        self.queue = queue.Queue()
+        self.threads = [threading.Thread(target=self._write_chunks, daemon=True) for _ in range(threads)]
+        for thread in self.threads:
+            thread.start()
+
+    def recorder(self, game):
+        """A MatchRecorder tagging rows with `game`, for FootballSimulation.recorder"""
+        return MatchRecorder(self, game)
+
+    def append(self, game, tick, observation, commands):
+        n = min(len(observation), MAX_ROBOTS)
+        chunk, r = self.chunk, self.rows
+        chunk['game'][r] = game
+        chunk['tick'][r] = tick
+        chunk['game_state'][r] = GAME_STATES.index(observation.game_state)
+        chunk['num_robots'][r] = n
+        chunk['ball'][r] = observation.ball_state
+        chunk['x'][r, :n] = observation.x[:n]
+        chunk['y'][r, :n] = observation.y[:n]
+        chunk['facing_angle'][r, :n] = observation.facing_angle[:n]
+        chunk['team'][r, :n] = observation.team[:n]
+        chunk['role'][r, :n] = observation.role[:n]
+        chunk['is_fallen'][r, :n] = observation.is_fallen[:n]
+        chunk['is_active_pursuer'][r, :n] = observation.is_active_pursuer[:n]
+        chunk['touching_ball'][r, :n] = observation.touching_ball[:n]
+        chunk['target_x'][r, :n] = commands.target_x[:n]
+        chunk['target_y'][r, :n] = commands.target_y[:n]
+        chunk['kick'][r, :n] = commands.kick[:n]
+        chunk['kick_angle'][r, :n] = commands.kick_angle[:n]
+        chunk['kick_power'][r, :n] = commands.kick_power[:n]
+        chunk['pass_target'][r, :n, 0] = commands.pass_target_x[:n]
+        chunk['pass_target'][r, :n, 1] = commands.pass_target_y[:n]
+        self.rows += 1
+        if self.rows == self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Hand the rows collected so far to the writer threads and start a new chunk"""
+        if not self.rows:
+            return
+        name = f"chunk_{len(self.chunks):06d}" + ('.npz' if self.compress else '.npy')
+        self.chunks.append({'file': name, 'rows': self.rows})
+        self.queue.put((os.path.join(self.directory, name), self.chunk[:self.rows]))
+        self.total_rows += self.rows
+        self.chunk = _empty_chunk(self.chunk_rows)
+        self.rows = 0
+
+    def _write_chunks(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            path, steps = item
+            try:
+                if path.endswith('.npz'):
+                    np.savez_compressed(path, steps=steps)
+                else:
+                    np.save(path, steps)
+            except OSError as error:
+                self.errors.append(error)
+
+    def close(self):
+        """Write the last chunk, wait for the writer threads and write the manifest; returns its path"""
+        self.flush()
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path, 'w') as f:
+            json.dump({'schema_version': SCHEMA_VERSION, 'fields': list(STEP_DTYPE.names),
+                       'teams': TEAMS, 'roles': ROLES, 'game_states': GAME_STATES,
+                       'rows': self.total_rows, 'chunks': self.chunks}, f, indent=2)
+        return path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MatchRecorder:
+    """Records one match's policy decisions into a TrajectoryWriter"""
+
+    def __init__(self, writer, game):
+        self.writer = writer
+        self.game = game
+
+    def record(self, tick, observation, commands):
+        self.writer.append(self.game, tick, observation, commands)
+
+
+class TrajectoryDataset:
+    """
+    Memory-mapped, random-access view of an exported trajectory directory.
+
+    Compressed chunks are unpacked once to .npy files next to them, so every
+    chunk can be memory-mapped; rows are only read from disk when indexed.
+    """
+    def __init__(self, directory):
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest['schema_version'] != SCHEMA_VERSION:
+            raise ValueError(f"Trajectory schema {manifest['schema_version']} is not {SCHEMA_VERSION}")
+        self.directory = directory
+        self.chunks = [np.load(self._unpacked(chunk['file']), mmap_mode='r') for chunk in manifest['chunks']]
+        self.offsets = np.cumsum([0] + [len(chunk) for chunk in self.chunks])
+
+    def _unpacked(self, name):
+        path = os.path.join(self.directory, name)
+        if not name.endswith('.npz'):
+            return path
+        unpacked = path[:-len('.npz')] + '.npy'
+        if not os.path.exists(unpacked):
+            with np.load(path) as archive:
+                np.save(unpacked + '.tmp.npy', archive['steps'])
+            os.replace(unpacked + '.tmp.npy', unpacked)
+        return unpacked
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, index):
+        """One row for an int, a STEP_DTYPE array for an array of indices or a slice"""
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("TrajectoryDataset index out of range")
+            c = np.searchsorted(self.offsets, index, side='right') - 1
+            return self.chunks[c][index - self.offsets[c]]
+        if isinstance(index, slice):
+            index = np.arange(len(self))[index]
+        return self.take(np.asarray(index))
+
+    def take(self, indices):
+        steps = np.empty(len(indices), dtype=STEP_DTYPE)
+        chunk_of = np.searchsorted(self.offsets, indices, side='right') - 1
+        for c in np.unique(chunk_of):
+            mask = chunk_of == c
+            steps[mask] = self.chunks[c][indices[mask] - self.offsets[c]]
+        return steps
+
+    def sample(self, n, rng=None):
+        """`n` rows drawn uniformly with replacement"""
+        rng = rng or np.random.default_rng()
+        return self.take(rng.integers(0, len(self), n))
+
+
+def export_matches(directory, formation=(2, 1, 2, 1), num_games=10, seed=0, chunk_rows=8192,
+                   compress=True, threads=2, backend='python'):
+    """
+    Play seeded headless matches, one tick per step, and export every decision to `directory`.
+
+    Game i is FootballSimulation(seed=seed + i) stepped with coarse_ticks=1,
+    so it replays as `match_runner.play_match(formation, seed=seed + i,
+    coarse_ticks=1)`; at the headless default of COARSE_TICKS the same seed
+    plays a different match. Returns the manifest path.
+    """
+    from twoD import FootballSimulation
+
+    with TrajectoryWriter(directory, chunk_rows, compress, threads) as writer:
+        for game in range(num_games):
+            simulation = FootballSimulation(*formation, headless=True, coarse_ticks=1, backend=backend,
+                                            seed=seed + game)
+            simulation.recorder = writer.recorder(game)
+            while not simulation.game_over:
+                simulation.step()
+    return os.path.join(directory, MANIFEST)
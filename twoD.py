@@ -1,22 +1,33 @@
-import random
-import pygame
 import math
 import time
-from passing_strategy import PassingStrategy
-from collision_handler import FallRecovery, CollisionHandler
+import numpy as np
+from collision_handler import FallRecovery, CollisionHandler, COLLISION_DISTANCE
+from sim_clock import SimClock
+from kinematics import DEFAULT_KINEMATICS
+from behavior_params import DEFAULT_PARAMS, team_params
+from random_streams import RandomStreams, GLOBAL_STREAMS
+from kernels import Backend
+from contact import first_contact, sweep_against_static
+from match_stats import MatchStats
+from field import (f_length, f_width, g_width, g_depth, pen_area_width, pen_area_depth, circle_rad, GAME_DURATION,
+                   GOAL_Y_START, GOAL_Y_END, LEFT_GOAL_X, RIGHT_GOAL_X)
+from events import BallEvent, GOAL, TOUCHLINE_EXIT, GOAL_LINE_EXIT
+from policy import Observation, ScriptedPolicy
+
+# Set pieces that stop play until a robot of `throw_in_team` puts the ball back in
+RESTART_STATES = {'throw_in': "Throw-in", 'corner_kick': "Corner kick", 'goal_kick': "Goal kick"}
+RESTART_INSET = 40  # distance of the restart spot from the lines it went out over
+RESTART_REACH = 3  # how close the taker must get to its spot behind the ball
+RESTART_TIMEOUT = 30  # seconds before an untaken restart falls back to a kickoff (robots cross the field in ~25 s)
+THROW_POWER = 3
+
+COARSE_TICKS = 4  # ticks per open-play step in headless matches
+NEAR_MARGIN = 5  # px of slack when deciding which robots need per-tick substeps
 
 
-f_length = 900   
-f_width = 600     
-g_width = 260      
-g_depth = 60       
-pen_area_width = 500  
-pen_area_depth = 200 
-circle_rad = 75  
-GAME_DURATION = 120
-
 class Player:
-    def __init__(self, x, y, team, color, player_type, all_players_ref=None):
+    def __init__(self, x, y, team, color, player_type, all_players_ref=None, time_fn=time.time, verbose=True,
+                 kinematics=DEFAULT_KINEMATICS, params=DEFAULT_PARAMS, streams=GLOBAL_STREAMS):
         self.x = x
         self.y = y
         self.original_x = x
@@ -31,14 +42,20 @@ class Player:
         self.is_active_pursuer = False
         self._all_players_ref = all_players_ref
         self.shots_attempted = 0
+        self.time_fn = time_fn
+        self.verbose = verbose
         
         self.target_x = x
         self.target_y = y
+        # Position at the start of the last movement phase, for swept collision checks
+        self.previous_x = x
+        self.previous_y = y
         self.facing_angle = 0
-        self.turn_complete = True
-        self.turn_start_time = 0
+        self.kinematics = kinematics
+        self.params = params
+        self.streams = streams
+        self.velocity = 0.0  # current walking speed, px/s
         self.movement_state = "idle"
-        self.turn_duration = 0
         
 
         self.is_throwing_in = False
@@ -56,7 +73,8 @@ class Player:
                 self.assigned_corner = (0, f_width - 100 )
 
     def set_speed(self):
-        return {'goalkeeper': 2, 'defender': 2, 'attacker': 2}[self.player_type]
+        """Top walking speed in px/s"""
+        return {'goalkeeper': 36, 'defender': 36, 'attacker': 36}[self.player_type]
 
     def get_zone_limits(self):
         half_field = f_length // 2
@@ -77,252 +95,122 @@ class Player:
                 return (0, half_field+100, 0, f_width)
     
     def throw_in(self, ball, throw_target_x, throw_target_y):
-        if time.time() - self.throw_start_time < self.throw_duration:
+        """Throw the ball towards the target once `throw_duration` has passed; True when thrown"""
+        if self.time_fn() - self.throw_start_time < self.throw_duration:
 
-            return
+            return False
         
 
         self.is_throwing_in = False
         
 
         angle = math.atan2(throw_target_y - ball.y, throw_target_x - ball.x)
-        throw_power = 3
+        throw_power = THROW_POWER
         
 
-        angle += math.radians(random.uniform(-10, 10))
+        angle += math.radians(self.streams.throw_ins.uniform(-10, 10))
         
         ball.velocity_x = math.cos(angle) * throw_power
         ball.velocity_y = math.sin(angle) * throw_power
-        ball.last_movement_time = time.time()
+        ball.last_movement_time = self.time_fn()
+        return True
     
-    def avoid_opponent_while_dribbling(self, ball, players, goal_x, goal_y):
-       
-        THREAT_RADIUS = 100  
-        AVOIDANCE_WEIGHT = 0.7 
-        
-        closest_opponent = None
-        min_distance = float('inf')
-        
-        for opponent in players:
-            if opponent.team != self.team:  
-                distance = math.hypot(self.x - opponent.x, self.y - opponent.y)
-                if distance < min_distance and distance < THREAT_RADIUS and opponent.x > self.x:
-                    min_distance = distance
-                    closest_opponent = opponent
-        
-        if closest_opponent is None:
-            return None
-        
-
-        dx = closest_opponent.x - self.x
-        dy = closest_opponent.y - self.y
-        angle_to_opponent = math.atan2(dy, dx)
-        
-
-        avoid_angle_left = angle_to_opponent + math.pi / 2
-        avoid_angle_right = angle_to_opponent - math.pi / 2
-        
-
-        goal_angle = math.atan2(goal_y - self.y, goal_x - self.x)
-        
-
-        def normalize_angle(angle):
-            return ((angle + math.pi) % (2 * math.pi)) - math.pi
-        
-        diff_left = abs(normalize_angle(avoid_angle_left - goal_angle))
-        diff_right = abs(normalize_angle(avoid_angle_right - goal_angle))
-        avoid_angle = avoid_angle_left if diff_left < diff_right else avoid_angle_right
-        
-
-        new_angle = AVOIDANCE_WEIGHT * avoid_angle + (1 - AVOIDANCE_WEIGHT) * goal_angle
-        
-
-        new_angle = normalize_angle(new_angle)
-        
-        return new_angle
-
-    def move(self, ball, players):
-
-        if self.fall_recovery.is_recovering():
-            return
-            
-        if self.is_throwing_in:
-
-            return
-            
-        x_min, x_max, y_min, y_max = self.get_zone_limits()
-        
-        BOUNDARY_BUFFER = 20  
-        DECELERATION_DISTANCE = 50  
-        
-
-        if self.player_type == 'goalkeeper':
-            if (self.team == 'red' and ball.x < pen_area_depth) or \
-               (self.team == 'blue' and ball.x > f_length - pen_area_depth):
-                self.target_x = ball.x
-                self.target_y = ball.y
-            else:
-                self.target_x = (x_min + x_max) // 2
-                self.target_y = ball.y
-            
-            self.target_x = max(x_min + BOUNDARY_BUFFER, min(x_max - BOUNDARY_BUFFER, self.target_x))
-            self.target_y = max(y_min + BOUNDARY_BUFFER, min(y_max - BOUNDARY_BUFFER, self.target_y))
-            
-        elif self.is_active_pursuer:
-            self.target_x = ball.x
-            self.target_y = ball.y
-            
-            self.target_x = max(x_min + BOUNDARY_BUFFER, 
-                         min(x_max - BOUNDARY_BUFFER, self.target_x))
-            self.target_y = max(y_min + BOUNDARY_BUFFER,
-                         min(y_max - BOUNDARY_BUFFER, self.target_y))
-        elif self.team == 'red' and self.player_type == 'defender':
-
-            attacker = next((p for p in players if p.team == 'red' and p.player_type == 'attacker'), None)
-            if attacker and self.assigned_corner:
-                self.target_x = self.original_x
-                self.target_y = self.original_y
-
-                corner_x, corner_y = self.assigned_corner
-                self.target_x = (corner_x + attacker.x) / 2
-                self.target_y = (corner_y + attacker.y) / 2
-
-
-                y_offset = 100
-
-                if corner_y == 100:
-                    self.target_x += y_offset
-                else:
-                    self.target_x -= y_offset
-
-
-                self.target_x = max(x_min + BOUNDARY_BUFFER, min(x_max - BOUNDARY_BUFFER, self.target_x))
-                self.target_y = max(y_min + BOUNDARY_BUFFER, min(y_max - BOUNDARY_BUFFER, self.target_y))
-            else:
-
-                self.target_x = self.original_x
-                self.target_y = self.original_y
+    def can_follow_commands(self):
+        """False while fallen or taking a throw-in, when Commands are ignored"""
+        return not (self.fall_recovery.is_recovering() or self.is_throwing_in)
+
+    def follow_commands(self, commands, index, ball, kinematics=None):
+        """Walk as ordered by a Policy's Commands for robot `index`; True if it reached the ball on the way"""
+        if self.fall_recovery.is_recovering() or self.is_throwing_in:
+            return False
+        
+        self.target_x = float(commands.target_x[index])
+        self.target_y = float(commands.target_y[index])
+        start_x, start_y = self.x, self.y
+        
+        return self.walk_to_target(kinematics=kinematics) and self.reached_ball(ball, start_x, start_y)
+
+    def reached_ball(self, ball, start_x, start_y):
+        """Whether the walk from (start_x, start_y) to here touched the ball"""
+        # Swept test, so a robot that walks through the ball within one tick still reaches it
+        return first_contact(start_x - ball.x, start_y - ball.y, self.x - start_x,
+                             self.y - start_y, self.radius + ball.radius) is not None
+
+    def take_kick(self, commands, index, ball):
+        """Kick as ordered for robot `index` once it has reached the ball; True if it kicked"""
+        if not commands.kick[index]:
+            return False
+        self.kick(ball, float(commands.kick_angle[index]), float(commands.kick_power[index]),
+                  bool(commands.shot[index]))
+        return True
+
+    def walk_to_target(self, limits=None, kinematics=None):
+        """
+        One kinematics update towards (target_x, target_y); False while turning on the spot.
+
+        Movement is kept within `limits` (default: own zone) and uses
+        `kinematics` (default: the robot's own model) for the update. A
+        robot already outside its limits, such as a restart taker after the
+        restart, is never snapped back: it may not stray further out and
+        walks back in at its own speed.
+        """
+        x_min, x_max, y_min, y_max = limits or self.get_zone_limits()
+        buffer = self.params.boundary_buffer
+        x_min, x_max = min(x_min + buffer, self.x), max(x_max - buffer, self.x)
+        y_min, y_max = min(y_min + buffer, self.y), max(y_max - buffer, self.y)
+
+        self.x, self.y, self.facing_angle, self.velocity, walking = (kinematics or self.kinematics).step(
+            self.x, self.y, self.facing_angle, self.velocity, self.target_x, self.target_y, self.speed)
+        if not walking:
+            self.movement_state = "turning"
+        elif self.velocity > 0:
+            self.movement_state = "walking"
         else:
-            self.target_x = self.original_x
-            self.target_y = self.original_y
-        
-
-
-        target_angle = math.atan2(self.target_y - self.y, self.target_x - self.x)
-        angle_diff = self.normalize_angle(target_angle - self.facing_angle)
-        
-
-        if abs(angle_diff) > math.radians(15) and self.movement_state != "turning":
+            self.movement_state = "idle"
+        
+
+        self.x = max(x_min, min(x_max, self.x))
+        self.y = max(y_min, min(y_max, self.y))
+        return walking
+
+    def walk_bounds(self, limits=None):
+        """Box a walk from the current position must end in, as (x_min, x_max, y_min, y_max)"""
+        x_min, x_max, y_min, y_max = limits or self.get_zone_limits()
+        buffer = self.params.boundary_buffer
+        return (min(x_min + buffer, self.x), max(x_max - buffer, self.x),
+                min(y_min + buffer, self.y), max(y_max - buffer, self.y))
+
+    def end_walk(self, x, y, facing_angle, velocity, walking, bounds):
+        """
+        The end of walk_to_target for a kinematics update computed elsewhere,
+        such as KinematicsModel.step_many; `bounds` is walk_bounds from
+        before the update. Returns `walking`.
+        """
+        self.facing_angle = facing_angle
+        self.velocity = velocity
+        if not walking:
             self.movement_state = "turning"
-            self.turn_start_time = time.time()
-            self.turn_duration = abs(angle_diff) / math.radians(90) * 1.0
-            return
-            
-
-        if self.movement_state == "turning":
-            if time.time() - self.turn_start_time >= self.turn_duration:
-                self.facing_angle = target_angle
-                self.movement_state = "walking"
-            return
-        
-
-        distance = math.hypot(self.target_x - self.x, self.target_y - self.y)
-        
-
-        speed = self.speed
-        if distance < DECELERATION_DISTANCE:
-            speed = self.speed * (distance/DECELERATION_DISTANCE)
-        
-
-        new_x = self.x + math.cos(self.facing_angle) * speed
-        new_y = self.y + math.sin(self.facing_angle) * speed
-        
-
-        self.x = self.lerp(self.x, new_x, 0.3)
-        self.y = self.lerp(self.y, new_y, 0.3)
-        
-
-        self.x = max(x_min + BOUNDARY_BUFFER, min(x_max - BOUNDARY_BUFFER, self.x))
-        self.y = max(y_min + BOUNDARY_BUFFER, min(y_max - BOUNDARY_BUFFER, self.y))
-        
-        passing_strategy = PassingStrategy()
-        distance_to_goal = None
-
-        if math.hypot(self.x-ball.x, self.y-ball.y) <= self.radius + ball.radius:
-
-            passing_strategy = PassingStrategy()
-
-
-            if self.team == 'red':
-                target_x = f_length
-                target_y = f_width / 2
-            else:
-                target_x = 0
-                target_y = f_width / 2
-
-
-            distance_to_goal = math.hypot(self.x - target_x, self.y - target_y)
-
-
-            in_opponent_half = (self.team == 'red' and self.x > f_length / 2) or \
-                              (self.team == 'blue' and self.x < f_length / 2)
-
-
-            if self.player_type == 'attacker' and in_opponent_half and distance_to_goal > 200 and self.team == "red":
-
-                dribble_power = 0.5
-                
-
-                target_x, target_y = passing_strategy.find_best_pass_target(self, ball, players)
-                if self.team == 'red':
-                    target_x -= 50
-                
-
-                avoid_angle = self.avoid_opponent_while_dribbling(ball, players, target_x, target_y)
-                
-                if avoid_angle is not None:
-
-                    angle = avoid_angle
-                else:
-
-                    angle = math.atan2(target_y - ball.y, target_x - ball.x)
-                
-                angle += math.radians(random.uniform(-10, 10))
-                
-                ball.velocity_x = math.cos(angle) * dribble_power
-                ball.velocity_y = math.sin(angle) * dribble_power
-                ball.last_movement_time = time.time()
-            else:
-
-                if self.team == 'red':
-                    target_x, target_y = passing_strategy.find_best_pass_target(self, ball, players)
-                    if self.player_type == "attacker":
-                        target_x -= 50
-                else:
-                    target_x, target_y = passing_strategy.find_best_pass_target(self, ball, players)
-                
-
-                kick_power = 3 if self.player_type == 'attacker' and distance_to_goal <= 200 else 2
-                kick_power = kick_power if self.player_type == 'attacker' else (2 if self.player_type == 'goalkeeper' else 2)
-                if self.player_type == 'attacker' and self.team == 'red' and distance_to_goal <= 200:
-                    self.shots_attempted += 1
-
-                angle = math.atan2(target_y - ball.y, target_x - ball.x)
-                
-
-                angle += math.radians(random.uniform(-5, 5))
-                
-                ball.velocity_x = math.cos(angle) * kick_power
-                ball.velocity_y = math.sin(angle) * kick_power
-                ball.last_movement_time = time.time()
+        elif self.velocity > 0:
+            self.movement_state = "walking"
+        else:
+            self.movement_state = "idle"
+        x_min, x_max, y_min, y_max = bounds
+        self.x = max(x_min, min(x_max, x))
+        self.y = max(y_min, min(y_max, y))
+        return walking
+
+    def kick(self, ball, angle, power, is_shot=False):
+        if is_shot:
+            self.shots_attempted += 1
+        ball.velocity_x = math.cos(angle) * power
+        ball.velocity_y = math.sin(angle) * power
+        ball.last_movement_time = self.time_fn()
 
     def normalize_angle(self, angle):
         return ((angle + math.pi) % (2 * math.pi)) - math.pi
-    
-    def lerp(self, a, b, t):
-        return a + (b - a) * min(max(t, 0), 1)
 
     def draw(self, screen):
+        import pygame
 
         pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
         
@@ -374,14 +262,16 @@ class Player:
         self._all_players_ref = accessor_func
 
 class Ball:
-    def __init__(self, x, y):
+    def __init__(self, x, y, time_fn=time.time):
+        self.time_fn = time_fn
         self.reset(x, y)
-        self.last_movement_time = time.time()
+        self.last_movement_time = self.time_fn()
         self.last_position = (x, y)
         self.stall_threshold = 6 
         self.movement_threshold = 5
         self.out_of_bounds = False
         self.last_touch_team = None
+        self.last_touch_player = None
     
     def reset(self, x, y):
         self.x = x
@@ -389,17 +279,27 @@ class Ball:
         self.radius = 5
         self.velocity_x = 0
         self.velocity_y = 0
-        self.last_movement_time = time.time()
+        self.last_movement_time = self.time_fn()
         self.last_position = (x, y)
         self.out_of_bounds = False
+        self.in_goal = False
+        self.event = None
     
-    def move(self):
+    def move(self, robots=None):
+        """Roll one tick; with `robots`, the ball stops just inside the first robot it runs into"""
         previous_x = self.x
         previous_y = self.y
         
         self.x += self.velocity_x
         self.y += self.velocity_y
         
+        if robots:
+            t, robot = sweep_against_static(previous_x, previous_y, self.x, self.y, robots,
+                                            lambda r: r.radius + self.radius)
+            if robot is not None:
+                self.x = previous_x + self.velocity_x * t
+                self.y = previous_y + self.velocity_y * t
+        
         current_position = (self.x, self.y)
         distance_moved = math.hypot(
             current_position[0] - self.last_position[0],
@@ -407,16 +307,15 @@ class Ball:
         )
         
         if distance_moved > self.movement_threshold:
-            self.last_movement_time = time.time()
+            self.last_movement_time = self.time_fn()
             self.last_position = current_position
         
 
         self.velocity_x *= 0.99
         self.velocity_y *= 0.99
         
-        goal_y_start = (f_width - g_width) // 2
-        goal_y_end = goal_y_start + g_width
-        
+        was_out = self.out_of_bounds
+        exit_kind = None
 
         if self.y - self.radius <= 0:
 
@@ -425,6 +324,7 @@ class Ball:
             self.y = self.radius
             self.out_of_bounds = True
             self.out_of_bounds_position = (self.x, self.radius)
+            exit_kind = TOUCHLINE_EXIT
             
         elif self.y + self.radius >= f_width:
 
@@ -433,87 +333,158 @@ class Ball:
             self.y = f_width - self.radius
             self.out_of_bounds = True
             self.out_of_bounds_position = (self.x, f_width - self.radius)
+            exit_kind = TOUCHLINE_EXIT
             
 
-        if self.x - self.radius <= 0:
-            if goal_y_start <= self.y <= goal_y_end:
+        in_mouth = GOAL_Y_START <= self.y <= GOAL_Y_END
+        if self.x - self.radius <= 0 and not in_mouth:
 
-                pass
-            else:
-
-                self.velocity_x = 0
-                self.velocity_y = 0
-                self.x = self.radius
-                self.out_of_bounds = True
-                self.out_of_bounds_position = (self.radius, self.y)
+            self.velocity_x = 0
+            self.velocity_y = 0
+            self.x = self.radius
+            self.out_of_bounds = True
+            self.out_of_bounds_position = (self.radius, self.y)
+            exit_kind = GOAL_LINE_EXIT
                 
-        elif self.x + self.radius >= f_length:
-            if goal_y_start <= self.y <= goal_y_end:
-
-                pass
-            else:
+        elif self.x + self.radius >= f_length and not in_mouth:
 
-                self.velocity_x = 0
-                self.velocity_y = 0
-                self.x = f_length - self.radius
-                self.out_of_bounds = True
-                self.out_of_bounds_position = (f_length - self.radius, self.y)
+            self.velocity_x = 0
+            self.velocity_y = 0
+            self.x = f_length - self.radius
+            self.out_of_bounds = True
+            self.out_of_bounds_position = (f_length - self.radius, self.y)
+            exit_kind = GOAL_LINE_EXIT
+
+        # Report each goal and exit once, on the tick it happens
+        in_goal = in_mouth and (self.x <= LEFT_GOAL_X or self.x >= RIGHT_GOAL_X)
+        if exit_kind is not None and not was_out:
+            self.event = BallEvent(exit_kind, self.last_touch_team, self.last_touch_player, self.x, self.y)
+        elif in_goal and not self.in_goal:
+            scoring_team = 'blue' if self.x <= LEFT_GOAL_X else 'red'
+            self.event = BallEvent(GOAL, scoring_team, self.last_touch_player, self.x, self.y)
+        else:
+            self.event = None
+        self.in_goal = in_goal
     
     def is_ball_stuck(self):
-        return time.time() - self.last_movement_time > self.stall_threshold
+        return self.time_fn() - self.last_movement_time > self.stall_threshold
         
     def register_touch(self, player):
-        """Register which team last touched the ball"""
+        """Register which robot, and so which team, last touched the ball"""
         self.last_touch_team = player.team
+        self.last_touch_player = player
+
+def draw_pitch(screen):
+    """Grass and field markings at full scale; shared by FootballSimulation and match_viewer"""
+    import pygame
+    screen.fill((0, 200, 0))
+    
+
+    pygame.draw.rect(screen, (255,255,255), (0, 0, f_length, f_width), 2)
+    pygame.draw.line(screen, (255,255,255), (f_length//2, 0), (f_length//2, f_width), 2)
+    pygame.draw.circle(screen, (255,255,255), (f_length//2, f_width//2), circle_rad, 2)
+    
+
+    pygame.draw.rect(screen, (255,255,255), 
+                     (0, (f_width-pen_area_width)//2, pen_area_depth, pen_area_width), 2)
+    pygame.draw.rect(screen, (255,255,255), 
+                     (f_length-pen_area_depth, (f_width-pen_area_width)//2, 
+                      pen_area_depth, pen_area_width), 2)
+    
+
+    pygame.draw.rect(screen, (255,255,255), 
+                     (0, (f_width-g_width)//2, g_depth, g_width), 2)
+    pygame.draw.rect(screen, (255,255,255), 
+                     (f_length-g_depth, (f_width-g_width)//2, g_depth, g_width), 2)
+
 
 class FootballSimulation:
-    def __init__(self, red_defenders=0, red_attackers=3, blue_defenders=2, blue_attackers=1):
-        pygame.init()
-        self.screen = pygame.display.set_mode((f_length, f_width))
-        pygame.display.set_caption("Robot Soccer Simulation")
+    def __init__(self, red_defenders=0, red_attackers=3, blue_defenders=2, blue_attackers=1, policy=None,
+                 headless=False, verbose=None, collect_stats=False, scenario=None, kinematics=None,
+                 coarse_ticks=None, backend='python', params=None, seed=None):
+        # Headless matches run on simulated time and never touch pygame
+        self.headless = headless
+        self.verbose = not headless if verbose is None else verbose
+        self.sim_clock = SimClock() if headless else None
+        self.time_fn = self.sim_clock or time.time
+        self.screen = None
+        if not headless:
+            self.open_display()
         
         self.red_score = 0
         self.blue_score = 0
-        self.start_time = time.time()
+        self.start_time = self.time_fn()
         self.game_over = False
         self.players = []
         self.red_attacker_goals = 0  
+        # (tick, events.BallEvent) for every goal and exit, in order
+        self.events = []
+        # 'numba' or 'auto' run the per-tick kernels compiled; see kernels.Backend
+        self.backend = Backend(backend)
+        self.kinematics = (kinematics or DEFAULT_KINEMATICS).with_backend(self.backend)
+        # State arrays for KinematicsModel.step_many, one per number of walking robots
+        self._walk_buffers = {}
+        # Headless matches take coarse steps in open play; rendered ones must tick at the frame rate
+        self.coarse_ticks = (COARSE_TICKS if headless else 1) if coarse_ticks is None else coarse_ticks
+        if self.coarse_ticks > 1 and not headless:
+            raise ValueError("coarse_ticks > 1 needs a headless simulation")
+        self.coarse_kinematics = self.kinematics.with_dt(self.kinematics.dt * self.coarse_ticks)
+        self.ticks = 0
+        # Separate kick, collision and throw-in noise when seeded; the global random module otherwise
+        self.streams = GLOBAL_STREAMS if seed is None else RandomStreams(seed)
+        # behavior_params.BehaviorParams per team; `params` may be one for both teams or a {team: params} dict
+        self.team_params = team_params(params)
         
         self.initialize_players(red_defenders, red_attackers, blue_defenders, blue_attackers)
-        self.ball = Ball(f_length//2, f_width//2)
-        self.clock = pygame.time.Clock()
+        self.ball = Ball(f_length//2, f_width//2, self.time_fn)
         self.running = True
-        self.font = pygame.font.Font(None, 36)
         self.game_state = "playing"
         self.throw_in_team = None
         self.throw_in_position = None
         self.throw_in_player = None
-        
-
-        self.collision_handler = CollisionHandler()
+        self.throw_in_target = None
+        self.restart_start_time = 0
+        
+
+        self.collision_handler = CollisionHandler(self.verbose, self.backend, self.streams.collisions)
+        self.policy = policy or ScriptedPolicy(self.streams.kicks, params=self.team_params, kinematics=self.kinematics)
+        self.policy.reset()
+        # Optional shared_state.MatchSlot mirroring this match for other processes
+        self.state_slot = None
+        # Optional trajectory_export.MatchRecorder logging every policy decision
+        self.recorder = None
+        # Snapshot the current Commands were decided on
+        self.observation = None
+        self.stats = MatchStats(self.players, self.sim_clock.dt if headless else 1 / 60) if collect_stats else None
+        # Optional scenarios.py set piece (library name, JSON path or dict) replacing the kickoff layout
+        self.scenario = None
+        if scenario is not None:
+            from scenarios import apply_scenario
+            apply_scenario(self, scenario)
     
     def initialize_players(self, red_def, red_att, blue_def, blue_att):
         if red_def + red_att != 3 or blue_def + blue_att != 3:
             raise ValueError("Each team must have 3 outfield players (defenders + attackers)")
         
-        self.players.append(Player(50, f_width//2, 'red', (255,0,0), 'goalkeeper'))
+        self.players.append(Player(50, f_width//2, 'red', (255,0,0), 'goalkeeper', time_fn=self.time_fn, verbose=self.verbose, params=self.team_params['red'], streams=self.streams))
         for i in range(red_def):
-            self.players.append(Player(200+((i+1)*50), (i+1)*(f_width//(red_def+1)), 'red', (255,100,0), 'defender'))
+            self.players.append(Player(200+((i+1)*50), (i+1)*(f_width//(red_def+1)), 'red', (255,100,0), 'defender', time_fn=self.time_fn, verbose=self.verbose, params=self.team_params['red'], streams=self.streams))
     
 
         for i in range(red_att):
-            self.players.append(Player(400, (i+1)*(f_width//(red_att+1)), 'red', (255,50,0), 'attacker'))
+            self.players.append(Player(400, (i+1)*(f_width//(red_att+1)), 'red', (255,50,0), 'attacker', time_fn=self.time_fn, verbose=self.verbose, params=self.team_params['red'], streams=self.streams))
     
 
-        self.players.append(Player(850, f_width//2, 'blue', (0,0,255), 'goalkeeper'))
+        self.players.append(Player(850, f_width//2, 'blue', (0,0,255), 'goalkeeper', time_fn=self.time_fn, verbose=self.verbose, params=self.team_params['blue'], streams=self.streams))
         for i in range(blue_def):
-            self.players.append(Player(700, (i+1)*(f_width//(blue_def+1)), 'blue', (0,100,255), 'defender'))
+            self.players.append(Player(700, (i+1)*(f_width//(blue_def+1)), 'blue', (0,100,255), 'defender', time_fn=self.time_fn, verbose=self.verbose, params=self.team_params['blue'], streams=self.streams))
         for i in range(blue_att):
-            self.players.append(Player(600, (i+1)*(f_width//(blue_att+1)), 'blue', (0,150,255), 'attacker'))
+            self.players.append(Player(600, (i+1)*(f_width//(blue_att+1)), 'blue', (0,150,255), 'attacker', time_fn=self.time_fn, verbose=self.verbose, params=self.team_params['blue'], streams=self.streams))
             
 
         for player in self.players:
             player.set_all_players_accessor(lambda: self.players)
+            player.kinematics = self.kinematics
 
     def update_pursuers(self):
         red_players = [p for p in self.players if p.team == 'red' and p.player_type != 'goalkeeper']
@@ -551,24 +522,20 @@ class FootballSimulation:
             blue_closest.is_active_pursuer = True
 
     def check_goal(self):
-        goal_y_start = (f_width - g_width) // 2
-        
+        """Score the goal Ball.move reported this tick, if any"""
+        event = self.ball.event
+        if event is None or event.kind != GOAL:
+            return False
 
-        if 0 <= self.ball.x <= g_depth and goal_y_start <= self.ball.y <= goal_y_start + g_width:
+        if event.team == 'blue':
             self.blue_score += 1
-            self.reset_after_goal()
-            return True
-        
-
-        if f_length-g_depth <= self.ball.x <= f_length and goal_y_start <= self.ball.y <= goal_y_start + g_width:
+        else:
             self.red_score += 1
-            last_touch_player = next((p for p in self.players if p.team == self.ball.last_touch_team), None)
-            if last_touch_player and last_touch_player.team == 'red' and last_touch_player.player_type == 'attacker':
+            scorer = event.player
+            if scorer is not None and scorer.team == 'red' and scorer.player_type == 'attacker':
                 self.red_attacker_goals += 1
-            self.reset_after_goal()
-            return True
-        
-        return False
+        self.reset_after_goal()
+        return True
     
     def get_attacker_stats(self):
         red_attacker_shots = sum(p.shots_attempted for p in self.players 
@@ -583,32 +550,151 @@ class FootballSimulation:
         for player in self.players:
             player.x = player.original_x
             player.y = player.original_y
+            player.previous_x = player.x
+            player.previous_y = player.y
+            player.velocity = 0.0
             player.is_active_pursuer = False
+            player.is_throwing_in = False
         self.game_state = "playing"
+        self.throw_in_team = None
+        self.throw_in_position = None
+        self.throw_in_player = None
+        if self.stats is not None:
+            self.stats.clear_pending_pass()
+
+    def start_restart(self, kind, team, position):
+        """Stop play for a throw-in, corner kick or goal kick taken by `team` from `position`"""
+        self.game_state = kind
+        self.throw_in_team = team
+        self.throw_in_position = position
+        self.throw_in_player = None
+        self.restart_start_time = self.time_fn()
+        self.ball.reset(*position)
+        for player in self.players:
+            player.is_active_pursuer = False
+        if self.stats is not None:
+            self.stats.clear_pending_pass(team)
+        if self.verbose:
+            print(f"{RESTART_STATES[kind]}: {team} team")
+
+    def restart_after_out_of_bounds(self):
+        """Award the restart for where the ball left the field and who touched it last"""
+        x, y = self.ball.out_of_bounds_position
+        last_touch_team = self.ball.last_touch_team
+
+        if self.ball.event is not None and self.ball.event.kind == GOAL_LINE_EXIT:
+            defending_team = 'red' if x < f_length / 2 else 'blue'
+            attacking_team = 'blue' if defending_team == 'red' else 'red'
+            if last_touch_team == defending_team:
+                corner_x = RESTART_INSET if defending_team == 'red' else f_length - RESTART_INSET
+                corner_y = RESTART_INSET if y < f_width / 2 else f_width - RESTART_INSET
+                self.start_restart('corner_kick', attacking_team, (corner_x, corner_y))
+            else:
+                goal_kick_x = pen_area_depth / 2 if defending_team == 'red' else f_length - pen_area_depth / 2
+                self.start_restart('goal_kick', defending_team, (goal_kick_x, f_width / 2))
+            return
 
-    def draw_field(self):
-        self.screen.fill((0, 200, 0))
-        
-
-        pygame.draw.rect(self.screen, (255,255,255), (0, 0, f_length, f_width), 2)
-        pygame.draw.line(self.screen, (255,255,255), (f_length//2, 0), (f_length//2, f_width), 2)
-        pygame.draw.circle(self.screen, (255,255,255), (f_length//2, f_width//2), circle_rad, 2)
-        
+        if last_touch_team is None:
+            team = 'red' if x < f_length / 2 else 'blue'
+        else:
+            team = 'blue' if last_touch_team == 'red' else 'red'
+        throw_x = max(RESTART_INSET, min(f_length - RESTART_INSET, x))
+        throw_y = RESTART_INSET if y < f_width / 2 else f_width - RESTART_INSET
+        self.start_restart('throw_in', team, (throw_x, throw_y))
+
+    def choose_restart_taker(self):
+        """Nearest standing robot of the restarting team; goalkeepers take goal kicks only"""
+        candidates = [p for p in self.players
+                      if p.team == self.throw_in_team and not p.fall_recovery.is_recovering()]
+        if self.game_state == 'goal_kick':
+            candidates = [p for p in candidates if p.player_type == 'goalkeeper'] or candidates
+        else:
+            candidates = [p for p in candidates if p.player_type != 'goalkeeper'] or candidates
+        if not candidates:
+            return None
+        ball_x, ball_y = self.throw_in_position
+        return min(candidates, key=lambda p: math.hypot(p.x - ball_x, p.y - ball_y))
+
+    def choose_throw_target(self, taker):
+        """Nearest standing teammate of the taker, or the centre spot if there is none"""
+        ball_x, ball_y = self.throw_in_position
+        teammates = [p for p in self.players if p.team == taker.team and p is not taker
+                     and p.player_type != 'goalkeeper' and not p.fall_recovery.is_recovering()]
+        if not teammates:
+            return f_length / 2, f_width / 2
+        receiver = min(teammates, key=lambda p: math.hypot(p.x - ball_x, p.y - ball_y))
+        return receiver.x, receiver.y
+
+    def step_restart(self):
+        """
+        One tick of a restart.
+
+        The taker walks to the spot behind the ball facing its target,
+        waits `throw_duration` and throws; everyone else keeps following the
+        policy without kicking. A taker that falls is replaced, and a restart
+        nobody takes within RESTART_TIMEOUT becomes a kickoff.
+        """
+        if self.time_fn() - self.restart_start_time >= RESTART_TIMEOUT:
+            if self.verbose:
+                print(f"{RESTART_STATES[self.game_state]} not taken in time, resetting")
+            self.reset_after_goal()
+            return
 
-        pygame.draw.rect(self.screen, (255,255,255), 
-                         (0, (f_width-pen_area_width)//2, pen_area_depth, pen_area_width), 2)
-        pygame.draw.rect(self.screen, (255,255,255), 
-                         (f_length-pen_area_depth, (f_width-pen_area_width)//2, 
-                          pen_area_depth, pen_area_width), 2)
-        
+        self.collision_handler.check_and_handle_player_collisions(self.players)
+
+        taker = self.throw_in_player
+        if taker is not None and taker.fall_recovery.is_recovering():
+            taker.is_throwing_in = False
+            taker = None
+        if taker is None:
+            taker = self.throw_in_player = self.choose_restart_taker()
+            if taker is not None:
+                self.throw_in_target = self.choose_throw_target(taker)
+
+        self.remember_positions()
+        commands = self.decide()
+        commands.kick[:] = False
+        for i, player in enumerate(self.players):
+            if player is not taker:
+                player.follow_commands(commands, i, self.ball)
+        self.record(commands)
+
+        if taker is None:
+            return
+        ball_x, ball_y = self.throw_in_position
+        target_x, target_y = self.throw_in_target
+
+        if not taker.is_throwing_in:
+            angle = math.atan2(target_y - ball_y, target_x - ball_x)
+            reach = taker.radius + self.ball.radius
+            taker.target_x = ball_x - math.cos(angle) * reach
+            taker.target_y = ball_y - math.sin(angle) * reach
+            if taker.walk_to_target((0, f_length, 0, f_width)) and \
+                    math.hypot(taker.target_x - taker.x, taker.target_y - taker.y) <= RESTART_REACH:
+                taker.is_throwing_in = True
+                taker.throw_start_time = self.time_fn()
+        elif taker.throw_in(self.ball, target_x, target_y):
+            self.ball.register_touch(taker)
+            if self.stats is not None:
+                i = self.players.index(taker)
+                self.stats.record_touch(i)
+                self.stats.record_kick(i, THROW_POWER, False)
+            self.game_state = "playing"
+            self.throw_in_player = None
+
+    def open_display(self):
+        """Create the pygame window; headless simulations can call this to be watched"""
+        import pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode((f_length, f_width))
+        pygame.display.set_caption("Robot Soccer Simulation")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 36)
 
-        pygame.draw.rect(self.screen, (255,255,255), 
-                         (0, (f_width-g_width)//2, g_depth, g_width), 2)
-        pygame.draw.rect(self.screen, (255,255,255), 
-                         (f_length-g_depth, (f_width-g_width)//2, g_depth, g_width), 2)
-        
+    def draw_field(self):
+        draw_pitch(self.screen)
 
-        elapsed = max(0, GAME_DURATION - (time.time() - self.start_time))
+        elapsed = max(0, GAME_DURATION - (self.time_fn() - self.start_time))
         score_text = f"Red {self.red_score} - {self.blue_score} Blue    Time: {elapsed//60:.0f}:{elapsed%60:02.0f}"
         text = self.font.render(score_text, True, (255,255,255))
         self.screen.blit(text, (f_length//2 - text.get_width()//2, 10))
@@ -619,64 +705,224 @@ class FootballSimulation:
         self.screen.blit(c_text, (f_length - c_text.get_width() - 10, 10))
         
 
-        if self.game_state == "throw_in":
-            state_text = f"Throw-in: {self.throw_in_team.upper()} team"
+        if self.game_state in RESTART_STATES:
+            state_text = f"{RESTART_STATES[self.game_state]}: {self.throw_in_team.upper()} team"
             text = self.font.render(state_text, True, (255, 255, 0))
             self.screen.blit(text, (f_length//2 - text.get_width()//2, 40))
 
-    def run(self):
-        while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
+    def remember_positions(self):
+        """Mark where every robot starts this tick's movement, for swept collision checks"""
+        for player in self.players:
+            player.previous_x = player.x
+            player.previous_y = player.y
+
+    def observe(self):
+        """Read-only snapshot of all robots and the ball for the policy"""
+        return Observation.from_players(self.players, self.ball, self.game_state)
+
+    def decide(self):
+        """Ask the policy where every robot walks this tick"""
+        self.observation = self.observe()
+        return self.policy.act(self.observation)
+
+    def decide_kicks(self, commands, reached):
+        """Ask the policy to kick for the robots in `reached`, seen where they have walked to"""
+        touching = [False] * len(self.players)
+        for i in reached:
+            touching[i] = True
+        self.policy.kick(Observation.from_players(self.players, self.ball, self.game_state, touching), commands)
+
+    def record(self, commands):
+        """Pass the tick's decision, kicks included, and the observation it was made on to the recorder if any"""
+        if self.recorder is not None:
+            self.recorder.record(self.ticks, self.observation, commands)
+
+    def near_contact(self, ticks):
+        """Indices of robots that could reach the ball or another standing robot within `ticks` ticks"""
+        ball = self.ball
+        dt = self.kinematics.dt * ticks
+        ball_travel = ticks * math.hypot(ball.velocity_x, ball.velocity_y)
+        reach = [p.speed * dt + NEAR_MARGIN for p in self.players]
+        near = set()
+        for i, p in enumerate(self.players):
+            if math.hypot(p.x - ball.x, p.y - ball.y) <= p.radius + ball.radius + ball_travel + reach[i]:
+                near.add(i)
+
+        standing = [(i, p) for i, p in enumerate(self.players) if not p.fall_recovery.is_recovering()]
+        for a, (i, p) in enumerate(standing):
+            for j, q in standing[a + 1:]:
+                if math.hypot(p.x - q.x, p.y - q.y) <= COLLISION_DISTANCE + reach[i] + reach[j]:
+                    near.add(i)
+                    near.add(j)
+        return near
+
+    def walk(self, movers, commands, kinematics):
+        """
+        Player.follow_commands for every (index, robot) in `movers`; returns
+        the indices of the robots that reached the ball. On a compiled
+        backend all robots take their kinematics update in one kernel call.
+        """
+        ball = self.ball
+        if kinematics.batch_kernel is None:
+            return [i for i, p in movers if p.follow_commands(commands, i, ball, kinematics)]
+
+        walkers = [(i, p) for i, p in movers if p.can_follow_commands()]
+        if not walkers:
+            return []
+        target_x = commands.target_x.tolist()
+        target_y = commands.target_y.tolist()
+        rows = []
+        for i, p in walkers:
+            p.target_x = target_x[i]
+            p.target_y = target_y[i]
+            rows.append((p.x, p.y, p.facing_angle, p.velocity, p.target_x, p.target_y, p.speed, 0.0))
+        state = self._walk_buffers.get(len(rows))
+        if state is None:
+            state = self._walk_buffers[len(rows)] = np.empty((len(rows), 8))
+        state[...] = rows
+        starts = [(p.x, p.y, p.walk_bounds()) for _, p in walkers]
+        kinematics.step_many(state)
+
+        reached = []
+        for (i, p), (x, y, heading, speed, *_, walking), (start_x, start_y, bounds) in \
+                zip(walkers, state.tolist(), starts):
+            if p.end_walk(x, y, heading, speed, walking > 0, bounds) and p.reached_ball(ball, start_x, start_y):
+                reached.append(i)
+        return reached
+
+    def play_tick(self, movers, commands):
+        """One tick of open play for the (index, robot) pairs in `movers`; False once play stops"""
+        touched = set()
+        for i, player in movers:
+            if math.hypot(player.x-self.ball.x, player.y-self.ball.y) <= player.radius + self.ball.radius:
+                touched.add(i)
+                self.ball.register_touch(player)
+                if self.stats is not None:
+                    self.stats.record_touch(i)
+
+        reached = self.walk(movers, commands, self.kinematics)
+        # Kicks are judged after everyone has walked, so a robot kicks in the tick it reaches the ball
+        if reached:
+            self.decide_kicks(commands, reached)
+            for i in reached:
+                player = self.players[i]
+                if player.take_kick(commands, i, self.ball):
+                    # Reached the ball part-way through its move
+                    if i not in touched:
+                        self.ball.register_touch(player)
+                        if self.stats is not None:
+                            self.stats.record_touch(i)
+                    if self.stats is not None:
+                        self.stats.record_kick(i, commands.kick_power[i], commands.shot[i])
+        self.record(commands)
+        
+        self.ball.move(self.players)
+        if self.ball.event is not None:
+            self.events.append((self.ticks, self.ball.event))
+        if self.stats is not None:
+            self.stats.record_tick(self.players)
+        self.ticks += 1
+        
+
+        if self.ball.out_of_bounds:
+            self.restart_after_out_of_bounds()
+            return False
+        
+        if self.ball.is_ball_stuck():
+            if self.verbose:
+                print("Ball reset due to stalling")
+            self.reset_after_goal()
+            return False
             
-            if not self.game_over:
-                if time.time() - self.start_time >= GAME_DURATION:
-                    self.game_over = True
-                    print(f"Final Score: Red {self.red_score} - {self.blue_score} Blue")
-                    print(f"Total Collisions: {self.collision_handler.get_collision_count()}")
-                
-
-                if self.game_state == "playing":
-                    self.update_pursuers()
-                    
-
-                    self.collision_handler.check_and_handle_player_collisions(self.players)
-                    
-
-                    for player in self.players:
-                        if math.hypot(player.x-self.ball.x, player.y-self.ball.y) <= player.radius + self.ball.radius:
-                            self.ball.register_touch(player)
-                        
-
-                        player.move(self.ball, self.players)
-                    
-                    self.ball.move()
-                    
-
-                    if self.ball.out_of_bounds:
-                        self.reset_after_goal()
-                    
-                    if self.ball.is_ball_stuck():
-                        print("Ball reset due to stalling")
-                        self.reset_after_goal()
-                        
-                    if self.check_goal():
-                        self.update_pursuers()
+        if self.check_goal():
+            self.update_pursuers()
+            return False
+        return True
+
+    def step(self):
+        """
+        Advance the match by one step.
+
+        In open play a step covers `coarse_ticks` ticks. Robots that could
+        reach the ball or another robot within the step are substepped tick by
+        tick with fresh policy decisions, as is the ball; the rest take a
+        single coarse kinematics update. Restarts always advance one tick.
+        """
+        if self.time_fn() - self.start_time >= GAME_DURATION:
+            self.game_over = True
+            if self.verbose:
+                print(f"Final Score: Red {self.red_score} - {self.blue_score} Blue")
+                print(f"Total Collisions: {self.collision_handler.get_collision_count()}")
+        
+
+        if self.game_state == "playing":
+            self.update_pursuers()
             
-            self.draw_field()
+
+            self.collision_handler.check_and_handle_player_collisions(self.players)
             
 
-            self.collision_handler.draw_collision_indicators(self.screen)
+            self.remember_positions()
+            commands = self.decide()
+            ticks = self.coarse_ticks
+            movers = list(enumerate(self.players))
+            if ticks > 1:
+                near = self.near_contact(ticks)
+                self.walk([(i, player) for i, player in movers if i not in near], commands, self.coarse_kinematics)
+                movers = [(i, player) for i, player in movers if i in near]
+
+            for sub in range(ticks):
+                if sub and movers:
+                    near_players = [player for _, player in movers]
+                    self.collision_handler.check_and_handle_player_collisions(near_players)
+                    for _, player in movers:
+                        player.previous_x = player.x
+                        player.previous_y = player.y
+                    commands = self.decide()
+                if not self.play_tick(movers, commands):
+                    break
+                if self.sim_clock and sub < ticks - 1:
+                    self.sim_clock.tick()
+
+        elif self.game_state in RESTART_STATES:
+            self.step_restart()
+            if self.stats is not None:
+                self.stats.record_tick(self.players)
+            self.ticks += 1
+        
+        if self.sim_clock:
+            self.sim_clock.tick()
+        
+        if self.state_slot is not None:
+            self.state_slot.publish(self)
+
+    def draw(self):
+        import pygame
+        self.draw_field()
+        
+
+        self.collision_handler.draw_collision_indicators(self.screen)
+        
+
+        for player in self.players:
+            player.draw(self.screen)
             
 
-            for player in self.players:
-                player.draw(self.screen)
-                
+        pygame.draw.circle(self.screen, (255,255,255), (int(self.ball.x), int(self.ball.y)), self.ball.radius)
+        
+        pygame.display.flip()
 
-            pygame.draw.circle(self.screen, (255,255,255), (int(self.ball.x), int(self.ball.y)), self.ball.radius)
+    def run(self):
+        import pygame
+        while self.running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+            
+            if not self.game_over:
+                self.step()
             
-            pygame.display.flip()
+            self.draw()
             self.clock.tick(60)
         
         pygame.quit()
@@ -0,0 +1,284 @@
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing as mp
+import os
+import socket
+import time
+from collections import namedtuple
+from behavior_params import BehaviorParams, team_params
+from match_runner import play_match
+
+WORK_PORT = 8766
+LEASE_TIMEOUT = 60.0  # seconds a worker may hold a unit before it is handed to someone else
+MAX_ATTEMPTS = 3
+LINGER = 2.0  # seconds the coordinator keeps answering "done" after the last result
+
+
+class WorkUnit(namedtuple('WorkUnit', ['id', 'formation', 'params', 'seed'])):
+    """One match to play: `params` is {team: BehaviorParams._asdict()}; seeded with FootballSimulation(seed=...)"""
+    __slots__ = ()
+
+
+def make_units(formations, seeds, params=None):
+    """One WorkUnit per formation and seed, all with the same behaviour params"""
+    params = {team: p._asdict() for team, p in team_params(params).items()}
+    return [WorkUnit(i, tuple(formation), params, seed)
+            for i, (formation, seed) in enumerate(itertools.product(formations, seeds))]
+
+
+def play_unit(unit):
+    """Play a WorkUnit headless; the result message a worker sends back"""
+    params = {team: BehaviorParams(**values) for team, values in unit.params.items()}
+    simulation = play_match(unit.formation, params, unit.seed)
+    return {'red_score': simulation.red_score, 'blue_score': simulation.blue_score,
+            'collisions': simulation.collision_handler.get_collision_count(), 'ticks': simulation.ticks}
+
+
+class Coordinator:
+    """
+    Hands WorkUnits to TCP workers and collects one result per unit.
+
+    Workers speak newline-delimited JSON: {"op": "lease"} is answered with a
+    unit and a lease id, {"wait": s} while every remaining unit is leased
+    out, or {"done": true}; {"op": "result", "lease": ..., "unit": ...}
+    delivers a result. A unit goes back on the queue when its lease runs out
+    after `lease_timeout` or its worker disconnects, and is given up after
+    `max_attempts` leases. Only the first result for a unit is kept, so a
+    late result from an expired lease is harmless.
+
+    Units already in a result_store.ResultStore `store` are not handed out,
+    and new results are added to it. There is no authentication beyond an
+    optional shared `token`: bind to localhost or a trusted network.
+    """
+    def __init__(self, units, host='127.0.0.1', port=WORK_PORT, lease_timeout=LEASE_TIMEOUT,
+                 max_attempts=MAX_ATTEMPTS, store=None, token=None, verbose=True):
+        self.units = {unit.id: unit for unit in units}
+        self.host = host
+        self.port = port
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.store = store
+        self.token = token
+        self.verbose = verbose
+        self.pending = collections.deque(self.units)
+        self.leases = {}  # lease id -> (unit id, connection id, deadline)
+        self.attempts = collections.Counter()
+        self.results = {}
+        self.failed = set()
+        self.duplicates = 0
+        self.lease_ids = itertools.count()
+        self.finished = None
+        self.writers = set()
+        if store is not None:
+            self.load_cached()
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def store_key(self, unit):
+        return self.store.key(unit.formation, unit.seed, {team: BehaviorParams(**p) for team, p in unit.params.items()})
+
+    def load_cached(self):
+        for unit in self.units.values():
+            stored = self.store.lookup(self.store_key(unit))
+            if stored is not None:
+                self.results[unit.id] = {'red_score': stored['red_score'], 'blue_score': stored['blue_score'],
+                                         **stored['stats'], 'cached': True}
+        self.pending = collections.deque(u for u in self.pending if u not in self.results)
+        if self.results:
+            self.log(f"{len(self.results)} of {len(self.units)} units read from {self.store.path}")
+
+    @property
+    def complete(self):
+        return len(self.results) + len(self.failed) >= len(self.units)
+
+    def expire_leases(self, connection=None):
+        """Requeue units whose lease has run out, or every unit leased over `connection`"""
+        now = time.monotonic()
+        for lease, (unit_id, owner, deadline) in list(self.leases.items()):
+            if deadline <= now or owner == connection:
+                del self.leases[lease]
+                if unit_id in self.results:
+                    continue
+                if self.attempts[unit_id] >= self.max_attempts:
+                    self.failed.add(unit_id)
+                    self.log(f"Unit {unit_id} failed after {self.attempts[unit_id]} attempts")
+                else:
+                    self.pending.appendleft(unit_id)
+        if self.complete:
+            self.finished.set()
+
+    def lease(self, connection):
+        self.expire_leases()
+        while self.pending:
+            unit_id = self.pending.popleft()
+            if unit_id in self.results or unit_id in self.failed:
+                continue
+            lease = next(self.lease_ids)
+            self.attempts[unit_id] += 1
+            self.leases[lease] = (unit_id, connection, time.monotonic() + self.lease_timeout)
+            return {'lease': lease, 'unit': self.units[unit_id]._asdict()}
+        if self.complete:
+            return {'done': True}
+        return {'wait': min(1.0, self.lease_timeout / 4)}
+
+    def submit(self, message):
+        unit_id = message['unit']
+        self.leases.pop(message.get('lease'), None)
+        if unit_id not in self.units:
+            return {'error': f"unknown unit {unit_id}"}
+        if unit_id in self.results:
+            self.duplicates += 1
+            return {'ok': True, 'duplicate': True}
+        result = message['result']
+        self.results[unit_id] = result
+        self.failed.discard(unit_id)
+        if self.store is not None:
+            unit = self.units[unit_id]
+            self.store.add(self.store_key(unit), result['red_score'], result['blue_score'],
+                           {team: BehaviorParams(**p) for team, p in unit.params.items()}, result)
+        if len(self.results) % 50 == 0 or self.complete:
+            self.log(f"{len(self.results)}/{len(self.units)} units done")
+        if self.complete:
+            self.finished.set()
+        return {'ok': True, 'duplicate': False}
+
+    async def handle(self, reader, writer):
+        connection = object()
+        self.writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if self.token is not None and message.get('token') != self.token:
+                    reply = {'error': 'bad token'}
+                elif message.get('op') == 'lease':
+                    reply = self.lease(connection)
+                elif message.get('op') == 'result':
+                    reply = self.submit(message)
+                else:
+                    reply = {'error': f"unknown op {message.get('op')!r}"}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            # A dropped connection means the worker died; don't wait for its leases to time out
+            self.expire_leases(connection)
+            self.writers.discard(writer)
+            writer.close()
+
+    async def watch_leases(self):
+        while True:
+            await asyncio.sleep(min(1.0, self.lease_timeout / 4))
+            self.expire_leases()
+
+    async def serve(self, on_ready=None):
+        self.finished = asyncio.Event()
+        server = await asyncio.start_server(self.handle, self.host, self.port, family=socket.AF_INET)
+        self.port = server.sockets[0].getsockname()[1]
+        self.log(f"Coordinator for {len(self.units)} units on {self.host}:{self.port}")
+        if on_ready is not None:
+            on_ready(self.port)
+        watcher = asyncio.ensure_future(self.watch_leases())
+        if self.complete:
+            self.finished.set()
+        await self.finished.wait()
+        await asyncio.sleep(LINGER)
+        watcher.cancel()
+        server.close()
+        # Workers still connected see the connection close and stop
+        for writer in list(self.writers):
+            writer.close()
+        await server.wait_closed()
+        while self.writers:
+            await asyncio.sleep(0.01)
+        return self.results
+
+    def run(self, on_ready=None):
+        """Serve until every unit has a result or has failed; returns {unit id: result}"""
+        return asyncio.run(self.serve(on_ready))
+
+
+def run_worker(host='127.0.0.1', port=WORK_PORT, token=None, connect_timeout=10.0):
+    """
+    Lease, play and report units from a coordinator until it says done or goes away.
+
+    Returns the number of units played.
+    """
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            connection = socket.create_connection((host, port))
+            break
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+
+    played = 0
+    with connection, connection.makefile('rwb') as stream:
+        def request(message):
+            if token is not None:
+                message['token'] = token
+            stream.write(json.dumps(message).encode() + b'\n')
+            stream.flush()
+            line = stream.readline()
+            if not line:
+                raise ConnectionError("coordinator closed the connection")
+            return json.loads(line)
+
+        try:
+            while True:
+                reply = request({'op': 'lease'})
+                if reply.get('done'):
+                    break
+                if 'error' in reply:
+                    raise RuntimeError(reply['error'])
+                if 'wait' in reply:
+                    time.sleep(reply['wait'])
+                    continue
+                unit = WorkUnit(**reply['unit'])
+                result = play_unit(unit)
+                request({'op': 'result', 'lease': reply['lease'], 'unit': unit.id, 'result': result})
+                played += 1
+        except ConnectionError:
+            pass
+    return played
+
+
+def _worker_process(host, port, token):
+    played = run_worker(host, port, token)
+    print(f"Worker {os.getpid()} played {played} units")
+
+
+def run_local(units, num_workers=None, lease_timeout=LEASE_TIMEOUT, store=None, token=None, host='127.0.0.1',
+              port=0):
+    """
+    Coordinate `units` on `host`:`port` (port 0 picks a free one) with
+    `num_workers` local worker processes; workers on other hosts can join
+    too when `host` is reachable from them.
+    """
+    num_workers = num_workers or mp.cpu_count()
+    coordinator = Coordinator(units, host, port, lease_timeout=lease_timeout, store=store, token=token)
+    # A wildcard address accepts connections but cannot be connected to
+    connect_host = '127.0.0.1' if host in ('0.0.0.0', '') else host
+    processes = []
+
+    def start_workers(port):
+        for _ in range(num_workers):
+            process = mp.Process(target=_worker_process, args=(connect_host, port, token), daemon=True)
+            process.start()
+            processes.append(process)
+
+    try:
+        results = coordinator.run(start_workers)
+    finally:
+        for process in processes:
+            process.join(timeout=LINGER)
+    return coordinator, results